@@ -0,0 +1,184 @@
+"""`handlers.app`のコールドスタート(Lambdaの初期化)のベンチマーク
+
+新しいPythonプロセスで`handlers.app`をimportし、次の値を計測します。
+
+- init_ms: `handlers.app`のimportにかかった時間
+- peak_rss_mb: import後のピークRSS
+- first_request_ms: import後、プロセス内で最初のリクエスト(`GET /healthcheck`)を処理するまでの時間
+
+`--runs`回計測した中央値を`benchmarks/baselines/cold_start.json`と比べ、
+いずれかの値が`--threshold`(既定: 20%)より悪化していれば終了コード1で終了します
+(ごく小さい差は`MIN_REGRESSION`で無視します)。
+`-X importtime`で計測したパッケージごとのimport時間も表示します。
+DynamoDBには接続しません。
+
+    python benchmarks/cold_start.py
+    # 意図した変更で値が変わった場合はベースラインを更新する
+    python benchmarks/cold_start.py --update-baseline
+"""
+
+# Standard Library
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = ROOT / "src" / "v1"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "cold_start.json"
+METRICS = ("init_ms", "peak_rss_mb", "first_request_ms")
+# NOTE: 計測のばらつきで失敗しないように、この差を超えない悪化は無視する
+MIN_REGRESSION = {"init_ms": 20.0, "peak_rss_mb": 2.0, "first_request_ms": 5.0}
+
+HEALTHCHECK_EVENT = {
+    "path": "/healthcheck",
+    "httpMethod": "GET",
+    "headers": {},
+    "queryStringParameters": None,
+    "requestContext": {"requestId": "bench", "stage": "v1", "path": "/healthcheck"},
+    "body": None,
+    "isBase64Encoded": False,
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_in_process() -> Dict[str, float]:
+    """新しいプロセスの中で実行される計測"""
+    # Standard Library
+    import resource
+
+    started = time.perf_counter()
+    # Third Party Library
+    from handlers.app import app
+
+    init_ms = (time.perf_counter() - started) * 1000
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    started = time.perf_counter()
+    response = app.resolve(HEALTHCHECK_EVENT, {})
+    first_request_ms = (time.perf_counter() - started) * 1000
+    assert response["statusCode"] == 200, response
+
+    return {"init_ms": init_ms, "peak_rss_mb": peak_rss_mb, "first_request_ms": first_request_ms}
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(SOURCE)
+    env.setdefault("STAGE", "local")
+    env.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+    # NOTE: ローカル環境でもテーブルの作成(DynamoDBへの接続)は行わない
+    env["AUTO_CREATE_TABLES"] = "false"
+    # NOTE: ログ出力の時間を計測に含めない
+    env.setdefault("POWERTOOLS_LOG_LEVEL", "WARNING")
+    return env
+
+
+def run_once() -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child"],
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times() -> List[Tuple[str, float]]:
+    """`-X importtime`の結果をトップレベルのパッケージごとに集計する(ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import handlers.app"],
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    totals: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, _, _, module = match.groups()
+        totals[module.split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    regressions = []
+    for metric in METRICS:
+        limit = max(baseline[metric] * (1 + threshold), baseline[metric] + MIN_REGRESSION[metric])
+        if current[metric] > limit:
+            regressions.append(
+                f"{metric}: {current[metric]:.1f} > {limit:.1f}"
+                f" (baseline {baseline[metric]:.1f} +{threshold:.0%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="計測回数(中央値を使います)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="許容する悪化の割合")
+    parser.add_argument("--top", type=int, default=15, help="表示するパッケージ数")
+    parser.add_argument("--update-baseline", action="store_true", help="ベースラインを更新する")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_in_process()))
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    current = {metric: statistics.median(run[metric] for run in runs) for metric in METRICS}
+
+    print(f"import time by package (self, ms, top {args.top})")
+    for package, elapsed in import_times()[: args.top]:
+        print(f"  {package:<28} {elapsed:>8.1f}")
+
+    baseline: Dict[str, Any] = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+
+    print(f"median of {args.runs} runs")
+    print(f"  {'metric':<18} {'current':>9} {'baseline':>9}")
+    for metric in METRICS:
+        stored = baseline.get("metrics", {}).get(metric)
+        stored_text = f"{stored:>9.1f}" if stored is not None else f"{'-':>9}"
+        print(f"  {metric:<18} {current[metric]:>9.1f} {stored_text}")
+
+    if args.update_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "runs": args.runs,
+            "metrics": {metric: round(value, 1) for metric, value in current.items()},
+        }
+        BASELINE_PATH.write_text(json.dumps(record, indent=2) + "\n")
+        print(f"Updated {BASELINE_PATH.relative_to(ROOT)}")
+        return
+    if not baseline:
+        print("No baseline. Run with --update-baseline to create it.")
+        return
+
+    regressions = compare(current, baseline["metrics"], args.threshold)
+    if regressions:
+        print("Cold start regressed:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""血糖値とHbA1cのタイムライン結合(combine_bgl_and_hba1c_list)のベンチマーク
+
+以前の実装(ソート + `list.pop(0)`による結合、O(n^2))と、
+現在の`merge_bgl_and_hba1c`(1回の走査による結合、O(n))を同じ合成データで比べます。
+DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/combine_merge.py --sizes 10000 50000 100000
+"""
+
+# Standard Library
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+# Third Party Library
+from schemas.bgl import BGLSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cSchema
+from schemas.event_timing import EventTiming
+from schemas.hba1c import Hba1cSchema
+from services.bgl_and_hba1c_service import (
+    make_append_bgl_and_hba1c_item,
+    make_append_bgl_item,
+    make_append_hba1c_item,
+    merge_bgl_and_hba1c,
+)
+
+
+def legacy_combine(
+    bgl_items: List[BGLSchema], hba1c_items: List[Hba1cSchema]
+) -> List[BGLAndHba1cSchema]:
+    """以前の実装(結合部分のみ)"""
+    bgl_items = sorted(bgl_items, key=lambda x: x.record_time)
+    hba1c_items = sorted(hba1c_items, key=lambda x: x.record_time)
+    combined_items: List[BGLAndHba1cSchema] = []
+    while bgl_items or hba1c_items:
+        if not bgl_items:
+            combined_items.append(make_append_hba1c_item(hba1c_items.pop(0)))
+            continue
+        if not hba1c_items:
+            combined_items.append(make_append_bgl_item(bgl_items.pop(0)))
+            continue
+        if bgl_items[0].record_time == hba1c_items[0].record_time:
+            combined_items.append(
+                make_append_bgl_and_hba1c_item(bgl_items.pop(0), hba1c_items.pop(0))
+            )
+        elif bgl_items[0].record_time < hba1c_items[0].record_time:
+            combined_items.append(make_append_bgl_item(bgl_items.pop(0)))
+        else:
+            combined_items.append(make_append_hba1c_item(hba1c_items.pop(0)))
+    return combined_items
+
+
+def make_readings(size: int) -> Tuple[List[BGLSchema], List[Hba1cSchema]]:
+    """BGLとHbA1cを9:1で作り、HbA1cの半分はBGLと同じ記録時間にする"""
+    start = datetime(2024, 1, 1)
+    bgl_items: List[BGLSchema] = []
+    hba1c_items: List[Hba1cSchema] = []
+    for index in range(size):
+        record_time = start + timedelta(minutes=5 * index)
+        common = dict(
+            id=f"{index}",
+            user_id="bench",
+            event_timing=EventTiming.EMPTY_STOMACH,
+            record_time=record_time,
+            sunao_food=None,
+            is_deleted=False,
+            created_at=start,
+            updated_at=start,
+            version=1,
+        )
+        if index % 10 == 0:
+            if index % 20 == 0:
+                bgl_items.append(BGLSchema.model_construct(value=100.0, **common))
+            hba1c_items.append(Hba1cSchema.model_construct(value=5.5, **common))
+        else:
+            bgl_items.append(BGLSchema.model_construct(value=100.0, **common))
+    return bgl_items, hba1c_items
+
+
+def measure(fn: Callable[[], List[BGLAndHba1cSchema]]) -> Tuple[float, int]:
+    started = time.perf_counter()
+    rows = fn()
+    return time.perf_counter() - started, len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'readings':>9} {'legacy (s)':>11} {'merge (s)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        bgl_items, hba1c_items = make_readings(size)
+        legacy, legacy_rows = measure(lambda: legacy_combine(bgl_items, hba1c_items))
+        merge, merge_rows = measure(lambda: list(merge_bgl_and_hba1c(bgl_items, hba1c_items)))
+        assert legacy_rows == merge_rows
+        print(f"{size:>9} {legacy:>11.3f} {merge:>10.3f} {legacy / merge:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
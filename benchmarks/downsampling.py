@@ -0,0 +1,91 @@
+"""グラフ用の間引き・集計(`/bgl/query`の`maxPoints`・`resolution`)のベンチマーク
+
+5分ごとの合成データ(CGMを想定)で、次のレスポンスのJSONの大きさと生成時間を比べます。
+
+- raw: 期間内の全データ(以前の唯一のレスポンス)
+- maxPoints: `analytics.downsampling.downsample`(LTTB)で間引いたデータ
+- hourly・daily: `analytics.downsampling.bucket_stats`による区間ごとの集計
+
+時間はDynamoDBから読み込んだ後の処理(間引き・集計とJSON変換)を`--repeat`回計測した中央値で、
+DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/downsampling.py --sizes 10000 100000 --max-points 1000
+"""
+
+# Standard Library
+import argparse
+import json
+import math
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+# Third Party Library
+from analytics.downsampling import bucket_stats, downsample, to_arrays
+from helper.json_response import dump_json
+from schemas.bgl import BGLSchema
+from schemas.downsampling import Resolution, ValueBucketSchema
+from schemas.event_timing import EventTiming
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_bgl(size: int) -> List[BGLSchema]:
+    return [
+        BGLSchema(
+            id=f"{index:032x}",
+            user_id="bench",
+            value=round(120 + 40 * math.sin(index / 48) + (index * 7919) % 23, 1),
+            event_timing=EventTiming.EMPTY_STOMACH,
+            record_time=START + timedelta(minutes=5 * index),
+            sunao_food=None,
+            is_deleted=False,
+            created_at=START,
+            updated_at=START,
+            version=1,
+        )
+        for index in range(size)
+    ]
+
+
+def buckets_json(items: List[BGLSchema], resolution: Resolution) -> bytes:
+    seconds, values = to_arrays((item.record_time, item.value) for item in items)
+    return dump_json(List[ValueBucketSchema], bucket_stats(seconds, values, resolution))
+
+
+def median_ms(fn: Callable[[], bytes], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return statistics.median(elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--max-points", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'readings':>9} {'response':>10} {'items':>7} {'bytes':>11} {'time (ms)':>10}")
+    for size in args.sizes:
+        items = make_bgl(size)
+        responses: Dict[str, Callable[[], bytes]] = {
+            "raw": lambda: dump_json(List[BGLSchema], items),
+            "maxPoints": lambda: dump_json(List[BGLSchema], downsample(items, args.max_points)),
+            "hourly": lambda: buckets_json(items, Resolution.HOURLY),
+            "daily": lambda: buckets_json(items, Resolution.DAILY),
+        }
+        for name, fn in responses.items():
+            body = fn()
+            elapsed = median_ms(fn, args.repeat)
+            print(
+                f"{size:>9} {name:>10} {len(json.loads(body)):>7} {len(body):>11,} {elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
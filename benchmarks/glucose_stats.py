@@ -0,0 +1,93 @@
+"""血糖値の統計(`/bgl/stats`)の計算のベンチマーク
+
+同じ合成データで、次の2通りの計算時間を比べます。
+
+- python: 1件ずつループして集計する実装(クライアントで計算していた処理に相当)
+- numpy: `analytics.glucose_stats`(`np.bincount`による時間帯ごとの一括計算)
+
+numpyの時間は、(値, 時間帯)の列を配列に読み込む`to_arrays`と、統計の計算`glucose_stats`に分けて表示します。
+それぞれ`--repeat`回計測した中央値で、DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/glucose_stats.py --sizes 10000 100000 1000000
+"""
+
+# Standard Library
+import argparse
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+# Third Party Library
+from analytics.glucose_stats import glucose_stats, to_arrays
+from schemas.event_timing import EventTiming
+from schemas.glucose_stats import DEFAULT_TARGET_HIGH, DEFAULT_TARGET_LOW
+
+
+def python_stats(readings: List[Tuple[float, EventTiming]]) -> Dict[Any, Dict[str, float]]:
+    """1件ずつのループによる集計(全体と時間帯ごとの件数・平均・標準偏差・TIR)"""
+    groups: Dict[Any, List[float]] = defaultdict(list)
+    for value, event_timing in readings:
+        groups[None].append(value)
+        groups[event_timing].append(value)
+    result = {}
+    for key, values in groups.items():
+        in_range = sum(1 for value in values if DEFAULT_TARGET_LOW <= value <= DEFAULT_TARGET_HIGH)
+        result[key] = {
+            "count": len(values),
+            "mean": statistics.fmean(values),
+            "sd": statistics.stdev(values),
+            "tir": in_range / len(values) * 100,
+        }
+    return result
+
+
+def make_readings(size: int) -> List[Tuple[float, EventTiming]]:
+    random.seed(0)
+    event_timings = list(EventTiming)
+    return [(random.gauss(130, 35), random.choice(event_timings)) for _ in range(size)]
+
+
+def median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return statistics.median(elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'readings':>9} {'python (ms)':>12} {'to_arrays (ms)':>15}"
+        f" {'glucose_stats (ms)':>19} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        readings = make_readings(size)
+        values, codes = to_arrays(readings)
+
+        expected = python_stats(readings)[None]
+        actual = glucose_stats(values, codes, DEFAULT_TARGET_LOW, DEFAULT_TARGET_HIGH)
+        assert actual.count == expected["count"]
+        assert abs((actual.sd or 0) - expected["sd"]) < 0.01
+
+        python = median_ms(lambda: python_stats(readings), args.repeat)
+        load = median_ms(lambda: to_arrays(readings), args.repeat)
+        compute = median_ms(
+            lambda: glucose_stats(values, codes, DEFAULT_TARGET_LOW, DEFAULT_TARGET_HIGH),
+            args.repeat,
+        )
+        print(
+            f"{size:>9} {python:>12.2f} {load:>15.2f} {compute:>19.2f}"
+            f" {python / (load + compute):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""一覧系エンドポイントのレスポンス生成(検証とJSON変換)のベンチマーク
+
+エンドポイントごとに、同じスキーマの配列を次の2通りでレスポンスにする時間を比べます。
+
+- before: スキーマをそのまま返し、Powertoolsが戻り値の型で検証してからJSONに変換する(以前の実装)
+- after: `dump_json`で一度にJSONにして`json_response`で返す(現在の実装)
+
+どちらも`enable_validation=True`のリゾルバーで`resolve`した時間で、DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/json_response.py --sizes 1000 10000 50000
+"""
+
+# Standard Library
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+# Third Party Library
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
+from helper.json_response import dump_json, json_response
+from schemas.bgl import BGLPageSchema, BGLSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cSchema
+from schemas.event_timing import EventTiming
+from schemas.hba1c import Hba1cSchema
+from schemas.sunao_foods import SunaoFoods
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_bgl(size: int) -> List[BGLSchema]:
+    return [
+        BGLSchema(
+            id=f"{index:032x}",
+            user_id="bench",
+            value=100.0 + index % 50,
+            event_timing=EventTiming.EMPTY_STOMACH,
+            record_time=START + timedelta(minutes=5 * index),
+            sunao_food=SunaoFoods.PASTA if index % 3 == 0 else None,
+            is_deleted=False,
+            created_at=START,
+            updated_at=START,
+            version=1,
+        )
+        for index in range(size)
+    ]
+
+
+def make_hba1c(size: int) -> List[Hba1cSchema]:
+    return [Hba1cSchema(**{**item.model_dump(), "value": 5.5}) for item in make_bgl(size)]
+
+
+def make_bgl_and_hba1c(size: int) -> List[BGLAndHba1cSchema]:
+    return [
+        BGLAndHba1cSchema(
+            id=f"{index:032x}",
+            record_time=START + timedelta(minutes=5 * index),
+            event_timing=EventTiming.EMPTY_STOMACH,
+            sunao_food=None,
+            bgl_id=f"{index:032x}",
+            bgl_value=100.0,
+            hba1c_id=f"{index:032x}" if index % 10 == 0 else None,
+            hba1c_value=5.5 if index % 10 == 0 else None,
+        )
+        for index in range(size)
+    ]
+
+
+def make_bgl_page(size: int) -> BGLPageSchema:
+    return BGLPageSchema(items=make_bgl(size), next_cursor="eyJpZCI6eyJTIjoiMSJ9fQ")
+
+
+# NOTE: エンドポイント名: (戻り値の型, データの生成)
+ENDPOINTS: Dict[str, Any] = {
+    "GET /bgl/query": (List[BGLSchema], make_bgl),
+    "GET /bgl/query?limit": (BGLPageSchema, make_bgl_page),
+    "GET /hba1c/query": (List[Hba1cSchema], make_hba1c),
+    "GET /bgl-and-hba1c/query": (List[BGLAndHba1cSchema], make_bgl_and_hba1c),
+}
+
+
+def build_app(return_type: Any, content: Any) -> APIGatewayRestResolver:
+    app = APIGatewayRestResolver(enable_validation=True)
+
+    def before() -> Any:
+        return content
+
+    def after() -> Response[str]:
+        return json_response(dump_json(return_type, content))
+
+    # NOTE: 戻り値の型で検証されるように、関数ごとに型注釈を付け替える
+    before.__annotations__["return"] = return_type
+    app.get("/before")(before)
+    app.get("/after")(after)
+    return app
+
+
+def event(path: str) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {},
+        "queryStringParameters": None,
+        "requestContext": {"requestId": "bench", "stage": "v1"},
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def elapsed_ms(fn: Callable[[], Dict[str, Any]]) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<26} {'items':>7} {'before(ms)':>11} {'after(ms)':>10} {'speedup':>8}")
+    for name, (return_type, make) in ENDPOINTS.items():
+        for size in args.sizes:
+            app = build_app(return_type, make(size))
+            before = app.resolve(event("/before"), {})
+            after = app.resolve(event("/after"), {})
+            assert before["statusCode"] == after["statusCode"] == 200
+            assert json.loads(before["body"]) == json.loads(after["body"])
+            before_ms = elapsed_ms(lambda: app.resolve(event("/before"), {}))
+            after_ms = elapsed_ms(lambda: app.resolve(event("/after"), {}))
+            print(
+                f"{name:<26} {size:>7} {before_ms:>11.1f} {after_ms:>10.1f}"
+                f" {before_ms / after_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""live-indexによる読み込みキャパシティ(RCU)の削減量を計測するベンチマーク
+
+1人のユーザーに有効なデータと論理削除済みのデータを投入し、同じ期間を次の3通りで読みます。
+
+- base: ベーステーブルをQueryしてPythonで論理削除を除外(以前の実装)
+- base+filter: ベーステーブルのQueryにFilterExpressionを付与(消費RCUは変わらない)
+- live-index: 論理削除されていないデータだけを持つスパースGSIをQuery(現在の実装)
+
+DynamoDB Localに対して実行します。
+`rcu`はDynamoDBが返したConsumedCapacity、`est_rcu`は読み込んだ件数と平均アイテムサイズから
+結果整合性読み込み(4KBあたり0.5RCU)として見積もった値です。
+
+    docker compose up -d
+    STAGE=local PYTHONPATH=src/v1 python benchmarks/live_index.py --live 500 --deleted 5000
+"""
+
+# Standard Library
+import argparse
+import math
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("STAGE", "local")
+
+# Third Party Library
+import boto3  # noqa: E402
+from database.base import BGLModel  # noqa: E402
+from database.migrations import ensure_global_secondary_indexes  # noqa: E402
+from schemas.event_timing import EventTiming  # noqa: E402
+from schemas.sunao_foods import SunaoFoods  # noqa: E402
+
+
+def _client() -> Any:
+    return boto3.client(
+        "dynamodb",
+        region_name=BGLModel.Meta.region,
+        endpoint_url=getattr(BGLModel.Meta, "host", None),
+    )
+
+
+def _seed(user_id: str, live: int, deleted: int, start: datetime) -> None:
+    # NOTE: 1件ごとに1分ずらして、同じ期間に有効なデータと論理削除済みのデータを混ぜる
+    total = live + deleted
+    step = max(total // max(deleted, 1), 1)
+    with BGLModel.batch_write() as batch:
+        for index in range(total):
+            is_deleted = deleted > 0 and index % step == 0 and index // step < deleted
+            batch.save(
+                BGLModel(
+                    user_id=user_id,
+                    id=uuid.uuid4().hex,
+                    value=100,
+                    event_timing=EventTiming("空腹時"),
+                    record_time=start + timedelta(minutes=index),
+                    sunao_food=SunaoFoods("パスタ"),
+                    is_deleted=is_deleted,
+                    live_user_id=None if is_deleted else user_id,
+                )
+            )
+
+
+def _cleanup(user_id: str) -> None:
+    with BGLModel.batch_write() as batch:
+        for item in BGLModel.query(user_id):
+            batch.delete(item)
+
+
+def _item_size(item: Dict[str, Any]) -> int:
+    # NOTE: 属性名と値の長さの合計(DynamoDBのアイテムサイズの近似)
+    return sum(len(name) + len(str(next(iter(value.values())))) for name, value in item.items())
+
+
+def _query(client: Any, **kwargs: Any) -> Tuple[int, int, int, float]:
+    count = 0
+    scanned = 0
+    size = 0
+    capacity = 0.0
+    paginator = client.get_paginator("query")
+    for page in paginator.paginate(
+        TableName=BGLModel.Meta.table_name, ReturnConsumedCapacity="TOTAL", **kwargs
+    ):
+        count += page["Count"]
+        scanned += page["ScannedCount"]
+        size += sum(_item_size(item) for item in page["Items"])
+        capacity += page["ConsumedCapacity"]["CapacityUnits"]
+    return count, scanned, size, capacity
+
+
+def run(live: int, deleted: int) -> List[Dict[str, Any]]:
+    if not BGLModel.exists():
+        BGLModel.create_table(wait=True, billing_mode="PAY_PER_REQUEST")
+    ensure_global_secondary_indexes(BGLModel)
+
+    user_id = f"bench-{uuid.uuid4().hex}"
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    _seed(user_id, live, deleted, start)
+    _from = BGLModel.record_time.serialize(start)
+    _to = BGLModel.record_time.serialize(start + timedelta(minutes=live + deleted))
+    values = {":user_id": {"S": user_id}, ":from": {"S": _from}, ":to": {"S": _to}}
+    client = _client()
+    try:
+        cases = {
+            "base": dict(
+                KeyConditionExpression="user_id = :user_id AND record_time BETWEEN :from AND :to",
+                ExpressionAttributeValues=values,
+            ),
+            "base+filter": dict(
+                KeyConditionExpression="user_id = :user_id AND record_time BETWEEN :from AND :to",
+                FilterExpression="is_deleted = :false",
+                ExpressionAttributeValues={**values, ":false": {"BOOL": False}},
+            ),
+            "live-index": dict(
+                IndexName="live-index",
+                KeyConditionExpression=(
+                    "live_user_id = :user_id AND record_time BETWEEN :from AND :to"
+                ),
+                ExpressionAttributeValues=values,
+            ),
+        }
+        results = []
+        average_size = 0.0
+        for name, kwargs in cases.items():
+            count, scanned, size, capacity = _query(client, **kwargs)
+            if not average_size and count:
+                average_size = size / count
+            results.append(
+                {
+                    "case": name,
+                    "items": count,
+                    "scanned": scanned,
+                    "rcu": capacity,
+                    "est_rcu": math.ceil(scanned * average_size / 4096) * 0.5,
+                }
+            )
+        return results
+    finally:
+        _cleanup(user_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", type=int, default=500, help="有効なデータ件数")
+    parser.add_argument("--deleted", type=int, default=5000, help="論理削除済みのデータ件数")
+    args = parser.parse_args()
+
+    results = run(args.live, args.deleted)
+    baseline = results[0]["est_rcu"] or 1.0
+    print(f"live={args.live} deleted={args.deleted}")
+    print(f"{'case':<12} {'items':>8} {'scanned':>8} {'rcu':>8} {'est_rcu':>8} {'ratio':>6}")
+    for result in results:
+        print(
+            f"{result['case']:<12} {result['items']:>8} {result['scanned']:>8}"
+            f" {result['rcu']:>8.1f} {result['est_rcu']:>8.1f}"
+            f" {result['est_rcu'] / baseline:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
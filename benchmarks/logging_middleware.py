@@ -0,0 +1,113 @@
+"""`log_request_response`(リクエスト・レスポンスのログ)のベンチマーク
+
+一覧系エンドポイントと同じ大きさのレスポンスで、ミドルウェアのオーバーヘッドを次の3通りで比べます。
+
+- before: イベント全体と`result.__dict__`をログに出力する(以前の実装)
+- after: 要約(ヘッダーのマスクと切り詰めたボディ)だけをログに出力する(現在の実装)
+- sampled: デバッグのサンプリングに当たり、ボディ全体をログに出力する(現在の実装)
+
+ミドルウェアなし(none)を含め、`resolve`にかかった時間の中央値を表示します。
+ログは`/dev/null`に出力し(JSONへの変換の時間は含む)、DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/logging_middleware.py --sizes 100 1000 10000
+"""
+
+# Standard Library
+import argparse
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Third Party Library
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
+from aws_lambda_powertools.event_handler.middlewares import NextMiddleware
+from helper.json_response import dump_json, json_response
+from json_response import make_bgl
+from middlewares import common
+from schemas.bgl import BGLSchema
+
+REPEAT = 50
+
+
+def legacy_log_request_response(
+    app: APIGatewayRestResolver, next_middleware: NextMiddleware
+) -> Response:
+    common.logger.info(
+        "Incoming request", path=app.current_event.path, request=app.current_event.raw_event
+    )
+    result = next_middleware(app)
+    common.logger.info("Response received", response=result.__dict__)
+    return result
+
+
+def build_app(body: bytes, middleware: Optional[Callable[..., Response]]) -> APIGatewayRestResolver:
+    app = APIGatewayRestResolver(enable_validation=True)
+    if middleware is not None:
+        app.use(middlewares=[middleware])
+
+    @app.get("/bgl/query")
+    def query() -> Response[str]:
+        return json_response(body)
+
+    return app
+
+
+def event() -> Dict[str, Any]:
+    return {
+        "path": "/bgl/query",
+        "httpMethod": "GET",
+        "headers": {
+            "Authorization": "Bearer " + "x" * 800,
+            "origin": "http://localhost:3000",
+            "User-Agent": "bench",
+        },
+        "queryStringParameters": {"userId": "bench"},
+        "requestContext": {"requestId": "bench", "stage": "v1", "path": "/v1/bgl/query"},
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def median_ms(app: APIGatewayRestResolver) -> float:
+    app.resolve(event(), {})
+    timings: List[float] = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        app.resolve(event(), {})
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    # NOTE: 出力先の時間ではなく、ログの組み立てとJSONへの変換の時間を計測する
+    common.logger.setLevel("INFO")
+    with open(os.devnull, "w") as devnull:
+        for handler in common.logger.handlers:
+            handler.setStream(devnull)  # type: ignore[attr-defined]
+
+        print(
+            f"{'items':>7} {'body(KB)':>9} {'none(ms)':>9}"
+            f" {'before(ms)':>11} {'after(ms)':>10} {'sampled(ms)':>12}"
+        )
+        for size in args.sizes:
+            body = dump_json(List[BGLSchema], make_bgl(size))
+            baseline = median_ms(build_app(body, None))
+            before = median_ms(build_app(body, legacy_log_request_response))
+            common.LOG_DEBUG_SAMPLE_RATES = {}
+            common.LOG_DEBUG_SAMPLE_RATE = 0.0
+            after = median_ms(build_app(body, common.log_request_response))
+            common.LOG_DEBUG_SAMPLE_RATE = 1.0
+            sampled = median_ms(build_app(body, common.log_request_response))
+            print(
+                f"{size:>7} {len(body) / 1024:>9.1f} {baseline:>9.2f}"
+                f" {before:>11.2f} {after:>10.2f} {sampled:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
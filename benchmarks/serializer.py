@@ -0,0 +1,102 @@
+"""DynamoDBのアイテムからレスポンススキーマへの変換(serializer)のマイクロベンチマーク
+
+以前の`serializer`(isoformatで文字列にした辞書をスキーマで検証し直す)と、
+現在の`serializer`(pynamodbが型変換済みの`attribute_values`をそのまま検証する)を比べます。
+`response`列は、Powertoolsがレスポンスを返すときと同じ検証とJSON変換を含めた時間です。
+DynamoDBには接続しません。
+
+    PYTHONPATH=src/v1 python benchmarks/serializer.py --sizes 1000 10000 50000
+"""
+
+# Standard Library
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List
+
+# Third Party Library
+from database.base import BGLModel
+from pydantic import TypeAdapter
+from schemas.bgl import BGLSchema
+from schemas.event_timing import EventTiming
+from schemas.sunao_foods import SunaoFoods
+
+response_adapter = TypeAdapter(List[BGLSchema])
+
+
+def legacy_serializer(item: BGLModel) -> BGLSchema:
+    """以前の実装"""
+    serialized_data = {
+        "id": item.id,
+        "user_id": item.user_id,
+        "value": item.value,
+        "event_timing": item.event_timing.value,
+        "sunao_food": item.sunao_food,
+        "is_deleted": item.is_deleted,
+        "record_time": item.record_time.isoformat(),
+        "created_at": item.created_at.isoformat(),
+        "updated_at": item.updated_at.isoformat(),
+        "version": item.version,
+    }
+    return BGLSchema(**serialized_data)
+
+
+def make_items(size: int) -> List[BGLModel]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        BGLModel(
+            user_id="bench",
+            id=f"{index}",
+            value=100 + index % 50,
+            event_timing=EventTiming.EMPTY_STOMACH,
+            record_time=start + timedelta(minutes=5 * index),
+            sunao_food=SunaoFoods.PASTA if index % 3 == 0 else None,
+            created_at=start,
+            updated_at=start,
+        )
+        for index in range(size)
+    ]
+
+
+def response(schemas: List[BGLSchema]) -> str:
+    # NOTE: Powertoolsのレスポンス検証とJSON変換に相当する処理
+    validated = response_adapter.validate_python(schemas)
+    return json.dumps(response_adapter.dump_python(validated, mode="json", by_alias=True))
+
+
+def per_item_us(fn: Callable[[], Any], size: int) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) / size * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print("per item (us)")
+    print(
+        f"{'items':>7} {'legacy':>8} {'fast':>8} {'speedup':>8}"
+        f" {'legacy+response':>16} {'fast+response':>14}"
+    )
+    for size in args.sizes:
+        items = make_items(size)
+        assert response([legacy_serializer(item) for item in items]) == response(
+            [item.serializer() for item in items]
+        )
+        legacy = per_item_us(lambda: [legacy_serializer(item) for item in items], size)
+        fast = per_item_us(lambda: [item.serializer() for item in items], size)
+        legacy_total = per_item_us(
+            lambda: response([legacy_serializer(item) for item in items]), size
+        )
+        fast_total = per_item_us(lambda: response([item.serializer() for item in items]), size)
+        print(
+            f"{size:>7} {legacy:>8.2f} {fast:>8.2f} {legacy / fast:>7.1f}x"
+            f" {legacy_total:>16.2f} {fast_total:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
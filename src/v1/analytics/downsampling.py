@@ -0,0 +1,149 @@
+# Standard Library
+from datetime import datetime, timezone
+from typing import Iterable, List, Protocol, Sequence, Tuple, TypeVar
+
+# Third Party Library
+import numpy as np
+import numpy.typing as npt
+from schemas.downsampling import Resolution, ValueBucketSchema
+
+RESOLUTION_SECONDS = {
+    Resolution.HOURLY: 60 * 60,
+    Resolution.DAILY: 24 * 60 * 60,
+    Resolution.WEEKLY: 7 * 24 * 60 * 60,
+}
+# NOTE: UNIX時間の0(1970-01-01)は木曜日なので、3日ずらして週を月曜日から始める
+WEEK_START_OFFSET = 3 * 24 * 60 * 60
+
+
+class Reading(Protocol):
+    @property
+    def record_time(self) -> datetime: ...
+
+    @property
+    def value(self) -> float: ...
+
+
+R = TypeVar("R", bound=Reading)
+
+
+def to_arrays(
+    readings: Iterable[Tuple[datetime, float]],
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Load readings into a UNIX time array (seconds) and a value array
+
+    Args:
+        readings (Iterable[Tuple[datetime, float]]): record time (timezone aware) and value
+
+    Returns:
+        Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: UNIX times, values
+    """
+    seconds = []
+    values = []
+    for record_time, value in readings:
+        seconds.append(record_time.timestamp())
+        values.append(value)
+    return np.asarray(seconds, dtype=np.float64), np.asarray(values, dtype=np.float64)
+
+
+def bucket_stats(
+    seconds: npt.NDArray[np.float64], values: npt.NDArray[np.float64], resolution: Resolution
+) -> List[ValueBucketSchema]:
+    """Count, mean, min and max of the values in each hour, day or week (UTC)
+
+    The readings must be sorted by time, as DynamoDB returns them: each bucket is then a
+    contiguous slice, aggregated for every bucket at once with `np.ufunc.reduceat`.
+    Buckets without readings are not returned.
+
+    Args:
+        seconds (npt.NDArray[np.float64]): UNIX time of each value, in ascending order
+        values (npt.NDArray[np.float64]): values
+        resolution (Resolution): HOURLY, DAILY or WEEKLY
+
+    Returns:
+        List[ValueBucketSchema]: buckets with readings, in time order
+    """
+    if not len(values):
+        return []
+    width = RESOLUTION_SECONDS[resolution]
+    offset = WEEK_START_OFFSET if resolution == Resolution.WEEKLY else 0
+    buckets = (seconds.astype(np.int64) + offset) // width
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    counts = np.diff(np.append(starts, len(values)))
+    means = np.add.reduceat(values, starts) / counts
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    return [
+        ValueBucketSchema(
+            start=datetime.fromtimestamp(bucket * width - offset, tz=timezone.utc),
+            count=count,
+            mean=round(mean, 2),
+            min_value=min_value,
+            max_value=max_value,
+        )
+        for bucket, count, mean, min_value, max_value in zip(
+            buckets[starts].tolist(),
+            counts.tolist(),
+            means.tolist(),
+            mins.tolist(),
+            maxs.tolist(),
+        )
+    ]
+
+
+def lttb_indices(
+    x: npt.NDArray[np.float64], y: npt.NDArray[np.float64], max_points: int
+) -> npt.NDArray[np.intp]:
+    """Pick at most `max_points` points that keep the shape of the line (Largest-Triangle-Three-Buckets)
+
+    The first and the last points are kept. The points between them are split into
+    `max_points - 2` buckets, and from each bucket the point that makes the largest triangle
+    with the point picked from the previous bucket and the mean of the next bucket is kept,
+    so the peaks and dips survive unlike with plain averaging.
+
+    Args:
+        x (npt.NDArray[np.float64]): x of the points, in ascending order
+        y (npt.NDArray[np.float64]): y of the points
+        max_points (int): maximum number of points to keep (3 or more)
+
+    Returns:
+        npt.NDArray[np.intp]: indices of the kept points, in ascending order
+    """
+    size = len(x)
+    if size <= max_points or max_points < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, max_points - 1).astype(np.intp)
+    edges[-1] = size - 1
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # NOTE: 三角形の面積の2倍。大小を比べるだけなので1/2は省く
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(items: Sequence[R], max_points: int) -> List[R]:
+    """Keep at most `max_points` readings with `lttb_indices`, plotting time against value
+
+    Args:
+        items (Sequence[R]): readings sorted by record time
+        max_points (int): maximum number of readings to keep
+
+    Returns:
+        List[R]: kept readings, in the same order
+    """
+    if len(items) <= max_points:
+        return list(items)
+    seconds, values = to_arrays((item.record_time, item.value) for item in items)
+    return [items[index] for index in lttb_indices(seconds, values, max_points).tolist()]
@@ -0,0 +1,121 @@
+# Standard Library
+from typing import Iterable, Optional, Tuple
+
+# Third Party Library
+import numpy as np
+import numpy.typing as npt
+from schemas.event_timing import EventTiming
+from schemas.glucose_stats import BGLStatsSchema, EventTimingGlucoseStatsSchema, GlucoseStatsSchema
+
+EVENT_TIMINGS = tuple(EventTiming)
+_EVENT_TIMING_CODES = {event_timing: code for code, event_timing in enumerate(EVENT_TIMINGS)}
+
+# NOTE: GMI(%) = 3.31 + 0.02392 × 平均血糖値(mg/dl)
+GMI_INTERCEPT = 3.31
+GMI_SLOPE = 0.02392
+
+
+def to_arrays(
+    readings: Iterable[Tuple[float, EventTiming]],
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]:
+    """Load readings into a value array and an event timing code array
+
+    Args:
+        readings (Iterable[Tuple[float, EventTiming]]): value and event timing of each reading
+
+    Returns:
+        Tuple[npt.NDArray[np.float64], npt.NDArray[np.intp]]: values, and the index of each
+            event timing in EVENT_TIMINGS
+    """
+    values = []
+    codes = []
+    for value, event_timing in readings:
+        values.append(value)
+        codes.append(_EVENT_TIMING_CODES[event_timing])
+    return np.asarray(values, dtype=np.float64), np.asarray(codes, dtype=np.intp)
+
+
+def _percent(part: float, whole: float) -> Optional[float]:
+    return round(part / whole * 100, 2) if whole else None
+
+
+def _group_stats(
+    count: float, total: float, squares: float, below: float, above: float
+) -> GlucoseStatsSchema:
+    if not count:
+        return GlucoseStatsSchema(count=0)
+    mean = total / count
+    # NOTE: 標本標準偏差(n-1で割る)。1件では求められない
+    sd = (squares / (count - 1)) ** 0.5 if count > 1 else None
+    return GlucoseStatsSchema(
+        count=int(count),
+        mean=round(mean, 2),
+        sd=round(sd, 2) if sd is not None else None,
+        cv=round(sd / mean * 100, 2) if sd is not None and mean else None,
+        gmi=round(GMI_INTERCEPT + GMI_SLOPE * mean, 2),
+        time_below_range=_percent(below, count),
+        time_in_range=_percent(count - below - above, count),
+        time_above_range=_percent(above, count),
+    )
+
+
+def glucose_stats(
+    values: npt.NDArray[np.float64],
+    codes: npt.NDArray[np.intp],
+    target_low: float,
+    target_high: float,
+) -> BGLStatsSchema:
+    """Compute the glycemic metrics of a series, overall and by event timing
+
+    Every metric is computed for all the groups at once with `np.bincount`,
+    so the cost is a few passes over the arrays whatever the number of groups.
+    The time in/below/above range is the share of readings, since the readings are not
+    evenly spaced like a CGM.
+
+    Args:
+        values (npt.NDArray[np.float64]): glucose values (mg/dl)
+        codes (npt.NDArray[np.intp]): event timing code of each value (see `to_arrays`)
+        target_low (float): lower limit of the target range (inclusive)
+        target_high (float): upper limit of the target range (inclusive)
+
+    Returns:
+        BGLStatsSchema: metrics of the whole series and of each event timing with readings
+    """
+    groups = len(EVENT_TIMINGS)
+    counts = np.bincount(codes, minlength=groups).astype(np.float64)
+    totals = np.bincount(codes, weights=values, minlength=groups)
+    below = np.bincount(codes[values < target_low], minlength=groups)
+    above = np.bincount(codes[values > target_high], minlength=groups)
+
+    # NOTE: 二乗和からではなく平均からの偏差で分散を求める(桁落ちを避ける)
+    means = np.divide(totals, counts, out=np.zeros(groups), where=counts > 0)
+    squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=groups)
+    count = float(counts.sum())
+    mean = float(totals.sum()) / count if count else 0.0
+    overall = _group_stats(
+        count,
+        float(totals.sum()),
+        float(((values - mean) ** 2).sum()),
+        float(below.sum()),
+        float(above.sum()),
+    )
+    by_event_timing = [
+        EventTimingGlucoseStatsSchema(
+            event_timing=event_timing,
+            **_group_stats(
+                float(counts[code]),
+                float(totals[code]),
+                float(squares[code]),
+                float(below[code]),
+                float(above[code]),
+            ).model_dump(),
+        )
+        for code, event_timing in enumerate(EVENT_TIMINGS)
+        if counts[code]
+    ]
+    return BGLStatsSchema(
+        **overall.model_dump(),
+        target_low=target_low,
+        target_high=target_high,
+        by_event_timing=by_event_timing,
+    )
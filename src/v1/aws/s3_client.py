@@ -1,10 +1,11 @@
 # Standard Library
 import os
+from typing import Any, Dict, List, Optional
 
 # Third Party Library
 import boto3
 
-S3_QRCODE_LOG_BUCKET = os.environ["S3_QRCODE_LOG_BUCKET"]
+S3_QRCODE_LOG_BUCKET = os.environ.get("S3_QRCODE_LOG_BUCKET", "")
 
 
 class S3Client:
@@ -15,3 +16,94 @@ class S3Client:
 
     def put_object(self, key: str, body: bytes) -> None:
         self.client.put_object(Bucket=self._bucket_name, Key=key, Body=body)
+
+    def generate_presigned_url(self, key: str, expires_in: int) -> str:
+        """Create a URL to download the object without AWS credentials
+
+        Args:
+            key (str): object key
+            expires_in (int): lifetime of the URL in seconds
+
+        Returns:
+            str: presigned GET URL
+        """
+        return self.client.generate_presigned_url(  # type: ignore
+            "get_object",
+            Params={"Bucket": self._bucket_name, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def open_writer(self, key: str, content_type: str) -> "S3MultipartWriter":
+        return S3MultipartWriter(self, key, content_type)
+
+
+class S3MultipartWriter:
+    """Upload an object part by part so that only one part is held in memory
+
+    Objects smaller than one part are uploaded with a single PutObject.
+    """
+
+    # NOTE: S3のマルチパートアップロードの最小パートサイズは5MiB
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, s3: S3Client, key: str, content_type: str) -> None:
+        self._s3 = s3
+        self.key = key
+        self._content_type = content_type
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    @property
+    def _bucket(self) -> str:
+        return self._s3._bucket_name
+
+    def write(self, data: bytes) -> None:
+        self._buffer.extend(data)
+        if len(self._buffer) >= self.PART_SIZE:
+            self._upload_part()
+
+    def _upload_part(self) -> None:
+        if self._upload_id is None:
+            upload = self._s3.client.create_multipart_upload(
+                Bucket=self._bucket, Key=self.key, ContentType=self._content_type
+            )
+            self._upload_id = upload["UploadId"]
+        part_number = len(self._parts) + 1
+        part = self._s3.client.upload_part(
+            Bucket=self._bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append({"ETag": part["ETag"], "PartNumber": part_number})
+        self._buffer.clear()
+
+    def close(self) -> None:
+        """Upload the remaining bytes and finish the object"""
+        if self._upload_id is None:
+            self._s3.client.put_object(
+                Bucket=self._bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                ContentType=self._content_type,
+            )
+            self._buffer.clear()
+            return
+        if self._buffer:
+            self._upload_part()
+        self._s3.client.complete_multipart_upload(
+            Bucket=self._bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    def abort(self) -> None:
+        """Discard the parts uploaded so far"""
+        if self._upload_id is not None:
+            self._s3.client.abort_multipart_upload(
+                Bucket=self._bucket, Key=self.key, UploadId=self._upload_id
+            )
+        self._buffer.clear()
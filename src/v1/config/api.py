@@ -10,3 +10,39 @@ APP_API_CORS_ALLOWED_ORIGINS = os.environ.get(
     "APP_API_CORS_ALLOWED_ORIGINS",
     "http://localhost:3000,http://localhost:3005",
 ).split(",")
+
+# NOTE: 開発用エクスポートの書き出し先(未設定の場合はS3への書き出しを受け付けない)
+S3_EXPORT_BUCKET = os.environ.get("S3_EXPORT_BUCKET", "")
+
+# NOTE: ローカル環境でのみ、Lambdaの起動時に足りないテーブルを作成する(それ以外は`task migrate`で作成する)
+AUTO_CREATE_TABLES = STAGE == "local" and os.environ.get("AUTO_CREATE_TABLES", "").lower() == "true"
+
+# NOTE: リクエスト・レスポンスのログに残すボディの最大文字数
+LOG_BODY_MAX_LENGTH = int(os.environ.get("LOG_BODY_MAX_LENGTH", "1024"))
+# NOTE: ボディ全体をログに残すリクエストの割合(0〜1)
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "0"))
+# NOTE: パスごとのLOG_DEBUG_SAMPLE_RATE(例: "/bgl/query=0.01,/swagger=0")。最も長く一致したパスの値を使う
+LOG_DEBUG_SAMPLE_RATES = {
+    path.strip(): float(rate)
+    for path, rate in (
+        item.split("=", 1)
+        for item in os.environ.get("LOG_DEBUG_SAMPLE_RATES", "").split(",")
+        if "=" in item
+    )
+}
+# NOTE: ログに値を残さないリクエストヘッダー
+_redacted_headers = os.environ.get("LOG_REDACTED_HEADERS", "authorization,cookie,x-api-key")
+LOG_REDACTED_HEADERS = {
+    header.strip().lower() for header in _redacted_headers.split(",") if header.strip()
+}
+
+# NOTE: レスポンスヘッダー(X-DynamoDB-Stats)でリクエスト中のDynamoDBの呼び出し回数・消費キャパシティを返す
+DYNAMODB_STATS_HEADER = os.environ.get("DYNAMODB_STATS_HEADER", "").lower() == "true"
+
+# NOTE: 書き込みが結果整合性のlive-indexに反映されるまで待つ秒数。
+# ユーザーの最後の書き込みからこの秒数が経つまでは、取得系のレスポンスにETagを付けない
+LIVE_INDEX_LAG_SECONDS = float(os.environ.get("LIVE_INDEX_LAG_SECONDS", "5"))
+
+# NOTE: AGP(/bgl/agp)の結果をコンテナ内でキャッシュする秒数(既定は300秒、0でキャッシュしない)。
+# キャッシュはデータのバージョンごとなので、秒数を長くしても古い結果は返らず、メモリに残る時間だけが変わる
+AGP_CACHE_TTL = int(os.environ.get("AGP_CACHE_TTL", "300"))
@@ -1,9 +1,20 @@
 # Standard Library
-from typing import List
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
 
 # Third Party Library
 from aws_lambda_powertools.event_handler.exceptions import NotFoundError
-from schemas.bgl import BGLCreateRequestSchema, BGLSchema, BGLUpdateRequestSchema
+from helper.export import ExportResult
+from schemas.agp import AGPSchema
+from schemas.bgl import (
+    BGLBatchCreateResponseSchema,
+    BGLBatchIdResponseSchema,
+    BGLCreateRequestSchema,
+    BGLSchema,
+    BGLUpdateRequestSchema,
+)
+from schemas.downsampling import Resolution
+from schemas.glucose_stats import BGLStatsSchema
 from services.bgl_service import BGLService
 
 
@@ -12,8 +23,13 @@ class BGLController:
     def __init__(self) -> None:
         self.service = BGLService()
 
-    def find_all(self) -> List[BGLSchema]:
-        return self.service.find_all()  # type: ignore
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        return self.service.export_all(write, last_evaluated_key, max_bytes)
 
     def find_one(self, id: str) -> BGLSchema:
         if not self.service.is_exist(id):
@@ -23,9 +39,16 @@ class BGLController:
     def create_one(self, data: BGLCreateRequestSchema) -> BGLSchema:
         return self.service.create_one(data)
 
+    def create_many(self, data: List[BGLCreateRequestSchema]) -> BGLBatchCreateResponseSchema:
+        return self.service.create_many(data)
+
+    def find_many(self, ids: List[str]) -> BGLBatchIdResponseSchema:
+        return self.service.find_many(ids)
+
+    def delete_many(self, ids: List[str]) -> BGLBatchIdResponseSchema:
+        return self.service.delete_many(ids)
+
     def update_one(self, id: str, data: BGLUpdateRequestSchema) -> BGLSchema:
-        if not self.service.is_exist(id):
-            raise NotFoundError("BGL not found.")
         return self.service.update_one(id, data)
 
     def delete_one(self, id: str) -> BGLSchema:
@@ -33,5 +56,44 @@ class BGLController:
             raise NotFoundError("BGL not found.")
         return self.service.delete_one(id)
 
-    def find_many_by_user_id(self, user_id: str, _from: str, _to: str) -> List[BGLSchema]:
-        return self.service.find_many_by_user_id(user_id, _from, _to)  # type: ignore
+    def find_many_json_by_user_id(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        return self.service.find_many_json_by_user_id(user_id, _from, _to)  # type: ignore
+
+    def find_page_json_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bytes:
+        return self.service.find_page_json_by_user_id(  # type: ignore
+            user_id, _from, _to, limit, last_evaluated_key
+        )
+
+    def find_summary_json(self, user_id: str, _from: date, _to: date) -> bytes:
+        return self.service.find_summary_json(user_id, _from, _to)  # type: ignore
+
+    def find_stats_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, target_low: float, target_high: float
+    ) -> BGLStatsSchema:
+        return self.service.find_stats_by_user_id(user_id, _from, _to, target_low, target_high)
+
+    def find_agp_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, bucket_minutes: int, utc_offset: int
+    ) -> AGPSchema:
+        return self.service.find_agp_by_user_id(user_id, _from, _to, bucket_minutes, utc_offset)
+
+    def find_buckets_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        return self.service.find_buckets_json_by_user_id(  # type: ignore
+            user_id, _from, _to, resolution
+        )
+
+    def find_downsampled_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        return self.service.find_downsampled_json_by_user_id(  # type: ignore
+            user_id, _from, _to, max_points
+        )
@@ -1,14 +1,31 @@
 # Standard Library
-from typing import List
+from datetime import datetime
 
 # Third Party Library
-from schemas.bgl_and_hba1c import BGLAndHba1cSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cCreateRequestSchema, BGLAndHba1cSchema
+from schemas.downsampling import Resolution
 from services.bgl_and_hba1c_service import BGLAndHba1cService
 
 
 class BGLAndHba1cController:
 
-    def combine_bgl_and_hba1c_list(
-        self, user_id: str, _from: str, _to: str
-    ) -> List[BGLAndHba1cSchema]:
-        return BGLAndHba1cService().combine_bgl_and_hba1c_list(user_id, _from, _to)  # type: ignore
+    def __init__(self) -> None:
+        self.service = BGLAndHba1cService()
+
+    def combine_bgl_and_hba1c_json(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        return self.service.combine_bgl_and_hba1c_json(user_id, _from, _to)  # type: ignore
+
+    def create_one(self, data: BGLAndHba1cCreateRequestSchema) -> BGLAndHba1cSchema:
+        return self.service.create_one(data)
+
+    def combine_buckets_json(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        return self.service.combine_buckets_json(user_id, _from, _to, resolution)  # type: ignore
+
+    def combine_downsampled_json(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        return self.service.combine_downsampled_json(  # type: ignore
+            user_id, _from, _to, max_points
+        )
@@ -1,9 +1,18 @@
 # Standard Library
-from typing import List
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
 
 # Third Party Library
 from aws_lambda_powertools.event_handler.exceptions import NotFoundError
-from schemas.hba1c import Hba1cCreateRequestSchema, Hba1cSchema, Hba1cUpdateRequestSchema
+from helper.export import ExportResult
+from schemas.downsampling import Resolution
+from schemas.hba1c import (
+    Hba1cBatchCreateResponseSchema,
+    Hba1cBatchIdResponseSchema,
+    Hba1cCreateRequestSchema,
+    Hba1cSchema,
+    Hba1cUpdateRequestSchema,
+)
 from services.hba1c_service import Hba1cService
 
 
@@ -12,8 +21,13 @@ class Hba1cController:
     def __init__(self) -> None:
         self.service = Hba1cService()
 
-    def find_all(self) -> List[Hba1cSchema]:
-        return self.service.find_all()  # type: ignore
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        return self.service.export_all(write, last_evaluated_key, max_bytes)
 
     def find_one(self, id: str) -> Hba1cSchema:
         if not self.service.is_exist(id):
@@ -23,9 +37,16 @@ class Hba1cController:
     def create_one(self, data: Hba1cCreateRequestSchema) -> Hba1cSchema:
         return self.service.create_one(data)
 
+    def create_many(self, data: List[Hba1cCreateRequestSchema]) -> Hba1cBatchCreateResponseSchema:
+        return self.service.create_many(data)
+
+    def find_many(self, ids: List[str]) -> Hba1cBatchIdResponseSchema:
+        return self.service.find_many(ids)
+
+    def delete_many(self, ids: List[str]) -> Hba1cBatchIdResponseSchema:
+        return self.service.delete_many(ids)
+
     def update_one(self, id: str, data: Hba1cUpdateRequestSchema) -> Hba1cSchema:
-        if not self.service.is_exist(id):
-            raise NotFoundError("Hba1c not found.")
         return self.service.update_one(id, data)
 
     def delete_one(self, id: str) -> Hba1cSchema:
@@ -33,5 +54,34 @@ class Hba1cController:
             raise NotFoundError("Hba1c not found.")
         return self.service.delete_one(id)
 
-    def find_many_by_user_id(self, user_id: str, _from: str, _to: str) -> List[Hba1cSchema]:
-        return self.service.find_many_by_user_id(user_id, _from, _to)  # type: ignore
+    def find_many_json_by_user_id(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        return self.service.find_many_json_by_user_id(user_id, _from, _to)  # type: ignore
+
+    def find_page_json_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bytes:
+        return self.service.find_page_json_by_user_id(  # type: ignore
+            user_id, _from, _to, limit, last_evaluated_key
+        )
+
+    def find_summary_json(self, user_id: str, _from: date, _to: date) -> bytes:
+        return self.service.find_summary_json(user_id, _from, _to)  # type: ignore
+
+    def find_buckets_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        return self.service.find_buckets_json_by_user_id(  # type: ignore
+            user_id, _from, _to, resolution
+        )
+
+    def find_downsampled_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        return self.service.find_downsampled_json_by_user_id(  # type: ignore
+            user_id, _from, _to, max_points
+        )
@@ -1,8 +1,9 @@
 # Standard Library
 from http import HTTPStatus
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 
 # Third Party Library
+from helper.export import ExportResult
 from schemas.user import UserCreateRequestSchema, UserSchema
 from services.user_service import UserService
 
@@ -12,12 +13,20 @@ class UserController:
     def __init__(self) -> None:
         self.service = UserService()
 
-    def find_all(self) -> List[UserSchema]:
-        return self.service.find_all()  # type: ignore
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        return self.service.export_all(write, last_evaluated_key, max_bytes)
 
     def find_one(self, user_id: str) -> UserSchema:
         return self.service.find_one(user_id)
 
+    def find_many(self, user_ids: List[str]) -> List[UserSchema]:
+        return self.service.find_many(user_ids)  # type: ignore
+
     def create_one(self, data: UserCreateRequestSchema) -> UserSchema:
         return self.service.create_one(data), HTTPStatus.CREATED
 
@@ -1,5 +1,6 @@
 # Standard Library
 from datetime import datetime
+from typing import Optional
 
 # Third Party Library
 from config.api import STAGE
@@ -8,11 +9,17 @@ from pynamodb.attributes import (
     BooleanAttribute,
     NumberAttribute,
     UnicodeAttribute,
+    UnicodeSetAttribute,
     UTCDateTimeAttribute,
 )
+from pynamodb.connection import Connection
+from pynamodb.exceptions import PynamoDBException, TransactWriteError
+from pynamodb.expressions.condition import Condition
+from pynamodb.indexes import AllProjection, GlobalSecondaryIndex
 from pynamodb.models import Model
 from pynamodb_attributes.unicode_enum import UnicodeEnumAttribute
 from schemas.bgl import BGLSchema
+from schemas.daily_summary import DailySummarySchema
 from schemas.event_timing import EventTiming
 from schemas.hba1c import Hba1cSchema
 from schemas.sunao_foods import SunaoFoods
@@ -21,6 +28,119 @@ from schemas.user import UserSchema
 # NOTE: This is local endpoint for DynamoDB
 DYNAMODB_LOCAL_ENDPOINT = "http://localhost:8000"
 
+# NOTE: idで1件を引くためのGSI名
+ID_INDEX_NAME = "id-index"
+# NOTE: 論理削除されていないデータだけを持つスパースなGSI名
+LIVE_INDEX_NAME = "live-index"
+# NOTE: DailySummaryModelのkind
+SUMMARY_KIND_BGL = "bgl"
+SUMMARY_KIND_HBA1C = "hba1c"
+
+# NOTE: TransactWriteItemsはテーブルをまたぐので、モデルとは別にコネクションを持つ
+transaction_connection = Connection(
+    region="ap-northeast-1", host=DYNAMODB_LOCAL_ENDPOINT if STAGE == "local" else None
+)
+
+
+def version_condition(attribute: NumberAttribute, version: Optional[int]) -> Condition:
+    """Build the optimistic locking condition for the expected version
+
+    Items written before the version attribute was added have no version,
+    so `None` means the attribute must not exist yet.
+
+    Args:
+        attribute (NumberAttribute): version attribute of the model
+        version (Optional[int]): expected version
+
+    Returns:
+        Condition: condition expression for the write
+    """
+    if version is None:
+        return attribute.does_not_exist()
+    return attribute == version
+
+
+def is_condition_failure(error: PynamoDBException) -> bool:
+    """Whether the write failed because its condition expression was not met
+
+    Args:
+        error (PynamoDBException): error raised by a conditional write or a transaction
+
+    Returns:
+        bool: True if the condition check failed
+    """
+    if isinstance(error, TransactWriteError):
+        return any(
+            reason is not None and reason.code == "ConditionalCheckFailed"
+            for reason in error.cancellation_reasons
+        )
+    return error.cause_response_code == "ConditionalCheckFailedException"
+
+
+def is_transaction_conflict(error: TransactWriteError) -> bool:
+    """Whether a transaction was cancelled because another request wrote one of its items
+
+    Args:
+        error (TransactWriteError): error raised by a transaction
+
+    Returns:
+        bool: True if it conflicted with another write
+    """
+    return any(
+        reason is not None and reason.code == "TransactionConflict"
+        for reason in error.cancellation_reasons
+    )
+
+
+class BGLIdIndex(GlobalSecondaryIndex["BGLModel"]):
+    """BGLデータをidで検索するためのGSI"""
+
+    class Meta:
+        index_name = ID_INDEX_NAME
+        projection = AllProjection()
+
+    id = UnicodeAttribute(hash_key=True)
+
+
+class Hba1cIdIndex(GlobalSecondaryIndex["Hba1cModel"]):
+    """Hba1cデータをidで検索するためのGSI"""
+
+    class Meta:
+        index_name = ID_INDEX_NAME
+        projection = AllProjection()
+
+    id = UnicodeAttribute(hash_key=True)
+
+
+class BGLLiveIndex(GlobalSecondaryIndex["BGLModel"]):
+    """論理削除されていないBGLデータだけを期間で検索するためのGSI
+
+    `live_user_id`は論理削除されていないデータにだけ設定されるので、
+    論理削除済みのデータはこのインデックスに含まれません。
+    """
+
+    class Meta:
+        index_name = LIVE_INDEX_NAME
+        projection = AllProjection()
+
+    live_user_id = UnicodeAttribute(hash_key=True)
+    record_time = UTCDateTimeAttribute(range_key=True)
+
+
+class Hba1cLiveIndex(GlobalSecondaryIndex["Hba1cModel"]):
+    """論理削除されていないHba1cデータだけを期間で検索するためのGSI
+
+    `live_user_id`は論理削除されていないデータにだけ設定されるので、
+    論理削除済みのデータはこのインデックスに含まれません。
+    """
+
+    class Meta:
+        index_name = LIVE_INDEX_NAME
+        projection = AllProjection()
+
+    live_user_id = UnicodeAttribute(hash_key=True)
+    record_time = UTCDateTimeAttribute(range_key=True)
+
 
 class BGLModel(Model):
     class Meta:
@@ -38,20 +158,21 @@ class BGLModel(Model):
     is_deleted = BooleanAttribute(default=False)
     created_at = UTCDateTimeAttribute(default=datetime.now)
     updated_at = UTCDateTimeAttribute(default=datetime.now)
+    version = NumberAttribute(null=True, default=1)
+    # NOTE: 論理削除されていない間だけuser_idと同じ値を持つ(live-indexのhash key)
+    live_user_id = UnicodeAttribute(null=True, default=None)
+
+    id_index = BGLIdIndex()
+    live_index = BGLLiveIndex()
 
     def serializer(self) -> BGLSchema:
-        serialized_data = {
-            "id": self.id,
-            "user_id": self.user_id,
-            "value": self.value,
-            "event_timing": self.event_timing.value,
-            "sunao_food": self.sunao_food,
-            "is_deleted": self.is_deleted,
-            "record_time": self.record_time.isoformat(),
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
-        return BGLSchema(**serialized_data)
+        """Convert the item into its response schema
+
+        `attribute_values` already holds typed values (datetimes, enums, numbers),
+        so they are validated as they are instead of being turned into isoformat
+        strings and parsed back. Attributes that are not in the schema are ignored.
+        """
+        return BGLSchema.model_validate(self.attribute_values)
 
 
 class Hba1cModel(Model):
@@ -70,20 +191,21 @@ class Hba1cModel(Model):
     is_deleted = BooleanAttribute(default=False)
     created_at = UTCDateTimeAttribute(default=datetime.now)
     updated_at = UTCDateTimeAttribute(default=datetime.now)
+    version = NumberAttribute(null=True, default=1)
+    # NOTE: 論理削除されていない間だけuser_idと同じ値を持つ(live-indexのhash key)
+    live_user_id = UnicodeAttribute(null=True, default=None)
+
+    id_index = Hba1cIdIndex()
+    live_index = Hba1cLiveIndex()
 
     def serializer(self) -> Hba1cSchema:
-        serialized_data = {
-            "id": self.id,
-            "user_id": self.user_id,
-            "value": self.value,
-            "event_timing": self.event_timing.value,
-            "sunao_food": self.sunao_food,
-            "is_deleted": self.is_deleted,
-            "record_time": self.record_time.isoformat(),
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
-        return Hba1cSchema(**serialized_data)
+        """Convert the item into its response schema
+
+        `attribute_values` already holds typed values (datetimes, enums, numbers),
+        so they are validated as they are instead of being turned into isoformat
+        strings and parsed back. Attributes that are not in the schema are ignored.
+        """
+        return Hba1cSchema.model_validate(self.attribute_values)
 
 
 class UserModel(Model):
@@ -100,12 +222,74 @@ class UserModel(Model):
     updated_at = UTCDateTimeAttribute(default=datetime.now)
 
     def serializer(self) -> UserSchema:
-        serialized_data = {
-            "id": self.id,
-            "term_agreed": True if self.term_agreed_at else False,
-            "term_agreed_at": self.term_agreed_at.isoformat() if self.term_agreed_at else None,
-            "is_deleted": self.is_deleted,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
-        return UserSchema(**serialized_data)
+        """Convert the item into its response schema from the typed attribute values"""
+        # NOTE: 値がNoneの属性はattribute_valuesに含まれないので、必須項目は明示的に渡す
+        return UserSchema.model_validate(
+            {
+                **self.attribute_values,
+                "term_agreed": self.term_agreed_at is not None,
+                "term_agreed_at": self.term_agreed_at,
+            }
+        )
+
+
+class DailySummaryModel(Model):
+    """ユーザー・日・時間帯ごとの血糖値/HbA1cの集計
+
+    `summary_key`は`{kind}#{日付(YYYY-MM-DD)}#{時間帯}`なので、
+    1回のQueryでユーザーの期間内の集計を日付順に取得できます。
+    論理削除されていないデータだけを集計し、書き込みのたびにその日の分を集計し直します。
+    """
+
+    class Meta:
+        table_name = f"{STAGE}_sunao_bgl_recording_daily_summary_table"
+        region = "ap-northeast-1"
+        if STAGE == "local":
+            host = DYNAMODB_LOCAL_ENDPOINT
+
+    user_id = UnicodeAttribute(hash_key=True)
+    summary_key = UnicodeAttribute(range_key=True)
+    # NOTE: SUMMARY_KIND_BGL / SUMMARY_KIND_HBA1C
+    kind = UnicodeAttribute()
+    date = UnicodeAttribute()
+    event_timing = UnicodeEnumAttribute(enum_type=EventTiming)
+    reading_count = NumberAttribute()
+    total = NumberAttribute()
+    sum_squares = NumberAttribute()
+    min_value = NumberAttribute()
+    max_value = NumberAttribute()
+    # NOTE: 集計し直すたびに1ずつ増やす。同じ日を同時に集計し直したときに、古い集計で上書きしないための楽観ロック
+    version = NumberAttribute(null=True)
+    updated_at = UTCDateTimeAttribute(default=datetime.now)
+
+    def serializer(self) -> DailySummarySchema:
+        """Convert the item into its response schema"""
+        return DailySummarySchema(
+            date=self.date,
+            event_timing=self.event_timing,
+            count=self.reading_count,
+            min_value=self.min_value,
+            max_value=self.max_value,
+            mean=self.total / self.reading_count,
+            sum_squares=self.sum_squares,
+        )
+
+
+class DataVersionModel(Model):
+    """ユーザーごとの血糖値/HbA1cデータのバージョン
+
+    血糖値・HbA1cの書き込み(登録・更新・削除)のたびに`data_version`を1ずつ増やします。
+    取得系のエンドポイントは、このバージョンからETagを作ります。
+    """
+
+    class Meta:
+        table_name = f"{STAGE}_sunao_bgl_recording_data_version_table"
+        region = "ap-northeast-1"
+        if STAGE == "local":
+            host = DYNAMODB_LOCAL_ENDPOINT
+
+    user_id = UnicodeAttribute(hash_key=True)
+    data_version = NumberAttribute(default=0)
+    # NOTE: 書き込み後に集計の更新に失敗した`{kind}#{日付}`。次に集計を読むときに集計し直す
+    dirty_summaries = UnicodeSetAttribute(null=True)
+    updated_at = UTCDateTimeAttribute(default=datetime.now)
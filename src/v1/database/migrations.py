@@ -0,0 +1,269 @@
+# Standard Library
+import argparse
+import time
+from typing import Any, Dict, List, Tuple, Type, Union
+
+# Third Party Library
+import boto3
+from aws_lambda_powertools import Logger
+from database.base import (
+    SUMMARY_KIND_BGL,
+    SUMMARY_KIND_HBA1C,
+    BGLModel,
+    DailySummaryModel,
+    DataVersionModel,
+    Hba1cModel,
+    UserModel,
+    is_condition_failure,
+)
+from pynamodb.exceptions import UpdateError
+from pynamodb.models import Model
+from repositories.daily_summary_repository import DailySummaryRepository
+from repositories.data_version_repository import DataVersionRepository
+from repositories.parallel_scan import ParallelScan
+
+logger = Logger("Migrations")
+
+# NOTE: GSIのバックフィル完了を確認する間隔(秒)
+INDEX_STATUS_POLL_INTERVAL = 5
+# NOTE: バックフィルで並列にScanするセグメント数
+BACKFILL_SCAN_SEGMENTS = 4
+# NOTE: APIが使う全てのテーブル
+MODELS: Tuple[Type[Model], ...] = (
+    BGLModel,
+    Hba1cModel,
+    UserModel,
+    DailySummaryModel,
+    DataVersionModel,
+)
+
+
+def _dynamodb_client(model: Type[Model]) -> Any:
+    """Create a low level DynamoDB client for the model's table
+
+    Args:
+        model (Type[Model]): pynamodb model
+
+    Returns:
+        Any: boto3 DynamoDB client
+    """
+    return boto3.client(
+        "dynamodb",
+        region_name=model.Meta.region,
+        endpoint_url=getattr(model.Meta, "host", None),
+    )
+
+
+def _index_statuses(model: Type[Model]) -> Dict[str, str]:
+    description = model.describe_table()
+    return {
+        index["IndexName"]: index["IndexStatus"]
+        for index in description.get("GlobalSecondaryIndexes", [])
+    }
+
+
+def create_missing_tables(models: Tuple[Type[Model], ...] = MODELS) -> List[str]:
+    """Create the tables that do not exist yet, with every GSI defined on the model
+
+    Args:
+        models (Tuple[Type[Model], ...], optional): models of the tables. Defaults to MODELS.
+
+    Returns:
+        List[str]: names of the created tables
+    """
+    created: List[str] = []
+    for model in models:
+        if model.exists():
+            continue
+        logger.info("Creating table", table=model.Meta.table_name)
+        model.create_table(wait=True, billing_mode="PAY_PER_REQUEST")
+        created.append(model.Meta.table_name)
+    return created
+
+
+def wait_for_indexes(model: Type[Model]) -> None:
+    """Block until every GSI of the table is ACTIVE
+
+    DynamoDB backfills a newly added GSI from the existing items by itself.
+    While backfilling, the index status is `CREATING` and queries against it are rejected.
+
+    Args:
+        model (Type[Model]): pynamodb model
+    """
+    while True:
+        pending = {
+            name: status for name, status in _index_statuses(model).items() if status != "ACTIVE"
+        }
+        if not pending:
+            return
+        logger.info("Waiting for index backfill", table=model.Meta.table_name, indexes=pending)
+        time.sleep(INDEX_STATUS_POLL_INTERVAL)
+
+
+def ensure_global_secondary_indexes(model: Type[Model], wait: bool = True) -> List[str]:
+    """Add the GSIs defined on the model that are missing on the existing table
+
+    DynamoDB accepts only one GSI creation per UpdateTable call,
+    so the indexes are created one by one.
+
+    Args:
+        model (Type[Model]): pynamodb model
+        wait (bool, optional): wait for the backfill of each index. Defaults to True.
+
+    Returns:
+        List[str]: names of the created indexes
+    """
+    schema = model._get_schema()
+    existing = _index_statuses(model)
+    client = _dynamodb_client(model)
+    created: List[str] = []
+    for index in schema["global_secondary_indexes"]:
+        if index["index_name"] in existing:
+            continue
+        logger.info("Creating index", table=model.Meta.table_name, index=index["index_name"])
+        client.update_table(
+            TableName=model.Meta.table_name,
+            AttributeDefinitions=index["attribute_definitions"],
+            GlobalSecondaryIndexUpdates=[
+                {
+                    "Create": {
+                        "IndexName": index["index_name"],
+                        "KeySchema": index["key_schema"],
+                        "Projection": index["projection"],
+                    }
+                }
+            ],
+        )
+        created.append(index["index_name"])
+        if wait:
+            wait_for_indexes(model)
+    return created
+
+
+def backfill_live_user_id(
+    model: Union[Type[BGLModel], Type[Hba1cModel]], total_segments: int = BACKFILL_SCAN_SEGMENTS
+) -> int:
+    """Set `live_user_id` on the live items written before the live-index existed
+
+    Items without `live_user_id` are not part of the sparse live-index,
+    so every item that is not soft-deleted needs it before the API reads from the index.
+    The update is conditional so that an item deleted during the backfill stays out of the index.
+    Running it again only touches items that are still missing the attribute.
+
+    Args:
+        model (Type[Model]): BGLModel or Hba1cModel
+        total_segments (int, optional): segments of the parallel scan.
+            Defaults to BACKFILL_SCAN_SEGMENTS.
+
+    Returns:
+        int: number of updated items
+    """
+    updated = 0
+    items = ParallelScan(
+        model,
+        total_segments=total_segments,
+        filter_condition=(model.is_deleted == False)  # noqa: E712
+        & model.live_user_id.does_not_exist(),
+    )
+    for item in items:
+        try:
+            item.update(
+                actions=[model.live_user_id.set(item.user_id)],
+                condition=(model.is_deleted == False),  # noqa: E712
+            )
+        except UpdateError as error:
+            if not is_condition_failure(error):
+                raise
+            continue
+        updated += 1
+    logger.info("Backfilled live_user_id", table=model.Meta.table_name, updated=updated)
+    return updated
+
+
+def backfill_daily_summaries(
+    model: Union[Type[BGLModel], Type[Hba1cModel]],
+    kind: str,
+    total_segments: int = BACKFILL_SCAN_SEGMENTS,
+) -> int:
+    """Build the daily summaries of every user of the table again
+
+    Only the user ids are collected by the scan (including users whose items are all
+    soft-deleted, and users who only have summaries left), then each user is rebuilt
+    from their own partition with `DailySummaryRepository.rebuild`: the summaries are written
+    with a version condition, so a summary refreshed by the API during the backfill is not
+    overwritten, and the summaries of days without live items are deleted.
+    The data versions of the users whose summaries changed are bumped
+    so that clients do not keep old summaries by ETag.
+
+    Args:
+        model (Union[Type[BGLModel], Type[Hba1cModel]]): BGLModel or Hba1cModel
+        kind (str): SUMMARY_KIND_BGL or SUMMARY_KIND_HBA1C
+        total_segments (int, optional): segments of the parallel scans.
+            Defaults to BACKFILL_SCAN_SEGMENTS.
+
+    Returns:
+        int: number of days whose summaries were replaced or deleted
+    """
+    user_ids = {item.user_id for item in ParallelScan(model, total_segments=total_segments)}
+    user_ids.update(
+        item.user_id
+        for item in ParallelScan(
+            DailySummaryModel,
+            total_segments=total_segments,
+            filter_condition=DailySummaryModel.kind == kind,
+        )
+    )
+    repository = DailySummaryRepository(model, kind)
+    data_version = DataVersionRepository()
+    replaced = 0
+    for user_id in sorted(user_ids):
+        days = repository.rebuild(user_id)
+        if days:
+            data_version.bump(user_id)
+        replaced += days
+    logger.info("Backfilled daily summaries", kind=kind, users=len(user_ids), replaced=replaced)
+    return replaced
+
+
+def backfill_all_daily_summaries() -> None:
+    """既存のデータから日ごとの集計を作り直す"""
+    backfill_daily_summaries(BGLModel, SUMMARY_KIND_BGL)
+    backfill_daily_summaries(Hba1cModel, SUMMARY_KIND_HBA1C)
+
+
+def migrate() -> None:
+    """テーブルを作成し、既存テーブルをモデル定義に追従させる
+
+    Lambdaの起動時にはテーブルを作成しないので、デプロイの前に実行します。
+    """
+    created = create_missing_tables()
+    for model in (BGLModel, Hba1cModel):
+        if model.Meta.table_name in created:
+            continue
+        ensure_global_secondary_indexes(model)
+        backfill_live_user_id(model)
+    # NOTE: 集計テーブルを作成したときは、既存のデータから集計を作る
+    if DailySummaryModel.Meta.table_name in created:
+        backfill_all_daily_summaries()
+
+
+def bootstrap() -> None:
+    """足りないテーブルだけを作成する(デプロイ時に実行する)"""
+    create_missing_tables()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DynamoDBのテーブルを作成・更新します")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["migrate", "bootstrap", "backfill-summaries"],
+        default="migrate",
+    )
+    args = parser.parse_args()
+    if args.command == "bootstrap":
+        bootstrap()
+    elif args.command == "backfill-summaries":
+        backfill_all_daily_summaries()
+    else:
+        migrate()
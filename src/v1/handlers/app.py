@@ -1,94 +1,42 @@
-# Standard Library
-from typing import List
-
 # Third Party Library
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver
-from aws_lambda_powertools.event_handler.openapi.models import Contact, Server
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from config.api import API_VERSION_HASH, APP_API_BASE_URL, STAGE
-from database.base import BGLModel, Hba1cModel, UserModel
-from middlewares.common import cors_middleware, handler_middleware, log_request_response
+from config.api import API_VERSION_HASH, AUTO_CREATE_TABLES
+from handlers.openapi import enable_swagger
+from middlewares.common import (
+    cors_middleware,
+    dynamodb_stats_middleware,
+    handler_middleware,
+    log_request_response,
+)
 from pydantic import BaseModel, Field
-from pydantic.networks import AnyUrl
-from routes import bgl, hba1c, user
+from routes import bgl, bgl_and_hba1c, hba1c, user
 from schemas.log_schema import LogSchema
 
 logger = Logger("ApplicationHandler")
 tracer = Tracer("ApplicationHandler")
 
 
-if not BGLModel.exists():
-    logger.info("Creating BGLModel table")
-    BGLModel.create_table(wait=True, billing_mode="PAY_PER_REQUEST")
-if not Hba1cModel.exists():
-    logger.info("Creating Hba1cModel table")
-    Hba1cModel.create_table(wait=True, billing_mode="PAY_PER_REQUEST")
-if not UserModel.exists():
-    logger.info("Creating UserModel table")
-    UserModel.create_table(wait=True, billing_mode="PAY_PER_REQUEST")
-
-local_server = Server(
-    url="http://localhost:3333", description="Local Development Server", variables=None
-)
-dev_server = Server(
-    url=APP_API_BASE_URL,
-    description="Development Server",
-    variables=None,
-)
-
-servers: List[Server] = []
-if STAGE == "local":
-    servers.append(local_server)
-if STAGE == "dev":
-    servers.append(dev_server)
+# NOTE: テーブルはデプロイ前に`task migrate`で作成する。コールドスタートでDescribeTableを呼ばないように、
+# ここで作成するのはAUTO_CREATE_TABLESを有効にしたローカル環境だけ
+if AUTO_CREATE_TABLES:
+    # NOTE: マイグレーション(boto3など)の読み込みもコールドスタートに含めないように、ここでimportする
+    # Third Party Library
+    from database.migrations import create_missing_tables
 
+    create_missing_tables()
 
 app = APIGatewayRestResolver(enable_validation=True)
 # ミドルウェアの登録
-app.use(middlewares=[log_request_response, cors_middleware])
-
-app.enable_swagger(
-    path="/swagger",
-    title="Glico SUNAO 血糖値レコーディングアプリAPI仕様書",
-    version=API_VERSION_HASH,
-    summary="Glico SUNAO 血糖値レコーディングアプリケーションのバックエンドAPIの仕様書です。",
-    description=f"""
-![グリコロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcSOeSsMRCo0cMhs1bP4fb-1D45pii-LkGZcpg&s)
-![SUNAOロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRcdtPpgEs9hfDcMxq_WJEZk7pAkHVkYtx_EA&s)
-![つばさ株式会社ロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTUF74Gsbwzr3N9Rsjok_lGoYgAa_r8CSZE0lV_HqlAAw&s)
-
-## 概要
+app.use(middlewares=[log_request_response, cors_middleware, dynamodb_stats_middleware])
 
-Glico SUNAO 血糖値レコーディングアプリAPI仕様書。血糖値レコーディングアプリケーションのバックエンドAPIを提供します。
-
-## 仕様書について
-
-仕様書（ドキュメント）の生成は、AWS Lambda Powertools の OpenAPI version 3.1.0 仕様書を使用し、半自動で生成されています。
-もし、APIについての質問や提案があれば、髙橋までご連絡ください。
-
-## リクエストとレスポンスのフォーマット
-
-リクエストとレスポンスのフォーマットは、JSON 形式で提供されます。
-リクエストに関しての詳細は、各エンドポイントの仕様を参照してください。
-
-## APIのバージョン情報
-
-APIのバージョンは、`{API_VERSION_HASH}` です。このバージョンは、ローカルからデプロイされた場合`latest` になります。
-GitHub Actions によるCI/CD でデプロイされた場合は、コミットハッシュが付与されたバージョンになります。このバージョン情報は、ヘルスチェックエンドポイントで確認することもできます。
-
-    """,
-    contact=Contact(
-        name="Takahashi Katsuyuki",
-        email="takahashi.k@world-wing.com",
-        url=AnyUrl("https://github.com/kkml4220"),
-    ),
-    servers=servers,
-)
+enable_swagger(app)
 
 app.include_router(router=bgl.router, prefix="/bgl")
 app.include_router(router=hba1c.router, prefix="/hba1c")
 app.include_router(router=user.router, prefix="/user")
+app.include_router(router=bgl_and_hba1c.router, prefix="/bgl-and-hba1c")
 
 
 class HealthCheckSchema(BaseModel):
@@ -160,6 +108,6 @@ def save_logs_to_s3(userId: str, log_data: LogSchema) -> dict[str, str]:
 
 @handler_middleware
 @tracer.capture_lambda_handler
-@logger.inject_lambda_context(log_event=True)
+@logger.inject_lambda_context()
 def lambda_handler(event: dict, context: LambdaContext) -> dict[str, str | int]:
     return app.resolve(event, context)
@@ -0,0 +1,195 @@
+"""OpenAPI仕様書(Swagger)の生成と配信
+
+仕様書はデプロイ前に一度だけ生成して、`static/openapi.json`としてLambdaのパッケージに含めます。
+
+    STAGE=dev API_VERSION_HASH=xxx APP_API_BASE_URL=https://... task openapi
+
+`/swagger`はこのファイルをメモリに読み込んで返すので、本番のLambdaはOpenAPIの生成処理を読み込みません。
+ファイルがない、またはバージョンが`API_VERSION_HASH`と異なる場合は、ローカル環境でのみその場で生成します。
+"""
+
+# Standard Library
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Third Party Library
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import NotFoundError
+from config.api import API_VERSION_HASH, STAGE
+
+SWAGGER_PATH = "/swagger"
+OPENAPI_SPEC_PATH = Path(__file__).resolve().parent.parent / "static" / "openapi.json"
+LOCAL_SERVER_URL = "http://localhost:3333"
+# NOTE: 仕様書に載せるステージごとのサーバー名
+SERVER_DESCRIPTIONS = {
+    "local": "Local Development Server",
+    "dev": "Development Server",
+    "stg": "Staging Server",
+}
+
+TITLE = "Glico SUNAO 血糖値レコーディングアプリAPI仕様書"
+SUMMARY = "Glico SUNAO 血糖値レコーディングアプリケーションのバックエンドAPIの仕様書です。"
+DESCRIPTION = f"""
+![グリコロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcSOeSsMRCo0cMhs1bP4fb-1D45pii-LkGZcpg&s)
+![SUNAOロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRcdtPpgEs9hfDcMxq_WJEZk7pAkHVkYtx_EA&s)
+![つばさ株式会社ロゴ](https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTUF74Gsbwzr3N9Rsjok_lGoYgAa_r8CSZE0lV_HqlAAw&s)
+
+## 概要
+
+Glico SUNAO 血糖値レコーディングアプリAPI仕様書。血糖値レコーディングアプリケーションのバックエンドAPIを提供します。
+
+## 仕様書について
+
+仕様書（ドキュメント）の生成は、AWS Lambda Powertools の OpenAPI version 3.1.0 仕様書を使用し、半自動で生成されています。
+もし、APIについての質問や提案があれば、髙橋までご連絡ください。
+
+## リクエストとレスポンスのフォーマット
+
+リクエストとレスポンスのフォーマットは、JSON 形式で提供されます。
+リクエストに関しての詳細は、各エンドポイントの仕様を参照してください。
+
+## APIのバージョン情報
+
+APIのバージョンは、`{API_VERSION_HASH}` です。このバージョンは、ローカルからデプロイされた場合`latest` になります。
+GitHub Actions によるCI/CD でデプロイされた場合は、コミットハッシュが付与されたバージョンになります。このバージョン情報は、ヘルスチェックエンドポイントで確認することもできます。
+
+    """
+
+
+def _server_url() -> str:
+    """Base URL of the API of the stage the document is built for
+
+    Outside local, `APP_API_BASE_URL` must be set explicitly (e.g. from `env/<stage>.yml`),
+    otherwise the published document would point at the local server.
+
+    Raises:
+        ValueError: `APP_API_BASE_URL` is not set for a non-local stage
+
+    Returns:
+        str: base URL
+    """
+    if STAGE == "local":
+        return LOCAL_SERVER_URL
+    base_url = os.environ.get("APP_API_BASE_URL")
+    if not base_url:
+        raise ValueError(f"APP_API_BASE_URL must be set to build the OpenAPI document for {STAGE}")
+    return base_url
+
+
+def _openapi_options() -> Dict[str, Any]:
+    # NOTE: OpenAPIのモデルは読み込みが重いので、仕様書を生成するときだけimportする
+    # Third Party Library
+    from aws_lambda_powertools.event_handler.openapi.models import Contact, Server
+    from pydantic.networks import AnyUrl
+
+    server = Server(
+        url=_server_url(),
+        description=SERVER_DESCRIPTIONS.get(STAGE, f"{STAGE} Server"),
+        variables=None,
+    )
+    return dict(
+        title=TITLE,
+        version=API_VERSION_HASH,
+        summary=SUMMARY,
+        description=DESCRIPTION,
+        contact=Contact(
+            name="Takahashi Katsuyuki",
+            email="takahashi.k@world-wing.com",
+            url=AnyUrl("https://github.com/kkml4220"),
+        ),
+        servers=[server],
+    )
+
+
+def build_openapi_spec(app: APIGatewayRestResolver) -> str:
+    """Render the OpenAPI document of the app
+
+    Args:
+        app (APIGatewayRestResolver): app with every router included
+
+    Returns:
+        str: OpenAPI document (JSON)
+    """
+    return app.get_openapi_json_schema(**_openapi_options())
+
+
+@lru_cache(maxsize=1)
+def load_openapi_spec() -> Optional[str]:
+    """Read the pre-built OpenAPI document once per container
+
+    Returns:
+        Optional[str]: OpenAPI document (JSON), None if it is missing or for another version
+    """
+    try:
+        spec = OPENAPI_SPEC_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    if json.loads(spec).get("info", {}).get("version") != API_VERSION_HASH:
+        return None
+    return spec
+
+
+@lru_cache(maxsize=1)
+def _local_openapi_spec(app: APIGatewayRestResolver) -> str:
+    return build_openapi_spec(app)
+
+
+@lru_cache(maxsize=4)
+def _swagger_html(spec: str, path: str) -> str:
+    # Third Party Library
+    from aws_lambda_powertools.event_handler.openapi import swagger_ui
+    from aws_lambda_powertools.event_handler.openapi.swagger_ui import generate_swagger_html
+
+    # NOTE: Swagger UIのJS/CSSはPowertoolsに同梱されているものをインラインで埋め込む
+    assets = Path(swagger_ui.__file__).parent
+    swagger_js = (assets / "swagger-ui-bundle.min.js").read_text()
+    swagger_css = (assets / "swagger-ui.min.css").read_text()
+    return generate_swagger_html(spec, path, swagger_js, swagger_css, "", None)
+
+
+def enable_swagger(app: APIGatewayRestResolver, path: str = SWAGGER_PATH) -> None:
+    """Serve the pre-built OpenAPI document and the Swagger UI
+
+    Same as `app.enable_swagger`, except that the document is not rebuilt on every request.
+    `?format=json` returns the document itself.
+
+    Args:
+        app (APIGatewayRestResolver): app instance
+        path (str, optional): path of the Swagger UI. Defaults to SWAGGER_PATH.
+    """
+
+    @app.get(path, include_in_schema=False)
+    def swagger_handler() -> Response[str]:
+        spec = load_openapi_spec()
+        if spec is None:
+            if STAGE != "local":
+                raise NotFoundError("OpenAPI document is not built")
+            spec = _local_openapi_spec(app)
+        # NOTE: <script>タグ内に埋め込むので、</を閉じタグとして解釈されないようにする
+        escaped_spec = spec.replace("</", "<\\/")
+        query_params = app.current_event.query_string_parameters or {}
+        if query_params.get("format") == "json":
+            return Response(
+                status_code=200, content_type=content_types.APPLICATION_JSON, body=escaped_spec
+            )
+        return Response(
+            status_code=200,
+            content_type=content_types.TEXT_HTML,
+            body=_swagger_html(escaped_spec, f"{app._get_base_path()}{path}"),
+        )
+
+
+def main() -> None:
+    # Third Party Library
+    from handlers.app import app
+
+    OPENAPI_SPEC_PATH.parent.mkdir(parents=True, exist_ok=True)
+    OPENAPI_SPEC_PATH.write_text(build_openapi_spec(app), encoding="utf-8")
+    print(f"Wrote {OPENAPI_SPEC_PATH} (version: {API_VERSION_HASH})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Standard Library
+import hashlib
+from http import HTTPStatus
+from typing import Dict, Mapping, Optional
+
+# Third Party Library
+from aws_lambda_powertools.event_handler import Response
+from aws_lambda_powertools.event_handler.openapi.types import OpenAPIResponse
+
+# NOTE: キャッシュしてもよいが、使う前に毎回ETagで再検証させる
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(
+    user_id: str,
+    data_version: int,
+    path: str,
+    query: Optional[Mapping[str, str]],
+    api_version: str,
+) -> str:
+    """Build a weak ETag from the user's data version and everything else the response depends on
+
+    The response of a read endpoint only changes when the user's readings are written
+    (which bumps the data version), the request (path and query, e.g. the date range) differs,
+    or a new API version is deployed.
+
+    Args:
+        user_id (str): user id
+        data_version (int): user's data version
+        path (str): request path
+        query (Optional[Mapping[str, str]]): query string parameters
+        api_version (str): deployed API version
+
+    Returns:
+        str: ETag (`W/"..."`)
+    """
+    parts = [api_version, user_id, str(data_version), path]
+    parts += [f"{name}={value}" for name, value in sorted((query or {}).items())]
+    digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header matches the ETag (weak comparison)
+
+    Args:
+        if_none_match (Optional[str]): header value, a comma separated list of ETags or `*`
+        etag (str): current ETag
+
+    Returns:
+        bool: True if the client's copy is still fresh
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified_response(etag: str) -> Response[str]:
+    """Return `304 Not Modified` without a body"""
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, body="", headers=etag_headers(etag))
+
+
+NOT_MODIFIED_RESPONSE = OpenAPIResponse(
+    description="`If-None-Match`のETagが最新のため、本文なしで返します(`304 Not Modified`)",
+)
@@ -0,0 +1,164 @@
+# Standard Library
+import time
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Protocol, Sequence, TypeVar
+
+# Third Party Library
+from aws.s3_client import S3Client
+from aws_lambda_powertools.event_handler import Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from config.api import S3_EXPORT_BUCKET
+from helper.generator import generate_id
+from helper.pagination import decode_cursor, encode_cursor
+from pydantic import BaseModel
+from schemas.export import ExportSchema
+
+T = TypeVar("T", covariant=True)
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+# NOTE: API Gatewayのタイムアウト(30秒)より前に打ち切る
+EXPORT_TIME_BUDGET_SECONDS = 20.0
+# NOTE: Lambdaのレスポンスサイズ上限(6MB)に収まるように打ち切る
+EXPORT_MAX_INLINE_BYTES = 5 * 1024 * 1024
+# NOTE: Scan 1回で読む件数
+EXPORT_SCAN_PAGE_SIZE = 500
+# NOTE: 署名付きURLの有効期限(秒)
+EXPORT_URL_EXPIRES_IN = 60 * 60
+
+KeyType = Dict[str, Dict[str, Any]]
+
+
+class ScanIterator(Protocol[T]):
+    """pynamodbのResultIterator"""
+
+    def __next__(self) -> T: ...
+
+    @property
+    def last_evaluated_key(self) -> Optional[KeyType]: ...
+
+
+class ExportResult(NamedTuple):
+    item_count: int
+    size: int
+    last_evaluated_key: Optional[KeyType]
+
+
+ExportFunction = Callable[[Callable[[bytes], None], Optional[KeyType], Optional[int]], ExportResult]
+
+
+def export_ndjson(
+    items: ScanIterator[Any],
+    serialize: Callable[[Any], BaseModel],
+    write: Callable[[bytes], None],
+    max_bytes: Optional[int] = None,
+    time_budget: float = EXPORT_TIME_BUDGET_SECONDS,
+) -> ExportResult:
+    """Write scanned items as NDJSON, one line per item, until the scan ends or a limit is hit
+
+    Items are pulled from the scan one by one, so only one scan page is held in memory.
+    When the time budget or `max_bytes` is reached, the key of the last written item is
+    returned so that the export can be resumed from the next item.
+
+    Args:
+        items (ScanIterator[Any]): result of `Model.scan`
+        serialize (Callable[[Any], BaseModel]): converts an item into its response schema
+        write (Callable[[bytes], None]): receives each NDJSON line
+        max_bytes (Optional[int], optional): maximum bytes to write. Defaults to None.
+        time_budget (float, optional): seconds to spend. Defaults to EXPORT_TIME_BUDGET_SECONDS.
+
+    Returns:
+        ExportResult: number of items, bytes written and the key to resume from (None if done)
+    """
+    started = time.monotonic()
+    count = 0
+    size = 0
+    while True:
+        # NOTE: 次のアイテムを読む前のキーが、書き出し済みの最後のアイテムのキー
+        resume_key = items.last_evaluated_key
+        if count and time.monotonic() - started > time_budget:
+            return ExportResult(count, size, resume_key)
+        try:
+            item = next(items)
+        except StopIteration:
+            return ExportResult(count, size, None)
+        line = serialize(item).model_dump_json(by_alias=True).encode() + b"\n"
+        if count and max_bytes is not None and size + len(line) > max_bytes:
+            return ExportResult(count, size, resume_key)
+        write(line)
+        count += 1
+        size += len(line)
+
+
+def _decode_export_cursor(cursor: Optional[str], key_names: Sequence[str]) -> Optional[KeyType]:
+    if cursor is None:
+        return None
+    try:
+        key: KeyType = decode_cursor(cursor)
+    except ValueError:
+        raise BadRequestError("Invalid cursor")
+    if sorted(key) != sorted(key_names):
+        raise BadRequestError("Invalid cursor")
+    return key
+
+
+def export_response(
+    export: ExportFunction,
+    key_names: Sequence[str],
+    name: str,
+    cursor: Optional[str] = None,
+    destination: str = "inline",
+) -> Response[ExportSchema]:
+    """Run an export and build the API response
+
+    `inline` returns the NDJSON as the response body (up to EXPORT_MAX_INLINE_BYTES)
+    with the resume token in the `X-Next-Cursor` header.
+    `s3` writes the NDJSON to the export bucket and returns a presigned URL.
+
+    Args:
+        export (ExportFunction): `export_all` of a controller
+        key_names (Sequence[str]): key attribute names of the table, used to check the cursor
+        name (str): name of the export, used in the S3 key
+        cursor (Optional[str], optional): resume token. Defaults to None.
+        destination (str, optional): `inline` or `s3`. Defaults to "inline".
+
+    Returns:
+        Response[ExportSchema]: NDJSON body, or the export information for `s3`
+    """
+    last_evaluated_key = _decode_export_cursor(cursor, key_names)
+
+    if destination == "s3":
+        if not S3_EXPORT_BUCKET:
+            raise BadRequestError("Export to S3 is not available on this stage")
+        s3 = S3Client(S3_EXPORT_BUCKET)
+        key = f"exports/{name}/{datetime.now().strftime('%Y%m%d%H%M%S')}-{generate_id()}.ndjson"
+        writer = s3.open_writer(key, NDJSON_CONTENT_TYPE)
+        try:
+            result = export(writer.write, last_evaluated_key, None)
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+        return Response(
+            status_code=HTTPStatus.OK.value,
+            content_type=content_types.APPLICATION_JSON,
+            body=ExportSchema(
+                url=s3.generate_presigned_url(key, EXPORT_URL_EXPIRES_IN),
+                count=result.item_count,
+                size=result.size,
+                next_cursor=encode_cursor(result.last_evaluated_key),
+            ),
+        )
+
+    chunks: List[bytes] = []
+    result = export(chunks.append, last_evaluated_key, EXPORT_MAX_INLINE_BYTES)
+    headers = {"X-Export-Count": str(result.item_count)}
+    next_cursor = encode_cursor(result.last_evaluated_key)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(
+        status_code=HTTPStatus.OK.value,
+        content_type=NDJSON_CONTENT_TYPE,
+        body=b"".join(chunks).decode(),
+        headers=headers,
+    )
@@ -0,0 +1,58 @@
+# Standard Library
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+
+# Third Party Library
+from aws_lambda_powertools.event_handler import Response, content_types
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(schema_type: Any) -> TypeAdapter[Any]:
+    # NOTE: TypeAdapterの生成(スキーマのビルド)は重いので、型ごとに1回だけ作る
+    return TypeAdapter(schema_type)
+
+
+def dump_json(schema_type: Any, content: Any) -> bytes:
+    """Encode response schemas into the final JSON bytes in one pass
+
+    The schemas are already validated when they are built from the items,
+    so they are encoded as they are by pydantic-core with the camelCase aliases,
+    the same output as the resolver's validation and JSON encoding.
+
+    Args:
+        schema_type (Any): type of the content (e.g. `List[BGLSchema]`)
+        content (Any): schemas to encode
+
+    Returns:
+        bytes: JSON
+    """
+    return _type_adapter(schema_type).dump_json(content, by_alias=True)
+
+
+def json_response(
+    body: bytes,
+    status_code: int = HTTPStatus.OK,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response[str]:
+    """Return JSON made by `dump_json` without validating and encoding it again
+
+    The resolver only re-encodes a JSON body that is not a str,
+    so the bytes are decoded and handed over as they are.
+    Routes returning this declare `-> Response[str]` and document the schema in `responses`.
+
+    Args:
+        body (bytes): JSON made by `dump_json`
+        status_code (int, optional): status code. Defaults to 200.
+        headers (Optional[Dict[str, str]], optional): extra headers. Defaults to None.
+
+    Returns:
+        Response[str]: response for the resolver
+    """
+    return Response(
+        status_code=status_code,
+        content_type=content_types.APPLICATION_JSON,
+        body=body.decode(),
+        headers=headers,
+    )
@@ -0,0 +1,101 @@
+# Standard Library
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Third Party Library
+from pynamodb.attributes import UTCDateTimeAttribute
+
+# NOTE: 1ページで返すデータ件数の上限
+MAX_PAGE_SIZE = 1000
+# NOTE: cursorだけが指定された場合の1ページのデータ件数
+DEFAULT_PAGE_SIZE = 100
+# NOTE: cursor(live-indexのQueryのLastEvaluatedKey)が持つキー
+CURSOR_KEY_NAMES = frozenset({"live_user_id", "user_id", "record_time"})
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Dict[str, Any]]]) -> Optional[str]:
+    """Encode DynamoDB's LastEvaluatedKey as an opaque cursor
+
+    Args:
+        last_evaluated_key (Optional[Dict[str, Dict[str, Any]]]): key returned by Query
+
+    Returns:
+        Optional[str]: url-safe cursor, None if there is no next page
+    """
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Dict[str, Any]]:
+    """Decode a cursor made by `encode_cursor` back into an ExclusiveStartKey
+
+    Args:
+        cursor (str): cursor received from the client
+
+    Raises:
+        ValueError: the cursor is broken or was not made by `encode_cursor`
+
+    Returns:
+        Dict[str, Dict[str, Any]]: key to pass as `last_evaluated_key`
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, dict) or not key:
+        raise ValueError("Invalid cursor")
+    for name, value in key.items():
+        if not isinstance(value, dict) or list(value) != ["S"] or not isinstance(value["S"], str):
+            raise ValueError("Invalid cursor")
+    return key
+
+
+def is_cursor_of_user(last_evaluated_key: Dict[str, Dict[str, Any]], user_id: str) -> bool:
+    """Whether a cursor was issued for the user's range query on the live-index
+
+    Cursors of another user, or keys of another table or index, are not accepted:
+    DynamoDB would reject them with a ValidationException.
+
+    Args:
+        last_evaluated_key (Dict[str, Dict[str, Any]]): key decoded by `decode_cursor`
+        user_id (str): user id of the request
+
+    Returns:
+        bool: True if the cursor can be used by the user
+    """
+    if set(last_evaluated_key) != CURSOR_KEY_NAMES:
+        return False
+    return last_evaluated_key["live_user_id"] == last_evaluated_key["user_id"] == {"S": user_id}
+
+
+def is_cursor_in_range(
+    last_evaluated_key: Dict[str, Dict[str, Any]], _from: datetime, _to: datetime
+) -> bool:
+    """Whether the record time of a cursor is inside the date range it is used with
+
+    A cursor made for another range would become an ExclusiveStartKey outside the
+    key condition, which DynamoDB rejects with a ValidationException.
+    The range is the same as the date-range queries: from `_from` to the end of `_to`.
+
+    Args:
+        last_evaluated_key (Dict[str, Dict[str, Any]]): key decoded by `decode_cursor`
+        _from (datetime): start date (inclusive)
+        _to (datetime): end date (inclusive)
+
+    Returns:
+        bool: True if the cursor can be used with the range
+    """
+    record_time = last_evaluated_key.get("record_time", {}).get("S")
+    if record_time is None:
+        return False
+    # NOTE: UTCDateTimeAttributeの文字列は固定長なので、文字列のまま大小を比べられる
+    attribute = UTCDateTimeAttribute()
+    return bool(
+        attribute.serialize(_from) <= record_time <= attribute.serialize(_to + timedelta(days=1))
+    )
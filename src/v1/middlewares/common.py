@@ -1,13 +1,30 @@
 # Standard Library
-from typing import Callable, TypeVar
+import logging
+import random
+import time
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 # Third Party Library
-from aws_lambda_powertools import Logger
+from aws_lambda_powertools import Logger, Metrics
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
 from aws_lambda_powertools.event_handler.exceptions import UnauthorizedError
 from aws_lambda_powertools.event_handler.middlewares import NextMiddleware
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.middleware_factory import lambda_handler_decorator
-from config.api import APP_API_CORS_ALLOWED_ORIGINS
+from config.api import (
+    API_VERSION_HASH,
+    APP_API_CORS_ALLOWED_ORIGINS,
+    DYNAMODB_STATS_HEADER,
+    LOG_BODY_MAX_LENGTH,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_DEBUG_SAMPLE_RATES,
+    LOG_REDACTED_HEADERS,
+)
+from helper.etag import etag_headers, etag_matches, make_etag, not_modified_response
+from repositories.dynamodb_stats import dynamodb_stats
+from repositories.identity_map import identity_map
+from services.data_version_service import DataVersionService
 
 logger = Logger()
 
@@ -15,11 +32,81 @@ T = TypeVar("T")
 
 
 logger = Logger("Middleware")
+# NOTE: 名前空間は環境変数POWERTOOLS_METRICS_NAMESPACEで設定する
+metrics = Metrics()
+
+# NOTE: ブラウザのJavaScriptから読めるようにするレスポンスヘッダー
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "X-Export-Count", "X-DynamoDB-Stats", "ETag"]
+# NOTE: LOG_REDACTED_HEADERSの値の代わりにログに残す文字列
+REDACTED = "***"
+
+data_version_service = DataVersionService()
+
+
+def debug_sample_rate(path: str) -> float:
+    """Rate of requests whose whole payloads are logged for the path
+
+    Args:
+        path (str): request path
+
+    Returns:
+        float: rate of the longest matching prefix in LOG_DEBUG_SAMPLE_RATES,
+            LOG_DEBUG_SAMPLE_RATE if none matches
+    """
+    matches = [
+        prefix
+        for prefix in LOG_DEBUG_SAMPLE_RATES
+        if path == prefix or path.startswith(prefix.rstrip("/") + "/")
+    ]
+    if not matches:
+        return LOG_DEBUG_SAMPLE_RATE  # type: ignore
+    return LOG_DEBUG_SAMPLE_RATES[max(matches, key=len)]  # type: ignore
+
+
+def redact_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Replace the values of LOG_REDACTED_HEADERS (e.g. Authorization) with a placeholder"""
+    return {
+        name: REDACTED if name.lower() in LOG_REDACTED_HEADERS else value
+        for name, value in (headers or {}).items()
+    }
+
+
+def body_summary(body: Any, max_length: int = LOG_BODY_MAX_LENGTH) -> Dict[str, Any]:
+    """Summarize a request or response body for the log without encoding it
+
+    str/bytes bodies are cut to `max_length` characters.
+    Other bodies (not yet encoded to JSON) are only described by their type and length.
+
+    Args:
+        body (Any): body
+        max_length (int, optional): max characters to keep. Defaults to LOG_BODY_MAX_LENGTH.
+
+    Returns:
+        Dict[str, Any]: fields to add to the log
+    """
+    if body is None:
+        return {}
+    if isinstance(body, bytes):
+        body = body[:max_length].decode(errors="replace") + (
+            "..." if len(body) > max_length else ""
+        )
+        return {"body": body}
+    if isinstance(body, str):
+        if len(body) <= max_length:
+            return {"body": body, "body_length": len(body)}
+        return {"body": body[:max_length] + "...", "body_length": len(body), "body_truncated": True}
+    if isinstance(body, (list, dict)):
+        return {"body_type": type(body).__name__, "body_length": len(body)}
+    return {"body_type": type(body).__name__}
 
 
 def log_request_response(app: APIGatewayRestResolver, next_middleware: NextMiddleware) -> Response:
     """Middleware to log incoming request and response
 
+    Only a summary is logged: headers without their secrets and bodies cut to
+    LOG_BODY_MAX_LENGTH, and the hits and misses of the `identity_map` with the response. The whole request and response are logged only for the requests
+    chosen by the debug sampling (LOG_DEBUG_SAMPLE_RATE / LOG_DEBUG_SAMPLE_RATES).
+
     Args:
         app (APIGatewayRestResolver): app instance
         next_middleware (NextMiddleware): next middleware
@@ -27,13 +114,125 @@ def log_request_response(app: APIGatewayRestResolver, next_middleware: NextMiddl
     Returns:
         Response: api response
     """
-    logger.info(
-        "Incoming request", path=app.current_event.path, request=app.current_event.raw_event
-    )
+    event = app.current_event
+    sampled = random.random() < debug_sample_rate(event.path)
+    # NOTE: INFOが出力されない場合は、ログの組み立て自体を行わない
+    enabled = sampled or logger.log_level <= logging.INFO
+    if enabled:
+        logger.info(
+            "Incoming request",
+            method=event.http_method,
+            path=event.path,
+            query=event.query_string_parameters,
+            headers=redact_headers(event.headers),
+            sampled=sampled,
+            **({"body": event.body} if sampled else body_summary(event.body)),
+        )
+
+    started = time.perf_counter()
+    result = next_middleware(app)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if enabled:
+        logger.info(
+            "Response received",
+            status_code=result.status_code,
+            content_type=result.headers.get("Content-Type"),
+            elapsed_ms=elapsed_ms,
+            sampled=sampled,
+            identity_map=identity_map.stats,
+            **({"body": result.body} if sampled else body_summary(result.body)),
+        )
+
+    return result
+
 
+def dynamodb_stats_middleware(
+    app: APIGatewayRestResolver, next_middleware: NextMiddleware
+) -> Response:
+    """Middleware to report the DynamoDB calls of the request
+
+    The calls, latency, items and consumed capacity recorded by `dynamodb_stats`
+    are logged by operation and table, and emitted as CloudWatch metrics (EMF)
+    with the route as the dimension.
+    With DYNAMODB_STATS_HEADER, the totals are also returned in the `X-DynamoDB-Stats` header.
+
+    Args:
+        app (APIGatewayRestResolver): app instance
+        next_middleware (NextMiddleware): next middleware
+
+    Returns:
+        Response: api response
+    """
     result = next_middleware(app)
-    logger.info("Response received", response=result.__dict__)
 
+    totals = dynamodb_stats.totals
+    if not totals["calls"]:
+        return result
+
+    route = app.context.get("_route")
+    route_name = f"{route.method} {route.openapi_path}" if route else app.current_event.path
+    logger.info("DynamoDB stats", route=route_name, **totals, calls_by_target=dynamodb_stats.calls)
+
+    if metrics.namespace:
+        metrics.add_dimension(name="route", value=route_name)
+        metrics.add_metric(name="DynamoDBCalls", unit=MetricUnit.Count, value=totals["calls"])
+        metrics.add_metric(name="DynamoDBErrors", unit=MetricUnit.Count, value=totals["errors"])
+        metrics.add_metric(
+            name="DynamoDBLatency", unit=MetricUnit.Milliseconds, value=totals["latency_ms"]
+        )
+        metrics.add_metric(name="DynamoDBItems", unit=MetricUnit.Count, value=totals["items"])
+        metrics.add_metric(
+            name="DynamoDBReadCapacityUnits",
+            unit=MetricUnit.Count,
+            value=totals["read_capacity_units"],
+        )
+        metrics.add_metric(
+            name="DynamoDBWriteCapacityUnits",
+            unit=MetricUnit.Count,
+            value=totals["write_capacity_units"],
+        )
+        metrics.flush_metrics()
+
+    if DYNAMODB_STATS_HEADER:
+        result.headers["X-DynamoDB-Stats"] = dynamodb_stats.header_value()
+    return result
+
+
+def conditional_get_middleware(
+    app: APIGatewayRestResolver, next_middleware: NextMiddleware
+) -> Response:
+    """Middleware to answer conditional GETs of a user's readings
+
+    Registered on the read endpoints that take `userId` in the query.
+    The ETag is made from the user's data version (bumped on every write of the user's
+    readings), the path, the query and the API version, so when `If-None-Match` matches,
+    `304 Not Modified` is returned after one GetItem without running the handler.
+    Otherwise the ETag is added to the successful response, unless the last write is
+    so recent that the live-index may not include it yet (`LIVE_INDEX_LAG_SECONDS`).
+
+    Args:
+        app (APIGatewayRestResolver): app instance
+        next_middleware (NextMiddleware): next middleware
+
+    Returns:
+        Response: api response
+    """
+    event = app.current_event
+    query = event.query_string_parameters or {}
+    user_id = query.get("userId")
+    if not user_id:
+        return next_middleware(app)
+    data_version = data_version_service.find_version(user_id)
+    etag = make_etag(user_id, data_version, event.path, query, API_VERSION_HASH)
+    if etag_matches(event.get_header_value("If-None-Match", case_sensitive=False), etag):
+        return not_modified_response(etag)  # type: ignore
+    # NOTE: live-indexに最後の書き込みがまだ反映されていないかもしれない間は、古いデータを
+    # 新しいバージョンのETagで返さないようにETagを付けない。ハンドラーの前に判定する
+    settled = data_version_service.is_settled(user_id)
+    result = next_middleware(app)
+    if result.status_code == HTTPStatus.OK and settled:
+        result.headers.update(etag_headers(etag))
     return result
 
 
@@ -50,24 +249,18 @@ def cors_middleware(app: APIGatewayRestResolver, next_middleware: NextMiddleware
     origin = app.current_event.headers.get("origin")
     # Originがない時はSwaggerからのリクエスト
     if not origin:
-        logger.info("Origin", extra={"origin": origin})
-        response = next_middleware(app)
-        logger.info("Response", extra={"response": response})
-        return response
-    logger.info("Origin", extra={"origin": origin})
+        return next_middleware(app)
+    logger.debug("Origin", origin=origin)
     if origin not in APP_API_CORS_ALLOWED_ORIGINS:
         raise UnauthorizedError("Invalid origin")
     result = next_middleware(app)
+    # NOTE: NDJSONのエクスポートなど、ハンドラーが設定したContent-Typeやヘッダーは残す
+    result.headers.setdefault("Content-Type", "application/json")
     if app.current_event.path == "/healthcheck":
-        result.headers = {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-        }
+        result.headers["Access-Control-Allow-Origin"] = "*"
         return result
-    result.headers = {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": origin,
-    }
+    result.headers["Access-Control-Allow-Origin"] = origin
+    result.headers["Access-Control-Expose-Headers"] = ",".join(CORS_EXPOSE_HEADERS)
     return result
 
 
@@ -76,6 +269,8 @@ def cors_middleware(app: APIGatewayRestResolver, next_middleware: NextMiddleware
 def handler_middleware(handler: Callable[..., T], event: dict, context: dict) -> T:
     """アプリケーションのミドルウェア"""
 
-    response = handler(event, context)
+    # NOTE: Lambdaのコンテナは再利用されるので、前のリクエストで読んだアイテムを破棄する
+    identity_map.reset()
+    dynamodb_stats.reset()
 
-    return response
+    return handler(event, context)
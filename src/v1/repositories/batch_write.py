@@ -0,0 +1,94 @@
+# Standard Library
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+
+# Third Party Library
+from pynamodb.constants import BATCH_WRITE_PAGE_LIMIT
+from pynamodb.exceptions import PutError
+from pynamodb.models import Model
+
+T = TypeVar("T", bound=Model)
+
+# NOTE: 未処理のアイテム(UnprocessedItems)を書き込む最大の試行回数(最初の1回を含む)
+BATCH_WRITE_MAX_ATTEMPTS = 6
+# NOTE: 再試行までの待ち時間(秒)。試行ごとに倍になり、その範囲でランダムに待つ(Full Jitter)
+BATCH_WRITE_BASE_DELAY = 0.05
+BATCH_WRITE_MAX_DELAY = 1.0
+
+UNPROCESSED_ERROR = "Not written: DynamoDB left the item unprocessed after retries."
+DUPLICATE_KEY_ERROR = "Not written: another item in the request has the same key."
+
+
+def _key(model: Type[Model], serialized: Dict[str, Any]) -> Tuple[str, ...]:
+    names = [name for name in (model._hash_keyname, model._range_keyname) if name]
+    return tuple(json.dumps(serialized[name], sort_keys=True) for name in names)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before the given retry (1 for the first retry), with full jitter"""
+    return random.uniform(
+        0, min(BATCH_WRITE_MAX_DELAY, BATCH_WRITE_BASE_DELAY * 2 ** (attempt - 1))
+    )
+
+
+def batch_put(
+    model: Type[T],
+    items: Sequence[T],
+    max_attempts: int = BATCH_WRITE_MAX_ATTEMPTS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[Optional[str]]:
+    """Put items with BatchWriteItem and report the result of each item
+
+    The items are sent in chunks of 25 (the limit of BatchWriteItem).
+    Items that DynamoDB leaves unprocessed (e.g. throttling) are sent again with
+    exponential backoff and jitter, up to `max_attempts` times.
+    Unlike `Model.batch_write`, a failure does not raise: the failed items are reported
+    and the other chunks are still written.
+
+    Like `Model.save`, existing items with the same key are overwritten.
+    BatchWriteItem rejects a chunk with duplicate keys, so only the first of them is written.
+
+    Args:
+        model (Type[T]): pynamodb model of the table
+        items (Sequence[T]): items to put
+        max_attempts (int, optional): attempts per item. Defaults to BATCH_WRITE_MAX_ATTEMPTS.
+        sleep (Callable[[float], None], optional): used to wait between the attempts.
+
+    Returns:
+        List[Optional[str]]: for each item, None if written, otherwise the reason of the failure
+    """
+    errors: List[Optional[str]] = [None] * len(items)
+    pending: Dict[Tuple[str, ...], int] = {}
+    requests: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        serialized = item.serialize()
+        key = _key(model, serialized)
+        if key in pending:
+            errors[index] = DUPLICATE_KEY_ERROR
+            continue
+        pending[key] = index
+        requests.append(serialized)
+
+    connection = model._get_connection()
+    for start in range(0, len(requests), BATCH_WRITE_PAGE_LIMIT):
+        chunk = requests[start : start + BATCH_WRITE_PAGE_LIMIT]
+        for attempt in range(1, max_attempts + 1):
+            if attempt > 1:
+                sleep(backoff_delay(attempt - 1))
+            try:
+                data = connection.batch_write_item(put_items=chunk)
+            except PutError as error:
+                # NOTE: botocoreの再試行でも失敗した場合は、このチャンクだけ失敗として続ける
+                for serialized in chunk:
+                    errors[pending[_key(model, serialized)]] = f"Not written: {error.msg}"
+                break
+            unprocessed = (data or {}).get("UnprocessedItems", {}).get(model.Meta.table_name, [])
+            chunk = [request["PutRequest"]["Item"] for request in unprocessed]
+            if not chunk:
+                break
+        else:
+            for serialized in chunk:
+                errors[pending[_key(model, serialized)]] = UNPROCESSED_ERROR
+    return errors
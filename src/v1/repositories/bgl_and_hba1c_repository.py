@@ -0,0 +1,36 @@
+# Standard Library
+from typing import Tuple
+
+# Third Party Library
+from database.base import BGLModel, Hba1cModel, transaction_connection
+from pynamodb.transactions import TransactWrite
+from repositories.identity_map import identity_map
+from schemas.bgl import BGLCreateRequestSchema
+from schemas.hba1c import Hba1cCreateRequestSchema
+
+
+class BGLAndHba1cRepository:
+
+    def create_pair(
+        self, bgl_data: BGLCreateRequestSchema, hba1c_data: Hba1cCreateRequestSchema
+    ) -> Tuple[BGLModel, Hba1cModel]:
+        """Create a BGL and an HbA1c item in one TransactWriteItems call
+
+        Either both items are written or neither is.
+        Like `create_one`, existing items with the same key are overwritten.
+
+        Args:
+            bgl_data (BGLCreateRequestSchema): BGL item to create
+            hba1c_data (Hba1cCreateRequestSchema): HbA1c item to create
+
+        Returns:
+            Tuple[BGLModel, Hba1cModel]: created items
+        """
+        bgl_item = BGLModel(**bgl_data.model_dump(), live_user_id=bgl_data.user_id)
+        hba1c_item = Hba1cModel(**hba1c_data.model_dump(), live_user_id=hba1c_data.user_id)
+        with TransactWrite(connection=transaction_connection) as transaction:
+            transaction.save(bgl_item)
+            transaction.save(hba1c_item)
+        identity_map.put(BGLModel, bgl_item.id, bgl_item)
+        identity_map.put(Hba1cModel, hba1c_item.id, hba1c_item)
+        return bgl_item, hba1c_item
@@ -0,0 +1,43 @@
+# Standard Library
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+K = TypeVar("K")
+R = TypeVar("R")
+
+# NOTE: 同時に実行するDynamoDBのリクエスト数(botocoreのコネクションプールの既定値と同じ)
+BULK_MAX_WORKERS = 10
+
+
+def map_parallel(
+    fn: Callable[[K], R],
+    keys: Sequence[K],
+    max_workers: int = BULK_MAX_WORKERS,
+) -> List[Tuple[Optional[R], Optional[Exception]]]:
+    """Call `fn` for each key on a thread pool and collect the results in the order of the keys
+
+    Used for the DynamoDB operations that have no batch API for our keys
+    (queries on the id index, conditional updates). An error of one key does not stop the others:
+    it is returned in place of the result.
+
+    Args:
+        fn (Callable[[K], R]): operation for one key
+        keys (Sequence[K]): keys
+        max_workers (int, optional): threads to use. Defaults to BULK_MAX_WORKERS.
+
+    Returns:
+        List[Tuple[Optional[R], Optional[Exception]]]: (result, None) or (None, error) for each key
+    """
+
+    def call(key: K) -> Tuple[Optional[R], Optional[Exception]]:
+        try:
+            return fn(key), None
+        except Exception as error:
+            return None, error
+
+    if len(keys) <= 1:
+        return [call(key) for key in keys]
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(keys)), thread_name_prefix="bulk"
+    ) as executor:
+        return list(executor.map(call, keys))
@@ -0,0 +1,240 @@
+# Standard Library
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from time import sleep
+from typing import Dict, Iterable, List, Tuple, Type, Union
+
+# Third Party Library
+from database.base import (
+    BGLModel,
+    DailySummaryModel,
+    Hba1cModel,
+    is_condition_failure,
+    is_transaction_conflict,
+    transaction_connection,
+    version_condition,
+)
+from pynamodb.exceptions import TransactWriteError
+from pynamodb.transactions import TransactWrite
+from repositories.batch_write import backoff_delay
+from schemas.event_timing import EventTiming
+
+ReadingModel = Union[Type[BGLModel], Type[Hba1cModel]]
+DailyKey = Tuple[str, date, EventTiming]
+
+# NOTE: 集計の書き込みが他のリクエストと競合したときに、その日を集計し直す最大の試行回数(最初の1回を含む)
+SUMMARY_REFRESH_MAX_ATTEMPTS = 4
+
+
+def reading_day(record_time: datetime) -> date:
+    """Day of a reading, the same day boundary as the range queries (record_time in UTC)"""
+    if record_time.tzinfo is not None:
+        record_time = record_time.astimezone(timezone.utc)
+    return record_time.date()
+
+
+def summary_key(kind: str, day: date, event_timing: EventTiming) -> str:
+    return f"{kind}#{day.isoformat()}#{event_timing.name}"
+
+
+def summary_day_key(kind: str, day: date) -> str:
+    """Key of the summaries of one day (`{kind}#{date}`), used to mark them dirty"""
+    return f"{kind}#{day.isoformat()}"
+
+
+def aggregate_daily(
+    kind: str, readings: Iterable[Union[BGLModel, Hba1cModel]]
+) -> Dict[DailyKey, DailySummaryModel]:
+    """Aggregate readings into one summary per user, day and event timing
+
+    Args:
+        kind (str): SUMMARY_KIND_BGL or SUMMARY_KIND_HBA1C
+        readings (Iterable[Union[BGLModel, Hba1cModel]]): live readings
+
+    Returns:
+        Dict[DailyKey, DailySummaryModel]: summaries by (user id, day, event timing)
+    """
+    summaries: Dict[DailyKey, DailySummaryModel] = {}
+    for reading in readings:
+        day = reading_day(reading.record_time)
+        key = (reading.user_id, day, reading.event_timing)
+        value = float(reading.value)
+        summary = summaries.get(key)
+        if summary is None:
+            summaries[key] = DailySummaryModel(
+                reading.user_id,
+                summary_key(kind, day, reading.event_timing),
+                kind=kind,
+                date=day.isoformat(),
+                event_timing=reading.event_timing,
+                reading_count=1,
+                total=value,
+                sum_squares=value * value,
+                min_value=value,
+                max_value=value,
+            )
+            continue
+        summary.reading_count += 1
+        summary.total += value
+        summary.sum_squares += value * value
+        summary.min_value = min(summary.min_value, value)
+        summary.max_value = max(summary.max_value, value)
+    return summaries
+
+
+def _summary_values(summary: DailySummaryModel) -> Tuple[float, ...]:
+    return (
+        summary.reading_count,
+        summary.total,
+        summary.sum_squares,
+        summary.min_value,
+        summary.max_value,
+    )
+
+
+def _is_same_day(summaries: List[DailySummaryModel], stored: Dict[str, DailySummaryModel]) -> bool:
+    """Whether the aggregated summaries of a day equal the stored ones"""
+    if {summary.summary_key for summary in summaries} != set(stored):
+        return False
+    return all(
+        _summary_values(summary) == _summary_values(stored[summary.summary_key])
+        for summary in summaries
+    )
+
+
+class DailySummaryRepository:
+
+    def __init__(self, model: ReadingModel, kind: str) -> None:
+        self.model = model
+        self.kind = kind
+
+    def refresh(self, user_id: str, days: Iterable[date]) -> None:
+        """Aggregate the user's live readings of each day again and replace the stored summaries
+
+        Recomputing the whole day (a handful of readings) instead of adding the difference
+        keeps the summaries right for overwrites, moves of `record_time` and soft-deletes.
+        The summaries are written only if nobody replaced them since they were read,
+        otherwise the day is aggregated again, up to `SUMMARY_REFRESH_MAX_ATTEMPTS` times.
+
+        Args:
+            user_id (str): user id
+            days (Iterable[date]): days whose readings were written
+
+        Raises:
+            TransactWriteError: the summaries kept conflicting with other requests
+        """
+        for day in sorted(set(days)):
+            for attempt in range(1, SUMMARY_REFRESH_MAX_ATTEMPTS + 1):
+                if attempt > 1:
+                    sleep(backoff_delay(attempt - 1))
+                try:
+                    self._replace_day(user_id, day)
+                    break
+                except TransactWriteError as e:
+                    retryable = is_condition_failure(e) or is_transaction_conflict(e)
+                    if not retryable or attempt == SUMMARY_REFRESH_MAX_ATTEMPTS:
+                        raise
+
+    def _replace_day(self, user_id: str, day: date) -> None:
+        # NOTE: 集計を先に読む。読んだ後に書き込まれたデータは、その書き込みの集計が
+        # バージョンを上げるので、下の条件付き書き込みが失敗して集計し直しになる
+        stored = {
+            item.summary_key: item
+            for item in DailySummaryModel.query(
+                user_id,
+                range_key_condition=DailySummaryModel.summary_key.startswith(
+                    f"{self.kind}#{day.isoformat()}#"
+                ),
+                consistent_read=True,
+            )
+        }
+        # NOTE: GSIは結果整合性で直前の書き込みが見えないことがあるので、テーブルから強い整合性で読む
+        start = datetime.combine(day, time.min)
+        readings = self.model.query(
+            user_id,
+            range_key_condition=self.model.record_time.between(
+                start, start + timedelta(days=1) - timedelta(microseconds=1)
+            ),
+            filter_condition=self.model.is_deleted == False,  # noqa: E712
+            consistent_read=True,
+        )
+        summaries = aggregate_daily(self.kind, readings)
+        self._write_day(summaries.values(), stored)
+
+    def _write_day(
+        self, summaries: Iterable[DailySummaryModel], stored: Dict[str, DailySummaryModel]
+    ) -> None:
+        """Replace the stored summaries of one day, on the condition that their versions did not move
+
+        Stored summaries without a new summary (event timings without live readings) are deleted.
+        """
+        stored = dict(stored)
+        summaries = list(summaries)
+        if not summaries and not stored:
+            return
+        with TransactWrite(connection=transaction_connection) as transaction:
+            for summary in summaries:
+                previous = stored.pop(summary.summary_key, None)
+                version = previous.version if previous is not None else None
+                summary.version = (version or 0) + 1
+                transaction.save(
+                    summary, condition=version_condition(DailySummaryModel.version, version)
+                )
+            for item in stored.values():
+                transaction.delete(
+                    item, condition=version_condition(DailySummaryModel.version, item.version)
+                )
+
+    def rebuild(self, user_id: str) -> int:
+        """Aggregate all the live readings of a user again and replace the summaries that differ
+
+        Reads the user's partition once (readings and stored summaries) instead of one query
+        per day. Each day is written with the same version condition as `refresh`, so a summary
+        written by a request in the meantime is not overwritten: that day is refreshed again.
+        Summaries of days without live readings are deleted.
+
+        Args:
+            user_id (str): user id
+
+        Returns:
+            int: number of days whose summaries were replaced or deleted
+        """
+        stored: Dict[date, Dict[str, DailySummaryModel]] = defaultdict(dict)
+        for item in DailySummaryModel.query(
+            user_id,
+            range_key_condition=DailySummaryModel.summary_key.startswith(f"{self.kind}#"),
+            consistent_read=True,
+        ):
+            stored[date.fromisoformat(item.date)][item.summary_key] = item
+        readings = self.model.query(
+            user_id,
+            filter_condition=self.model.is_deleted == False,  # noqa: E712
+            consistent_read=True,
+        )
+        summaries: Dict[date, List[DailySummaryModel]] = defaultdict(list)
+        for (_, day, _), summary in aggregate_daily(self.kind, readings).items():
+            summaries[day].append(summary)
+        replaced = 0
+        for day in sorted(set(stored) | set(summaries)):
+            if _is_same_day(summaries.get(day, []), stored.get(day, {})):
+                continue
+            try:
+                self._write_day(summaries.get(day, []), stored.get(day, {}))
+            except TransactWriteError as e:
+                if not (is_condition_failure(e) or is_transaction_conflict(e)):
+                    raise
+                self.refresh(user_id, [day])
+            replaced += 1
+        return replaced
+
+    def find_range(self, user_id: str, _from: date, _to: date) -> List[DailySummaryModel]:
+        """Read the summaries of the days from `_from` to `_to` (both inclusive) in one query"""
+        items = DailySummaryModel.query(
+            user_id,
+            range_key_condition=DailySummaryModel.summary_key.between(
+                f"{self.kind}#{_from.isoformat()}", f"{self.kind}#{_to.isoformat()}#~"
+            ),
+            # NOTE: データバージョンのETagで返すので、直前の集計の更新も見えるように強い整合性で読む
+            consistent_read=True,
+        )
+        return list(items)
@@ -0,0 +1,88 @@
+# Standard Library
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+# Third Party Library
+from database.base import DataVersionModel
+from repositories.identity_map import identity_map
+
+
+class DataVersionRepository:
+
+    def _find(self, user_id: str) -> Optional[DataVersionModel]:
+        def load() -> Optional[DataVersionModel]:
+            try:
+                return DataVersionModel.get(
+                    user_id,
+                    consistent_read=True,
+                    attributes_to_get=["data_version", "dirty_summaries", "updated_at"],
+                )
+            except DataVersionModel.DoesNotExist:
+                return None
+
+        return identity_map.get_or_load(DataVersionModel, user_id, load)
+
+    def find_version(self, user_id: str) -> int:
+        """Read the user's data version with one strongly consistent GetItem
+
+        The read must see the latest write, otherwise a client could be told
+        that its stale copy is still fresh. It is read at most once per request
+        (`identity_map`), and users without any write yet are at version 0.
+
+        Args:
+            user_id (str): user id
+
+        Returns:
+            int: data version
+        """
+        item = self._find(user_id)
+        return 0 if item is None else int(item.data_version)
+
+    def find_updated_at(self, user_id: str) -> Optional[datetime]:
+        """When the user's data version was last bumped, from the same read as `find_version`
+
+        Args:
+            user_id (str): user id
+
+        Returns:
+            Optional[datetime]: time of the last bump, None if the user has no write yet
+        """
+        item = self._find(user_id)
+        return None if item is None else item.updated_at
+
+    def find_dirty_summaries(self, user_id: str) -> Set[str]:
+        """Summaries (`{kind}#{date}`) left stale by a failed refresh, from the same read as `find_version`"""
+        item = self._find(user_id)
+        return set() if item is None or item.dirty_summaries is None else set(item.dirty_summaries)
+
+    def bump(self, user_id: str, dirty_summaries: Iterable[str] = ()) -> int:
+        """Increase the user's data version by one with an atomic ADD (creating the item if needed)
+
+        Args:
+            user_id (str): user id
+            dirty_summaries (Iterable[str], optional): summaries (`{kind}#{date}`) that could not
+                be refreshed, added in the same UpdateItem. Defaults to ().
+
+        Returns:
+            int: new data version
+        """
+        item = DataVersionModel(user_id)
+        actions = [
+            DataVersionModel.data_version.add(1),
+            DataVersionModel.updated_at.set(datetime.now()),
+        ]
+        dirty = set(dirty_summaries)
+        if dirty:
+            actions.append(DataVersionModel.dirty_summaries.add(dirty))
+        item.update(actions=actions)
+        identity_map.put(DataVersionModel, user_id, item)
+        return int(item.data_version)
+
+    def clear_dirty_summaries(self, user_id: str, dirty_summaries: Iterable[str]) -> None:
+        """Remove the summaries that were computed again from the user's dirty set"""
+        item = DataVersionModel(user_id)
+        item.update(
+            actions=[DataVersionModel.dirty_summaries.delete(set(dirty_summaries))],
+            condition=DataVersionModel.user_id.exists(),
+        )
+        identity_map.put(DataVersionModel, user_id, item)
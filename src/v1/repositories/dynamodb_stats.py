@@ -0,0 +1,219 @@
+# Standard Library
+import time
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from weakref import WeakSet
+
+# Third Party Library
+from pynamodb.signals import pre_dynamodb_send
+
+# NOTE: ReturnConsumedCapacityの値が読み込み(RCU)になるオペレーション。それ以外は書き込み(WCU)
+READ_OPERATIONS = frozenset({"GetItem", "Query", "Scan", "BatchGetItem", "TransactGetItems"})
+# NOTE: 集計に含めないテーブル操作
+IGNORED_OPERATIONS = frozenset(
+    {"CreateTable", "DeleteTable", "DescribeTable", "ListTables", "UpdateTable", "UpdateTimeToLive"}
+)
+
+_STARTED = "dynamodb_stats_started"
+_TARGET = "dynamodb_stats_target"
+
+
+class DynamoDBStats:
+    """リクエスト単位で集計するDynamoDBの呼び出し回数・レイテンシ・取得件数・消費キャパシティ
+
+    PynamoDBの全てのリクエストはReturnConsumedCapacity=TOTALで送られるので、
+    レスポンスのConsumedCapacityをオペレーションとテーブル(インデックス)ごとに足し合わせます。
+    `lambda_handler`の開始時に`reset`されます。
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = Lock()
+
+    def record(
+        self,
+        operation: str,
+        target: str,
+        latency_ms: float,
+        items: int = 0,
+        read_capacity_units: float = 0.0,
+        write_capacity_units: float = 0.0,
+        error: bool = False,
+    ) -> None:
+        """Add one DynamoDB call
+
+        Args:
+            operation (str): operation name (e.g. Query)
+            target (str): table name, followed by `/index name` for the queries on an index
+            latency_ms (float): time to the response, including the retries of botocore
+            items (int, optional): items returned. Defaults to 0.
+            read_capacity_units (float, optional): consumed RCU. Defaults to 0.0.
+            write_capacity_units (float, optional): consumed WCU. Defaults to 0.0.
+            error (bool, optional): the call failed. Defaults to False.
+        """
+        with self._lock:
+            call = self._calls.setdefault(
+                (operation, target),
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "latency_ms": 0.0,
+                    "items": 0,
+                    "read_capacity_units": 0.0,
+                    "write_capacity_units": 0.0,
+                },
+            )
+            call["calls"] += 1
+            call["errors"] += int(error)
+            call["latency_ms"] += latency_ms
+            call["items"] += items
+            call["read_capacity_units"] += read_capacity_units
+            call["write_capacity_units"] += write_capacity_units
+
+    def reset(self) -> None:
+        """Drop every recorded call"""
+        with self._lock:
+            self._calls.clear()
+
+    @property
+    def calls(self) -> List[Dict[str, Any]]:
+        """Recorded calls by operation and table, the most expensive first"""
+        with self._lock:
+            calls = [
+                {"operation": operation, "target": target, **_rounded(call)}
+                for (operation, target), call in self._calls.items()
+            ]
+        return sorted(
+            calls,
+            key=lambda call: (
+                call["read_capacity_units"] + call["write_capacity_units"],
+                call["latency_ms"],
+            ),
+            reverse=True,
+        )
+
+    @property
+    def totals(self) -> Dict[str, float]:
+        """Sum of every recorded call"""
+        totals = {
+            "calls": 0,
+            "errors": 0,
+            "latency_ms": 0.0,
+            "items": 0,
+            "read_capacity_units": 0.0,
+            "write_capacity_units": 0.0,
+        }
+        with self._lock:
+            for call in self._calls.values():
+                for name, value in call.items():
+                    totals[name] += value
+        return _rounded(totals)
+
+    def header_value(self) -> str:
+        """Totals for the debug response header (e.g. `calls=2;items=10;rcu=1.5;wcu=0;ms=12.3`)"""
+        totals = self.totals
+        return (
+            f"calls={totals['calls']};items={totals['items']}"
+            f";rcu={totals['read_capacity_units']:g};wcu={totals['write_capacity_units']:g}"
+            f";ms={totals['latency_ms']:g}"
+        )
+
+
+def _rounded(values: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(value, 2) for name, value in values.items()}
+
+
+def _target(params: Dict[str, Any]) -> str:
+    if "TableName" in params:
+        if "IndexName" in params:
+            return f"{params['TableName']}/{params['IndexName']}"
+        return str(params["TableName"])
+    # NOTE: BatchGetItem/BatchWriteItemとトランザクションは、含まれる全てのテーブル
+    tables = set(params.get("RequestItems", {}))
+    for item in params.get("TransactItems", []):
+        tables.update(operation["TableName"] for operation in item.values())
+    return ",".join(sorted(tables))
+
+
+def consumed_capacity(operation: str, parsed: Dict[str, Any]) -> Tuple[float, float]:
+    """RCU and WCU in the ConsumedCapacity of a response
+
+    Args:
+        operation (str): operation name
+        parsed (Dict[str, Any]): response parsed by botocore
+
+    Returns:
+        Tuple[float, float]: read capacity units, write capacity units
+    """
+    consumed = parsed.get("ConsumedCapacity", [])
+    # NOTE: バッチとトランザクションはテーブルごとのリストで返る
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    read_units = write_units = 0.0
+    for capacity in consumed:
+        if "ReadCapacityUnits" in capacity or "WriteCapacityUnits" in capacity:
+            read_units += capacity.get("ReadCapacityUnits", 0.0)
+            write_units += capacity.get("WriteCapacityUnits", 0.0)
+        elif operation in READ_OPERATIONS:
+            read_units += capacity.get("CapacityUnits", 0.0)
+        else:
+            write_units += capacity.get("CapacityUnits", 0.0)
+    return read_units, write_units
+
+
+def returned_items(parsed: Dict[str, Any]) -> int:
+    """Number of items in a response"""
+    if "Count" in parsed:
+        return int(parsed["Count"])
+    if "Item" in parsed:
+        return 1
+    responses = parsed.get("Responses", {})
+    # NOTE: BatchGetItemはテーブルごとの辞書、TransactGetItemsはリストで返る
+    if isinstance(responses, dict):
+        return sum(len(items) for items in responses.values())
+    return sum(1 for response in responses if "Item" in response)
+
+
+dynamodb_stats = DynamoDBStats()
+
+
+def _before_parameter_build(
+    model: Any, params: Dict[str, Any], context: Dict[str, Any], **_: Any
+) -> None:
+    if model.name in IGNORED_OPERATIONS:
+        return
+    context[_TARGET] = _target(params)
+    context[_STARTED] = time.perf_counter()
+
+
+def _after_call(model: Any, parsed: Dict[str, Any], context: Dict[str, Any], **_: Any) -> None:
+    started = context.pop(_STARTED, None)
+    if started is None:
+        return
+    read_units, write_units = consumed_capacity(model.name, parsed)
+    dynamodb_stats.record(
+        model.name,
+        context.pop(_TARGET, ""),
+        latency_ms=(time.perf_counter() - started) * 1000,
+        items=returned_items(parsed),
+        read_capacity_units=read_units,
+        write_capacity_units=write_units,
+        error="Error" in parsed,
+    )
+
+
+_instrumented_clients: "WeakSet[Any]" = WeakSet()
+
+
+def _instrument_client(sender: Any, **_: Any) -> None:
+    # NOTE: PynamoDBのbotocoreクライアントは最初のリクエストで作られる(作り直されることもある)ので、
+    # リクエストの直前にクライアントごとに1回だけフックを登録する
+    client = sender.client
+    if client in _instrumented_clients:
+        return
+    client.meta.events.register("before-parameter-build.dynamodb.*", _before_parameter_build)
+    client.meta.events.register("after-call.dynamodb.*", _after_call)
+    _instrumented_clients.add(client)
+
+
+pre_dynamodb_send.connect(_instrument_client)
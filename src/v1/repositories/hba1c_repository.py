@@ -1,55 +1,238 @@
 # Standard Library
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Third Party Library
-from database.base import Hba1cModel
+from database.base import Hba1cModel, transaction_connection, version_condition
+from pynamodb.pagination import ResultIterator
+from pynamodb.transactions import TransactWrite
+from repositories.batch_write import batch_put
+from repositories.bulk import map_parallel
+from repositories.identity_map import identity_map
 from schemas.hba1c import Hba1cCreateRequestSchema, Hba1cUpdateRequestSchema
 
 
 class Hba1cRepository:
 
-    def find_all(self) -> List[Hba1cModel]:
-        items = Hba1cModel.scan()
-        return list(items)
+    def scan(
+        self,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        page_size: Optional[int] = None,
+    ) -> ResultIterator[Hba1cModel]:
+        return Hba1cModel.scan(  # type: ignore
+            last_evaluated_key=last_evaluated_key, page_size=page_size
+        )
 
     def create_one(self, data: Hba1cCreateRequestSchema) -> Hba1cModel:
-        item = Hba1cModel(**data.model_dump())
+        item = Hba1cModel(**data.model_dump(), live_user_id=data.user_id)
         item.save()
+        identity_map.put(Hba1cModel, item.id, item)
         return item
 
-    def is_exist(self, id: str) -> bool:
-        item = Hba1cModel.scan(Hba1cModel.id == id, limit=1)
+    def create_many(
+        self, data: List[Hba1cCreateRequestSchema]
+    ) -> List[Tuple[Hba1cModel, Optional[str]]]:
+        """Create items with BatchWriteItem
+
+        Args:
+            data (List[Hba1cCreateRequestSchema]): items to create
+
+        Returns:
+            List[Tuple[Hba1cModel, Optional[str]]]: each item and the reason it was not written,
+                None if it was written
+        """
+        items = [Hba1cModel(**item.model_dump(), live_user_id=item.user_id) for item in data]
+        errors = batch_put(Hba1cModel, items)
+        for item, error in zip(items, errors):
+            if error is None:
+                identity_map.put(Hba1cModel, item.id, item)
+        return list(zip(items, errors))
+
+    def _find_by_id(self, id: str) -> Optional[Hba1cModel]:
+        items = Hba1cModel.id_index.query(id, limit=1)
         try:
-            item.next()
-            return True
+            return items.next()
         except StopIteration:
-            return False
+            return None
+
+    def _get(self, id: str) -> Optional[Hba1cModel]:
+        return identity_map.get_or_load(Hba1cModel, id, lambda: self._find_by_id(id))
+
+    def is_exist(self, id: str) -> bool:
+        return self._get(id) is not None
 
     def find_one(self, id: str) -> Hba1cModel:
-        return Hba1cModel.scan(Hba1cModel.id == id, limit=1).next()
+        item = self._get(id)
+        if item is None:
+            raise Hba1cModel.DoesNotExist()
+        return item
 
-    def update_one(self, id: str, data: Hba1cUpdateRequestSchema) -> Hba1cModel:
-        item = self.find_one(id)
-        user_id = item.user_id
-        id = item.id
-        created_at = item.created_at
-        item.delete()
-        item = Hba1cModel(**data.model_dump(), user_id=user_id, id=id, created_at=created_at)
-        item.save()
+    def find_one_consistent(self, id: str) -> Optional[Hba1cModel]:
+        """Find the item by id, then read it again from the table with a strongly consistent read
+
+        id-index is eventually consistent, so right after another write it can still return
+        the previous version of the item. Its key is used to get the latest item from the table.
+
+        Args:
+            id (str): id
+
+        Raises:
+            Hba1cModel.DoesNotExist: the key found through the index no longer exists
+                (the record time was changed by another request)
+
+        Returns:
+            Optional[Hba1cModel]: latest item, None if the id is not in the index
+        """
+        found = self._get(id)
+        if found is None:
+            return None
+        item = Hba1cModel.get(found.user_id, found.record_time, consistent_read=True)
+        identity_map.put(Hba1cModel, id, item)
+        return item
+
+    def update_one(self, item: Hba1cModel, data: Hba1cUpdateRequestSchema) -> Hba1cModel:
+        """Update the item read by `find_one_consistent` with an optimistic lock on its version
+
+        Args:
+            item (Hba1cModel): latest item
+            data (Hba1cUpdateRequestSchema): new values
+
+        Returns:
+            Hba1cModel: updated item
+        """
+        expected_version = data.version if data.version is not None else item.version
+        condition = version_condition(Hba1cModel.version, expected_version)
+        record_time = Hba1cModel.record_time
+        if record_time.serialize(item.record_time) == record_time.serialize(data.record_time):
+            # NOTE: UpdateItemは更新後のアイテムを返すので、itemはそのまま最新の状態になる
+            item.update(
+                actions=[
+                    Hba1cModel.value.set(data.value),
+                    Hba1cModel.event_timing.set(data.event_timing),
+                    (
+                        Hba1cModel.sunao_food.set(data.sunao_food)
+                        if data.sunao_food is not None
+                        else Hba1cModel.sunao_food.remove()
+                    ),
+                    Hba1cModel.updated_at.set(datetime.now()),
+                    Hba1cModel.version.add(1),
+                ],
+                condition=condition,
+            )
+        else:
+            # NOTE: record_timeはrange keyで変更できないので、
+            # 旧アイテムの削除と新アイテムの作成を1つのトランザクションで行う
+            new_item = Hba1cModel(
+                **data.model_dump(exclude={"version"}),
+                user_id=item.user_id,
+                id=item.id,
+                is_deleted=item.is_deleted,
+                live_user_id=item.live_user_id,
+                created_at=item.created_at,
+                version=(expected_version or 0) + 1,
+            )
+            with TransactWrite(connection=transaction_connection) as transaction:
+                transaction.delete(item, condition=condition)
+                transaction.save(new_item, condition=Hba1cModel.record_time.does_not_exist())
+            item = new_item
+        identity_map.put(Hba1cModel, item.id, item)
         return item
 
     def delete_one(self, id: str) -> Hba1cModel:
         item = self.find_one(id)
-        item.is_deleted = True
-        item.save()
+        # NOTE: live_user_idを消すことで、live-indexからも外れる
+        item.update(
+            actions=[
+                Hba1cModel.is_deleted.set(True),
+                Hba1cModel.live_user_id.remove(),
+                Hba1cModel.updated_at.set(datetime.now()),
+                Hba1cModel.version.add(1),
+            ],
+            condition=Hba1cModel.user_id.exists(),
+        )
         return item
 
+    def find_many(self, ids: List[str]) -> List[Tuple[Optional[Hba1cModel], Optional[Exception]]]:
+        """Find items by id, querying the id index in parallel
+
+        Args:
+            ids (List[str]): ids
+
+        Returns:
+            List[Tuple[Optional[Hba1cModel], Optional[Exception]]]: for each id, the item or
+                the error (`Hba1cModel.DoesNotExist` if there is no such item)
+        """
+        return map_parallel(self.find_one, ids)  # type: ignore
+
+    def delete_many(self, ids: List[str]) -> List[Tuple[Optional[Hba1cModel], Optional[Exception]]]:
+        """Soft-delete items by id in parallel, each with the same conditional update as `delete_one`
+
+        Args:
+            ids (List[str]): ids
+
+        Returns:
+            List[Tuple[Optional[Hba1cModel], Optional[Exception]]]: for each id, the deleted item or
+                the error (`Hba1cModel.DoesNotExist` if there is no such item)
+        """
+        return map_parallel(self.delete_one, ids)  # type: ignore
+
+    def _query_live(
+        self, user_id: str, _from: datetime, _to: datetime, **kwargs: Any
+    ) -> ResultIterator[Hba1cModel]:
+        adjusted_to = _to + timedelta(days=1)
+        return Hba1cModel.live_index.query(  # type: ignore
+            user_id,
+            range_key_condition=Hba1cModel.record_time.between(_from, adjusted_to),
+            filter_condition=Hba1cModel.is_deleted == False,  # noqa: E712
+            **kwargs,
+        )
+
     def find_many_by_user_id(
         self, user_id: str, _from: datetime, _to: datetime
     ) -> List[Hba1cModel]:
-        adjusted_to = _to + timedelta(days=1)
-        items = Hba1cModel.query(
-            hash_key=user_id, range_key_condition=Hba1cModel.record_time.between(_from, adjusted_to)
+        items = self._query_live(user_id, _from, _to)
+        return list(items)
+
+    def find_times_and_values_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime
+    ) -> Iterator[Tuple[datetime, float]]:
+        """Read only the record time and the value of the live items in the range
+
+        Args:
+            user_id (str): user id
+            _from (datetime): start date (inclusive)
+            _to (datetime): end date (inclusive)
+
+        Returns:
+            Iterator[Tuple[datetime, float]]: record time and value, sorted by record time
+        """
+        items = self._query_live(user_id, _from, _to, attributes_to_get=["record_time", "value"])
+        return ((item.record_time, item.value) for item in items)
+
+    def find_page_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Tuple[List[Hba1cModel], Optional[Dict[str, Dict[str, Any]]]]:
+        """Read at most `limit` live items in the range, starting after `last_evaluated_key`
+
+        Args:
+            user_id (str): user id
+            _from (datetime): start date (inclusive)
+            _to (datetime): end date (inclusive)
+            limit (int): maximum number of items
+            last_evaluated_key (Optional[Dict[str, Dict[str, Any]]], optional):
+                key returned by the previous page. Defaults to None.
+
+        Returns:
+            Tuple[List[Hba1cModel], Optional[Dict[str, Dict[str, Any]]]]:
+                items and the key to resume from, None if there is no next page
+        """
+        items = self._query_live(
+            user_id, _from, _to, limit=limit, last_evaluated_key=last_evaluated_key
         )
-        return [item for item in items if not item.is_deleted]
+        page = list(items)
+        return page, items.last_evaluated_key
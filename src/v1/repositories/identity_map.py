@@ -0,0 +1,76 @@
+# Standard Library
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple, Type, TypeVar
+
+# Third Party Library
+from pynamodb.models import Model
+
+T = TypeVar("T", bound=Model)
+
+
+class IdentityMap:
+    """リクエスト単位でDynamoDBから読み込んだアイテムを保持するキャッシュ
+
+    1回のAPI呼び出しの中で、同じキーのアイテムをDynamoDBから読むのは最大1回になります。
+    `lambda_handler`の開始時に`reset`されるので、リクエストをまたいでアイテムが残ることはありません。
+    存在しなかったキーも`None`として保持します。
+    """
+
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[str, Hashable], Optional[Model]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model: Type[Model], key: Hashable) -> Tuple[str, Hashable]:
+        return (model.Meta.table_name, key)
+
+    def get_or_load(
+        self, model: Type[T], key: Hashable, loader: Callable[[], Optional[T]]
+    ) -> Optional[T]:
+        """Return the cached item for the key, or load it once and remember the result
+
+        Args:
+            model (Type[T]): pynamodb model of the item
+            key (Hashable): lookup key (e.g. id)
+            loader (Callable[[], Optional[T]]): reads the item from DynamoDB, returns None if missing
+
+        Returns:
+            Optional[T]: the item, None if it does not exist
+        """
+        cache_key = self._key(model, key)
+        with self._lock:
+            if cache_key in self._items:
+                self.hits += 1
+                return self._items[cache_key]  # type: ignore
+        item = loader()
+        with self._lock:
+            self.misses += 1
+            self._items[cache_key] = item
+        return item
+
+    def put(self, model: Type[T], key: Hashable, item: Optional[T]) -> None:
+        """Remember an item that was written in this request"""
+        with self._lock:
+            self._items[self._key(model, key)] = item
+
+    def discard(self, model: Type[T], key: Hashable) -> None:
+        """Forget a key so that the next lookup reads from DynamoDB again"""
+        with self._lock:
+            self._items.pop(self._key(model, key), None)
+
+    def reset(self) -> None:
+        """Drop every cached item and counter"""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """`hits` is the number of DynamoDB read round trips saved in this request"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+identity_map = IdentityMap()
@@ -0,0 +1,163 @@
+# Standard Library
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, Type, TypeVar
+
+# Third Party Library
+from pynamodb.expressions.condition import Condition
+from pynamodb.models import Model
+
+T = TypeVar("T", bound=Model)
+
+KeyType = Dict[str, Dict[str, Any]]
+# NOTE: セグメントごとの再開位置。値がNoneのセグメントは読み終わっている
+Checkpoints = Dict[int, Optional[KeyType]]
+
+# NOTE: ワーカーが先読みしておけるページ数(メモリ使用量の上限)
+MAX_BUFFERED_PAGES = 8
+# NOTE: 利用側が読むのをやめたかを確認する間隔(秒)
+QUEUE_POLL_INTERVAL = 0.1
+
+
+class _SegmentFailed:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class _SegmentFinished:
+    pass
+
+
+class ParallelScan(Generic[T]):
+    """Scan a whole table with several segments at once
+
+    Each segment is scanned by its own worker thread (`Segment`/`TotalSegments` of the Scan API)
+    and the items are yielded as the pages arrive, so the order of the items is not defined.
+    Workers read at most `MAX_BUFFERED_PAGES` pages ahead of the caller.
+
+    The scan can be resumed: `checkpoints` holds the key to resume from per segment,
+    and it only moves forward after every item of a page has been handed to the caller.
+
+    Example:
+        scan = ParallelScan(BGLModel, total_segments=8, rate_limit=200)
+        for item in scan:
+            ...
+        save(scan.checkpoints)
+    """
+
+    def __init__(
+        self,
+        model: Type[T],
+        total_segments: int = 4,
+        max_workers: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        filter_condition: Optional[Condition] = None,
+        page_size: Optional[int] = None,
+        checkpoints: Optional[Checkpoints] = None,
+        on_checkpoint: Optional[Callable[[int, Optional[KeyType]], None]] = None,
+    ) -> None:
+        """
+        Args:
+            model (Type[T]): pynamodb model of the table
+            total_segments (int, optional): number of segments. Defaults to 4.
+            max_workers (Optional[int], optional): threads to use. Defaults to total_segments.
+            rate_limit (Optional[float], optional): read capacity units per second for the whole
+                scan, shared equally by the segments. Defaults to None (no limit).
+            filter_condition (Optional[Condition], optional): filter of the scan. Defaults to None.
+            page_size (Optional[int], optional): items per Scan call. Defaults to None.
+            checkpoints (Optional[Checkpoints], optional): checkpoints of a previous run.
+                Defaults to None (start from the beginning).
+            on_checkpoint (Optional[Callable[[int, Optional[KeyType]], None]], optional):
+                called with (segment, key) each time a segment's checkpoint moves.
+                Defaults to None.
+        """
+        if total_segments < 1:
+            raise ValueError("total_segments must be positive")
+        self.model = model
+        self.total_segments = total_segments
+        self.max_workers = max_workers or total_segments
+        self.rate_limit = rate_limit
+        self.filter_condition = filter_condition
+        self.page_size = page_size
+        self.checkpoints: Checkpoints = dict(checkpoints or {})
+        self._on_checkpoint = on_checkpoint
+        self._lock = Lock()
+
+    def _pending_segments(self) -> List[int]:
+        return [
+            segment
+            for segment in range(self.total_segments)
+            if segment not in self.checkpoints or self.checkpoints[segment] is not None
+        ]
+
+    def _scan_segment(
+        self,
+        segment: int,
+        pages: "queue.Queue[Tuple[int, Any]]",
+        stop: Event,
+    ) -> None:
+        def put(message: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put((segment, message), timeout=QUEUE_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            rate_limit = self.rate_limit / self.total_segments if self.rate_limit else None
+            result = self.model.scan(
+                filter_condition=self.filter_condition,
+                segment=segment,
+                total_segments=self.total_segments,
+                last_evaluated_key=self.checkpoints.get(segment),
+                page_size=self.page_size,
+                rate_limit=rate_limit,
+            )
+            page_iter = result.page_iter
+            for page in page_iter:
+                items = [self.model.from_raw_data(raw) for raw in page.get("Items", [])]
+                if not put((items, page_iter.last_evaluated_key)):
+                    return
+            put(_SegmentFinished())
+        except BaseException as error:
+            put(_SegmentFailed(error))
+
+    def _checkpoint(self, segment: int, key: Optional[KeyType]) -> None:
+        with self._lock:
+            self.checkpoints[segment] = key
+        if self._on_checkpoint:
+            self._on_checkpoint(segment, key)
+
+    def __iter__(self) -> Iterator[T]:
+        segments = self._pending_segments()
+        if not segments:
+            return
+        pages: "queue.Queue[Tuple[int, Any]]" = queue.Queue(maxsize=MAX_BUFFERED_PAGES)
+        stop = Event()
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(segments)),
+            thread_name_prefix=f"scan-{self.model.Meta.table_name}",
+        )
+        try:
+            for segment in segments:
+                executor.submit(self._scan_segment, segment, pages, stop)
+            running = len(segments)
+            while running:
+                segment, message = pages.get()
+                if isinstance(message, _SegmentFailed):
+                    raise message.error
+                if isinstance(message, _SegmentFinished):
+                    running -= 1
+                    self._checkpoint(segment, None)
+                    continue
+                items, key = message
+                yield from items
+                # NOTE: ページ内の全アイテムを渡し終えてから再開位置を進める
+                if key is not None:
+                    self._checkpoint(segment, key)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
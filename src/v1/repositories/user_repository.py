@@ -1,33 +1,55 @@
 # Standard Library
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
 # Third Party Library
 from database.base import UserModel
+from pynamodb.pagination import ResultIterator
+from repositories.identity_map import identity_map
 from schemas.user import UserCreateRequestSchema
 
 
 class UserRepository:
 
-    def find_all(self) -> List[UserModel]:
-        items = UserModel.scan()
-        return list(items)
+    def scan(
+        self,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        page_size: Optional[int] = None,
+    ) -> ResultIterator[UserModel]:
+        return UserModel.scan(  # type: ignore
+            last_evaluated_key=last_evaluated_key, page_size=page_size
+        )
+
+    def _get(self, user_id: str) -> Optional[UserModel]:
+        def load() -> Optional[UserModel]:
+            try:
+                return UserModel.get(user_id)
+            except UserModel.DoesNotExist:
+                return None
+
+        return identity_map.get_or_load(UserModel, user_id, load)
 
     def find_one(self, user_id: str) -> UserModel:
-        return UserModel.scan(UserModel.id == user_id, limit=1).next()
+        item = self._get(user_id)
+        if item is None:
+            raise UserModel.DoesNotExist()
+        return item
+
+    def find_many(self, user_ids: List[str]) -> List[UserModel]:
+        items = {item.id: item for item in UserModel.batch_get(user_ids)}
+        for user_id in user_ids:
+            identity_map.put(UserModel, user_id, items.get(user_id))
+        # NOTE: BatchGetItemは順序を保証しないので、リクエストされた順に並べ直す
+        return [items[user_id] for user_id in dict.fromkeys(user_ids) if user_id in items]
 
     def is_exist(self, user_id: str) -> bool:
-        item = UserModel.scan(UserModel.id == user_id, limit=1)
-        try:
-            item.next()
-            return True
-        except StopIteration:
-            return False
+        return self._get(user_id) is not None
 
     def create_one(self, data: UserCreateRequestSchema) -> UserModel:
         term_agreed_at = datetime.now() if data.term_agreed else None
         item = UserModel(id=data.id, term_agreed_at=term_agreed_at, is_deleted=False)
         item.save()
+        identity_map.put(UserModel, item.id, item)
         return item
 
     def update_term_agreed_at(self, user_id: str) -> UserModel:
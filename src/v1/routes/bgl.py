@@ -1,18 +1,50 @@
 # Standard Library
 from datetime import datetime, timedelta
 from http import HTTPStatus
-from typing import List
+from typing import List, Literal, Optional
 
 # Third Party Library
 from aws_lambda_powertools import Logger, Tracer
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
 from aws_lambda_powertools.event_handler.api_gateway import Router
 from aws_lambda_powertools.event_handler.exceptions import BadRequestError
 from aws_lambda_powertools.event_handler.openapi.params import Path, Query
 from aws_lambda_powertools.shared.types import Annotated
 from controllers.bgl import BGLController
+from helper.etag import NOT_MODIFIED_RESPONSE
+from helper.export import export_response
+from helper.json_response import json_response
+from helper.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    is_cursor_in_range,
+    is_cursor_of_user,
+)
+from middlewares.common import conditional_get_middleware
 from schemas import errors
-from schemas.bgl import BGLCreateRequestSchema, BGLSchema, BGLUpdateRequestSchema
+from schemas.agp import (
+    AGP_DEFAULT_BUCKET_MINUTES,
+    AGP_MAX_BUCKET_MINUTES,
+    AGP_MAX_DAYS,
+    AGP_MIN_BUCKET_MINUTES,
+    AGP_MIN_DAYS,
+    AGPSchema,
+)
+from schemas.batch import MAX_BATCH_SIZE, BatchIdsRequestSchema
+from schemas.bgl import (
+    BGLBatchCreateRequestSchema,
+    BGLBatchCreateResponseSchema,
+    BGLBatchIdResponseSchema,
+    BGLCreateRequestSchema,
+    BGLPageSchema,
+    BGLSchema,
+    BGLUpdateRequestSchema,
+)
+from schemas.daily_summary import SUMMARY_MAX_DAYS, DailySummarySchema
+from schemas.downsampling import MAX_POINTS, MIN_POINTS, Resolution, ValueBucketSchema
+from schemas.export import EXPORT_RESPONSE, ExportSchema
+from schemas.glucose_stats import DEFAULT_TARGET_HIGH, DEFAULT_TARGET_LOW, BGLStatsSchema
 
 app = APIGatewayRestResolver(debug=True)
 router = Router()
@@ -27,39 +59,60 @@ tracer = Tracer("BGLAPI")
 @router.get(
     "/",
     tags=["BGL"],
-    summary="開発用：全ての血糖値データを取得",
+    summary="開発用：全ての血糖値データをエクスポート",
     description="""
 ## 概要
 
-全ての血糖値データを取得します。
+全ての血糖値データをNDJSON形式でエクスポートします。
 
 こちらは開発用のエンドポイントです。本番環境で使用されることを想定していません。
 
 ## 詳細
 
-全ての血糖値データを取得します。取得したデータは、`BGLSchema`を参照してください。
-もし、データが存在しない場合は、空の配列が返されます。
+テーブルを少しずつScanしながら、1行に1件の`BGLSchema`(JSON)を書き出します。
+論理削除済みのデータも含まれます。
 
-## 仕様
+1回のリクエストで書き出すのは、約20秒分かつ5MBまでです。
+続きがある場合は`X-Next-Cursor`ヘッダーにカーソルが入るので、`cursor`に指定して続きを取得してください。
+`X-Next-Cursor`ヘッダーがなければ全て書き出し済みです。
 
-<strike>論理削除済みのデータはこれに含まれません。</strike>
+`destination=s3`を指定すると、NDJSONをS3に書き出して署名付きURL(有効期限1時間)を返します。
+この場合はサイズの上限がなく、続きのカーソルはレスポンスの`nextCursor`に入ります。
 
 ## 変更履歴
 
 - 2024/5/14: エンドポイントを追加
 - 2024/5/15: 論理削除済みのデータを含めるように仕様変更
+- 2026/10/18: 全件を1つの配列で返す代わりに、NDJSONで分割してエクスポートするように変更
 """,
-    response_description="取得したデータの配列",
+    response_description="NDJSON、またはS3に書き出したファイルの情報",
     operation_id="fetchAllBGLItems",
     responses={
-        200: {"description": "全ての血糖値データの取得に成功"},
+        200: EXPORT_RESPONSE,
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
     },
 )
-def fetch_all_bgl_items() -> List[BGLSchema]:
-    return controller.find_all()  # type: ignore
+def fetch_all_bgl_items(
+    cursor: Annotated[
+        Optional[str],
+        Query(
+            title="カーソル",
+            description="前回のエクスポートの`X-Next-Cursor`ヘッダー、または`nextCursor`",
+        ),
+    ] = None,
+    destination: Annotated[
+        Literal["inline", "s3"],
+        Query(
+            title="書き出し先",
+            description="`inline`はレスポンスにNDJSONを返し、`s3`はS3に書き出して署名付きURLを返します",
+        ),
+    ] = "inline",
+) -> Response[ExportSchema]:
+    return export_response(  # type: ignore
+        controller.export_all, ("user_id", "record_time"), "bgl", cursor, destination
+    )
 
 
 @tracer.capture_method
@@ -138,6 +191,143 @@ def create_bgl_item(item: BGLCreateRequestSchema) -> BGLSchema:
     return controller.create_one(item), HTTPStatus.CREATED
 
 
+@tracer.capture_method
+@router.post(
+    "/batch",
+    tags=["BGL"],
+    summary="血糖値データを一括登録",
+    description=f"""
+## 概要
+
+複数の血糖値データを1回のリクエストで登録します。
+
+## 詳細
+
+オフラインで記録したデータをまとめて送るためのエンドポイントです。
+`items`に`BGLCreateRequestSchema`を最大{MAX_BATCH_SIZE}件まで指定してください。
+
+データは25件ずつ`BatchWriteItem`で書き込まれ、DynamoDBが処理しきれなかったデータは待ち時間を増やしながら再試行されます。
+結果は`items`と同じ順番で1件ごとに返されます。全て登録できた場合は`201 Created`、
+1件でも失敗した場合は`207 Multi-Status`が返されるので、`status`が`failed`のデータだけを再送してください。
+
+## 仕様
+
+`POST /`と同じく、同じユーザーの同じ`recordTime`のデータが既にある場合は上書きされます。
+リクエストの中に同じユーザーの同じ`recordTime`のデータが複数ある場合は、最初の1件だけが登録されます。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+""",
+    response_description="1件ごとの登録結果",
+    operation_id="createManyBGLItems",
+    responses={
+        201: {
+            "description": "全ての血糖値データの登録に成功",
+            "content": {"application/json": {"model": BGLBatchCreateResponseSchema}},
+        },
+        207: {
+            "description": "一部の血糖値データの登録に失敗",
+            "content": {"application/json": {"model": BGLBatchCreateResponseSchema}},
+        },
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def create_many_bgl_items(data: BGLBatchCreateRequestSchema) -> BGLBatchCreateResponseSchema:
+    result = controller.create_many(data.items)
+    return result, HTTPStatus.CREATED if result.failed == 0 else HTTPStatus.MULTI_STATUS
+
+
+@tracer.capture_method
+@router.post(
+    "/batch-get",
+    tags=["BGL"],
+    summary="複数の血糖値データをIDで取得",
+    description=f"""
+## 概要
+
+`ids`で指定された血糖値データをまとめて取得します。
+
+## 詳細
+
+`GET /<bglId>`を繰り返す代わりに使います。IDは最大{MAX_BATCH_SIZE}件まで指定できます。
+IDごとの検索は並列に行われます。
+
+結果は`ids`と同じ順番(重複したIDは1つにまとめられます)でIDごとに返されます。
+全て取得できた場合は`200 OK`、見つからないIDがあった場合は`207 Multi-Status`が返されます。
+論理削除済みのデータも取得されます(`isDeleted`が`true`)。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+""",
+    response_description="IDごとの取得結果",
+    operation_id="fetchManyBGLItems",
+    responses={
+        200: {
+            "description": "全ての血糖値データの取得に成功",
+            "content": {"application/json": {"model": BGLBatchIdResponseSchema}},
+        },
+        207: {
+            "description": "一部の血糖値データが見つからない、または取得に失敗",
+            "content": {"application/json": {"model": BGLBatchIdResponseSchema}},
+        },
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def fetch_many_bgl_items(data: BatchIdsRequestSchema) -> BGLBatchIdResponseSchema:
+    result = controller.find_many(data.ids)
+    return result, HTTPStatus.OK if result.failed == 0 else HTTPStatus.MULTI_STATUS
+
+
+@tracer.capture_method
+@router.post(
+    "/batch-delete",
+    tags=["BGL"],
+    summary="複数の血糖値データを論理削除",
+    description=f"""
+## 概要
+
+`ids`で指定された血糖値データをまとめて論理削除します。
+
+## 詳細
+
+`DELETE /<bglId>`を繰り返す代わりに使います。IDは最大{MAX_BATCH_SIZE}件まで指定できます。
+IDごとの論理削除は`DELETE /<bglId>`と同じ条件付き更新で、並列に行われます。
+
+結果は`ids`と同じ順番(重複したIDは1つにまとめられます)でIDごとに返されます。
+全て論理削除できた場合は`200 OK`、1件でも失敗した場合は`207 Multi-Status`が返されます。
+見つからないIDは`not_found`、同時に`recordTime`が変更された場合などは`failed`になります。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+""",
+    response_description="IDごとの論理削除の結果",
+    operation_id="deleteManyBGLItems",
+    responses={
+        200: {
+            "description": "全ての血糖値データの論理削除に成功",
+            "content": {"application/json": {"model": BGLBatchIdResponseSchema}},
+        },
+        207: {
+            "description": "一部の血糖値データの論理削除に失敗",
+            "content": {"application/json": {"model": BGLBatchIdResponseSchema}},
+        },
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def delete_many_bgl_items(data: BatchIdsRequestSchema) -> BGLBatchIdResponseSchema:
+    result = controller.delete_many(data.ids)
+    return result, HTTPStatus.OK if result.failed == 0 else HTTPStatus.MULTI_STATUS
+
+
 @tracer.capture_method
 @router.put(
     "/<bglId>",
@@ -154,14 +344,20 @@ idで指定された血糖値データを更新します。更新するデータ
 
 ## 仕様
 
-変更に関して、`dynamodb`の仕様により、`range key`の変更ができない仕様になります。
-そのため、更新は実質的に削除と新規作成の組み合わせとなります。
+`recordTime`が変わらない場合は、1回の条件付き更新(`UpdateItem`)で更新されます。
+`recordTime`を変更する場合は、`dynamodb`の仕様により`range key`の変更ができないため、
+旧データの削除と新データの作成を1つのトランザクションで行います。どちらの場合もデータのIDは変わりません。
 <strike>よって、**データのIDが変更されることに注意**してください。</strike>
 
+データは更新されるたびに`version`が1ずつ増えます。リクエストに取得時の`version`を指定すると、
+その間に他のリクエストで更新されていた場合は`409 Conflict`が返されます(楽観ロック)。
+変更後の`recordTime`に既にデータが存在する場合も`409 Conflict`が返されます。
+
 ## 変更履歴
 
 - 2024/5/14: エンドポイントを追加
 - 2024/5/23: IDの変更に関する仕様変更
+- 2026/10/18: 条件付き更新と楽観ロック(`version`)を追加
 """,
     response_description="更新されたデータ",
     operation_id="updateBGLItem",
@@ -169,6 +365,7 @@ idで指定された血糖値データを更新します。更新するデータ
         200: {"description": "血糖値データの更新に成功"},
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
+        409: errors.CONFLICT_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
     },
 )
@@ -207,6 +404,7 @@ IDで指定された血糖値データを論理削除します。論理削除さ
 ## 変更履歴
 
 - 2024/5/14: エンドポイントを追加
+- 2026/10/18: 論理削除と同時に`version`を1つ進め、同時に`recordTime`が変更された場合は`409 Conflict`を返すように変更
 """,
     response_description="削除したデータ",
     operation_id="deleteBGLItem",
@@ -214,6 +412,7 @@ IDで指定された血糖値データを論理削除します。論理削除さ
         200: {"description": "データの論理削除に成功"},
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
+        409: errors.CONFLICT_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
     },
 )
@@ -236,7 +435,7 @@ def delete_bgl_item(
     "/query",
     tags=["BGL"],
     summary="クエリパラメータを使ったデータの取得",
-    description="""
+    description=f"""
 ## 概要
 
 クエリパラメータを使って、特定のユーザーの期間内における血糖値データを取得します。
@@ -251,14 +450,56 @@ def delete_bgl_item(
 また、指定された期間内のデータのみ取得されます。
 指定された期間は、開始日と終了日の両方が含まれます。
 
+### ページネーション
+
+`limit`または`cursor`を指定すると、`recordTime`の昇順で最大`limit`件ずつのページとして返します。
+レスポンスは`{{"items": [...], "nextCursor": "..."}}`の形式になります。
+次のページは、同じ`userId`・`from`・`to`に前のレスポンスの`nextCursor`を`cursor`として指定して取得します。
+別の期間(`from`・`to`)で発行された`cursor`を指定すると`400 Bad Request`を返します。
+`nextCursor`が`null`になったら最後のページです(最後のページが空になる場合があります)。
+`cursor`だけを指定した場合の`limit`は{DEFAULT_PAGE_SIZE}件、`limit`の上限は{MAX_PAGE_SIZE}件です。
+
+`limit`と`cursor`を指定しない場合は、これまで通り期間内の全データを配列で返します。
+
+### 間引き・集計
+
+長い期間のグラフを描画するときは、`maxPoints`または`resolution`を指定してデータの件数を減らせます。
+レスポンスの大きさはデータの件数ではなく、指定した点数・区間の数で決まります。
+
+- `maxPoints`: 期間内のデータから、グラフの形(山と谷)を保つように最大`maxPoints`件を選んで返します(LTTB)。
+  レスポンスの形式は全データの場合と同じです。グラフの横幅(px)程度の値を指定してください({MIN_POINTS}〜{MAX_POINTS})
+- `resolution`: `hourly`・`daily`・`weekly`を指定すると、1時間・1日・1週間(月曜日始まり)ごとの
+  件数・平均値・最小値・最大値を`ValueBucketSchema`の配列で返します。区間はUTCで区切り、データのない区間は含まれません
+
+`maxPoints`は`resolution=raw`(既定値)の場合のみ、どちらもページネーションとは同時に指定できません。
+
+### キャッシュ
+
+成功したレスポンスには`ETag`ヘッダーが付きます。同じリクエストに前回の`ETag`を`If-None-Match`ヘッダーで付けると、
+そのユーザーの血糖値・HbA1cデータが変わっていない場合は本文なしの`304 Not Modified`を返すので、手元のデータをそのまま使えます。
+ただし、そのユーザーのデータが書き込まれた直後(数秒間)のレスポンスには`ETag`が付きません。
+
 ## 変更履歴
 
 - 2024/5/14: エンドポイントを追加
+- 2026/10/18: `limit`と`cursor`によるページネーションを追加
+- 2026/10/18: レスポンスのJSONをサービスで一度に生成するように変更(レスポンスの形式は変更なし)
+- 2026/10/18: `maxPoints`による間引きと`resolution`による集計を追加
+- 2026/10/18: `ETag`による条件付きGETに対応(`If-None-Match`が最新なら`304 Not Modified`)
 """,
-    response_description="取得したデータの配列",
+    response_description="取得したデータの配列、ページ、または区間ごとの集計",
     operation_id="queryBGLItems",
+    middlewares=[conditional_get_middleware],
     responses={
-        200: {"description": "指定されたデータの取得に成功"},
+        200: {
+            "description": "指定されたデータの取得に成功",
+            "content": {
+                "application/json": {
+                    "model": List[BGLSchema] | BGLPageSchema | List[ValueBucketSchema]
+                }
+            },
+        },
+        304: NOT_MODIFIED_RESPONSE,
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
@@ -294,7 +535,41 @@ def fetch_bgl_items_by_user_id(
             example=datetime.now().strftime("%Y%m%d"),
         ),
     ],
-) -> List[BGLSchema]:
+    limit: Annotated[
+        Optional[int],
+        Query(
+            title="1ページの件数",
+            description="1ページで取得するデータの最大件数。指定するとページ形式で返します",
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            example=100,
+        ),
+    ] = None,
+    cursor: Annotated[
+        Optional[str],
+        Query(
+            title="カーソル",
+            description="前のページのレスポンスに含まれる`nextCursor`",
+        ),
+    ] = None,
+    resolution: Annotated[
+        Resolution,
+        Query(
+            title="解像度",
+            description="`raw`は個々のデータ、`hourly`・`daily`・`weekly`は区間ごとの集計を返します",
+        ),
+    ] = Resolution.RAW,
+    maxPoints: Annotated[
+        Optional[int],
+        Query(
+            title="最大件数",
+            description="グラフの形を保つように間引いて返す最大件数(`resolution=raw`のみ)",
+            ge=MIN_POINTS,
+            le=MAX_POINTS,
+            example=1000,
+        ),
+    ] = None,
+) -> Response[str]:
     try:
         __from = datetime.strptime(_from, "%Y%m%d")
         __to = datetime.strptime(_to, "%Y%m%d")
@@ -302,4 +577,323 @@ def fetch_bgl_items_by_user_id(
             raise BadRequestError("Invalid date range. Start date should be less than end date")
     except ValueError:
         raise BadRequestError("Invalid date format. Please use YYYYMMDD format")
-    return controller.find_many_by_user_id(userId, __from, __to)  # type: ignore
+    if resolution != Resolution.RAW or maxPoints is not None:
+        if limit is not None or cursor is not None:
+            raise BadRequestError("limit and cursor cannot be used with resolution or maxPoints")
+        if resolution == Resolution.RAW:
+            body = controller.find_downsampled_json_by_user_id(userId, __from, __to, maxPoints)
+            return json_response(body)  # type: ignore
+        if maxPoints is not None:
+            raise BadRequestError("maxPoints can only be used with resolution=raw")
+        body = controller.find_buckets_json_by_user_id(userId, __from, __to, resolution)
+        return json_response(body)  # type: ignore
+    if limit is None and cursor is None:
+        body = controller.find_many_json_by_user_id(userId, __from, __to)
+        return json_response(body)  # type: ignore
+    last_evaluated_key = None
+    if cursor is not None:
+        try:
+            last_evaluated_key = decode_cursor(cursor)
+        except ValueError:
+            raise BadRequestError("Invalid cursor")
+        # NOTE: 他のユーザーのcursorで読み進められないようにする
+        if not is_cursor_of_user(last_evaluated_key, userId):
+            raise BadRequestError("Invalid cursor")
+        # NOTE: 別の期間のcursorはQueryの条件を満たさず、DynamoDBのエラー(500)になる
+        if not is_cursor_in_range(last_evaluated_key, __from, __to):
+            raise BadRequestError("Invalid cursor. It was issued for another date range")
+    return json_response(  # type: ignore
+        controller.find_page_json_by_user_id(
+            userId, __from, __to, limit or DEFAULT_PAGE_SIZE, last_evaluated_key
+        )
+    )
+
+
+@tracer.capture_method
+@router.get(
+    "/summary",
+    tags=["BGL"],
+    summary="日ごとの集計を取得",
+    description=f"""
+## 概要
+
+特定のユーザーの期間内における血糖値データの、日・時間帯ごとの集計を取得します。
+
+## 詳細
+
+日(記録時間の日付)と時間帯(`eventTiming`)ごとに、件数・最小値・最大値・平均値・二乗和を返します。
+集計はデータの登録・更新・削除のたびに更新されるので、生データを全件取得せずにグラフを描画できます。
+書き込みのときに集計の更新に失敗した日は、このエンドポイントで読むときに集計し直します。
+論理削除されたデータは集計に含まれません。
+
+## 仕様
+
+指定された期間は、開始日と終了日の両方が含まれます。期間は最大{SUMMARY_MAX_DAYS}日です。
+レスポンスは日付、時間帯の順に並びます。データのない日・時間帯は含まれません。
+
+複数の日をまとめた分散は、`sumSquares`の合計を`count`の合計で割った値から、平均値の2乗を引いて求められます。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+- 2026/10/18: `ETag`による条件付きGETに対応(`If-None-Match`が最新なら`304 Not Modified`)
+""",
+    response_description="日・時間帯ごとの集計の配列",
+    operation_id="summarizeBGLItems",
+    middlewares=[conditional_get_middleware],
+    responses={
+        200: {
+            "description": "集計の取得に成功",
+            "content": {"application/json": {"model": List[DailySummarySchema]}},
+        },
+        304: NOT_MODIFIED_RESPONSE,
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def fetch_bgl_summary_by_user_id(
+    userId: Annotated[
+        str,
+        Query(
+            ...,
+            title="ユーザーID",
+            description="取得したいユーザーのID",
+            example="asds45a98103195d7ee6748af941d2",
+        ),
+    ],
+    _from: Annotated[
+        str,
+        Query(
+            ...,
+            alias="from",
+            title="範囲開始日",
+            description="取得したい集計の範囲開始日",
+            example=(datetime.now() - timedelta(days=365)).strftime("%Y%m%d"),
+        ),
+    ],
+    _to: Annotated[
+        str,
+        Query(
+            ...,
+            alias="to",
+            title="範囲終了日",
+            description="取得したい集計の範囲終了日",
+            example=datetime.now().strftime("%Y%m%d"),
+        ),
+    ],
+) -> Response[str]:
+    try:
+        __from = datetime.strptime(_from, "%Y%m%d").date()
+        __to = datetime.strptime(_to, "%Y%m%d").date()
+    except ValueError:
+        raise BadRequestError("Invalid date format. Please use YYYYMMDD format")
+    if __from > __to:
+        raise BadRequestError("Invalid date range. Start date should be less than end date")
+    if (__to - __from).days >= SUMMARY_MAX_DAYS:
+        raise BadRequestError(f"Date range is too long. The maximum is {SUMMARY_MAX_DAYS} days")
+    return json_response(controller.find_summary_json(userId, __from, __to))  # type: ignore
+
+
+@tracer.capture_method
+@router.get(
+    "/stats",
+    tags=["BGL"],
+    summary="血糖値の統計を取得",
+    description=f"""
+## 概要
+
+特定のユーザーの期間内における血糖値データから、血糖コントロールの指標を計算して返します。
+
+## 詳細
+
+期間内の全てのデータと、時間帯(`eventTiming`)ごとに、次の指標を返します。
+
+- 件数・平均値・標準偏差・変動係数(CV)
+- GMI(平均値から推定したHbA1c)
+- 目標範囲未満・範囲内・範囲超過のデータの割合(TBR・TIR・TAR)
+
+目標範囲は`targetLow`〜`targetHigh`(両端を含む)で、既定値は{DEFAULT_TARGET_LOW:g}〜{DEFAULT_TARGET_HIGH:g}mg/dlです。
+計測の間隔は一定ではないので、割合は時間ではなくデータの件数で計算します。
+データがない場合、値は`null`になります。
+
+## 仕様
+
+取得できるデータは、指定されたユーザーIDに紐づくデータのみです。
+指定された期間は、開始日と終了日の両方が含まれます。論理削除されたデータは含まれません。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+- 2026/10/18: `ETag`による条件付きGETに対応(`If-None-Match`が最新なら`304 Not Modified`)
+""",
+    response_description="血糖値の統計",
+    operation_id="fetchBGLStats",
+    middlewares=[conditional_get_middleware],
+    responses={
+        200: {"description": "統計の取得に成功"},
+        304: NOT_MODIFIED_RESPONSE,
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def fetch_bgl_stats_by_user_id(
+    userId: Annotated[
+        str,
+        Query(
+            ...,
+            title="ユーザーID",
+            description="取得したいユーザーのID",
+            example="asds45a98103195d7ee6748af941d2",
+        ),
+    ],
+    _from: Annotated[
+        str,
+        Query(
+            ...,
+            alias="from",
+            title="範囲開始日",
+            description="統計を計算するデータの範囲開始日",
+            example=(datetime.now() - timedelta(days=14)).strftime("%Y%m%d"),
+        ),
+    ],
+    _to: Annotated[
+        str,
+        Query(
+            ...,
+            alias="to",
+            title="範囲終了日",
+            description="統計を計算するデータの範囲終了日",
+            example=datetime.now().strftime("%Y%m%d"),
+        ),
+    ],
+    targetLow: Annotated[
+        float,
+        Query(title="目標範囲の下限", description="目標範囲の下限(mg/dl)", ge=0.0),
+    ] = DEFAULT_TARGET_LOW,
+    targetHigh: Annotated[
+        float,
+        Query(title="目標範囲の上限", description="目標範囲の上限(mg/dl)", ge=0.0),
+    ] = DEFAULT_TARGET_HIGH,
+) -> BGLStatsSchema:
+    try:
+        __from = datetime.strptime(_from, "%Y%m%d")
+        __to = datetime.strptime(_to, "%Y%m%d")
+    except ValueError:
+        raise BadRequestError("Invalid date format. Please use YYYYMMDD format")
+    if __from > __to:
+        raise BadRequestError("Invalid date range. Start date should be less than end date")
+    if targetLow > targetHigh:
+        raise BadRequestError("Invalid target range. targetLow should be less than targetHigh")
+    return controller.find_stats_by_user_id(userId, __from, __to, targetLow, targetHigh)
+
+
+@tracer.capture_method
+@router.get(
+    "/agp",
+    tags=["BGL"],
+    summary="AGP(時刻ごとの血糖値の分布)を取得",
+    description=f"""
+## 概要
+
+特定のユーザーの期間内における血糖値データから、AGP(Ambulatory Glucose Profile)を計算して返します。
+
+## 詳細
+
+期間内のデータを記録時間の時刻で`bucketMinutes`分ごとの時刻帯に分け、
+時刻帯ごとの件数と、血糖値の5・25・50(中央値)・75・95パーセンタイルを返します。
+データの件数によらず、レスポンスは時刻帯の数(1440 / `bucketMinutes`)の長さの配列になります。
+データのない時刻帯のパーセンタイルは`null`です。
+
+時刻は保存されている記録時間(UTC)の時刻に`utcOffset`分を足して計算します。
+期間の日付は他のエンドポイントと同じく、保存されている記録時間の日付で判定します。
+
+## 仕様
+
+取得できるデータは、指定されたユーザーIDに紐づくデータのみです。論理削除されたデータは含まれません。
+期間は開始日と終了日の両方を含めて{AGP_MIN_DAYS}〜{AGP_MAX_DAYS}日にしてください。
+`bucketMinutes`は{AGP_MIN_BUCKET_MINUTES}〜{AGP_MAX_BUCKET_MINUTES}分で、1440(1日)を割り切れる値にしてください。
+
+同じユーザー・期間の結果は、Lambdaのコンテナ内で`AGP_CACHE_TTL`秒キャッシュします。
+キャッシュはそのユーザーのデータのバージョンごとなので、どのコンテナでデータが登録・更新・削除されても、
+次のリクエストからは新しいデータで計算し直した結果を返します。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+- 2026/10/18: `ETag`による条件付きGETに対応(`If-None-Match`が最新なら`304 Not Modified`)
+- 2026/10/18: キャッシュをデータのバージョンごとにし、他のコンテナでの変更もすぐに反映されるように変更
+""",
+    response_description="時刻帯ごとの血糖値のパーセンタイル",
+    operation_id="fetchBGLAgp",
+    middlewares=[conditional_get_middleware],
+    responses={
+        200: {"description": "AGPの取得に成功"},
+        304: NOT_MODIFIED_RESPONSE,
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def fetch_bgl_agp_by_user_id(
+    userId: Annotated[
+        str,
+        Query(
+            ...,
+            title="ユーザーID",
+            description="取得したいユーザーのID",
+            example="asds45a98103195d7ee6748af941d2",
+        ),
+    ],
+    _from: Annotated[
+        str,
+        Query(
+            ...,
+            alias="from",
+            title="範囲開始日",
+            description="AGPを計算するデータの範囲開始日",
+            example=(datetime.now() - timedelta(days=13)).strftime("%Y%m%d"),
+        ),
+    ],
+    _to: Annotated[
+        str,
+        Query(
+            ...,
+            alias="to",
+            title="範囲終了日",
+            description="AGPを計算するデータの範囲終了日",
+            example=datetime.now().strftime("%Y%m%d"),
+        ),
+    ],
+    bucketMinutes: Annotated[
+        int,
+        Query(
+            title="時刻の区切り",
+            description="1つの時刻帯の長さ(分)",
+            ge=AGP_MIN_BUCKET_MINUTES,
+            le=AGP_MAX_BUCKET_MINUTES,
+        ),
+    ] = AGP_DEFAULT_BUCKET_MINUTES,
+    utcOffset: Annotated[
+        int,
+        Query(
+            title="UTCとの時差",
+            description="時刻の計算に使うUTCとの時差(分)。日本時間は540",
+            ge=-720,
+            le=840,
+        ),
+    ] = 0,
+) -> AGPSchema:
+    try:
+        __from = datetime.strptime(_from, "%Y%m%d")
+        __to = datetime.strptime(_to, "%Y%m%d")
+    except ValueError:
+        raise BadRequestError("Invalid date format. Please use YYYYMMDD format")
+    if not AGP_MIN_DAYS <= (__to - __from).days + 1 <= AGP_MAX_DAYS:
+        raise BadRequestError(
+            f"Invalid date range. The range should be {AGP_MIN_DAYS} to {AGP_MAX_DAYS} days"
+        )
+    if (24 * 60) % bucketMinutes:
+        raise BadRequestError("Invalid bucketMinutes. It should divide 1440 (a day)")
+    return controller.find_agp_by_user_id(userId, __from, __to, bucketMinutes, utcOffset)
@@ -1,17 +1,22 @@
 # Standard Library
 from datetime import datetime, timedelta
-from typing import List
+from http import HTTPStatus
+from typing import List, Optional
 
 # Third Party Library
 from aws_lambda_powertools import Logger, Tracer
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
 from aws_lambda_powertools.event_handler.api_gateway import Router
 from aws_lambda_powertools.event_handler.exceptions import BadRequestError
 from aws_lambda_powertools.event_handler.openapi.params import Query
 from aws_lambda_powertools.shared.types import Annotated
 from controllers.bgl_and_hba1c import BGLAndHba1cController
+from helper.etag import NOT_MODIFIED_RESPONSE
+from helper.json_response import json_response
+from middlewares.common import conditional_get_middleware
 from schemas import errors
-from schemas.bgl_and_hba1c import BGLAndHba1cSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cCreateRequestSchema, BGLAndHba1cSchema
+from schemas.downsampling import MAX_POINTS, MIN_POINTS, BGLAndHba1cBucketSchema, Resolution
 
 app = APIGatewayRestResolver(debug=True)
 router = Router()
@@ -26,27 +31,58 @@ tracer = Tracer("BGLAndHba1cAPI")
     "/query",
     tags=["BGLAndHba1c"],
     summary="クエリパラメータを使ったBGLとHbA1cデータの取得",
-    description="""
+    description=f"""
 ## 概要
 
 クエリパラメータを使って、特定のユーザーの期間内における血糖値とHbA1cデータを取得します。
 
 ## 詳細
 データは日時をキーとして昇順にソートされています。
+血糖値とHbA1cのデータは同時に取得するので、応答時間は遅い方の取得時間とほぼ同じになります。
 
 ## 仕様
 取得できるデータは、指定されたユーザーIDに紐づくデータのみです。
 また、指定された期間内のデータのみ取得されます。
 指定された期間は、開始日と終了日の両方が含まれます。
 
+### 間引き・集計
+
+長い期間のグラフを描画するときは、`maxPoints`または`resolution`を指定してデータの件数を減らせます。
+
+- `maxPoints`: 血糖値とHbA1cをそれぞれ、グラフの形(山と谷)を保つように最大`maxPoints`件まで間引いてから結合します(LTTB)。
+  レスポンスの形式は全データの場合と同じです({MIN_POINTS}〜{MAX_POINTS})
+- `resolution`: `hourly`・`daily`・`weekly`を指定すると、1時間・1日・1週間(月曜日始まり)ごとの
+  血糖値とHbA1cの件数・平均値・最小値・最大値を`BGLAndHba1cBucketSchema`の配列で返します。
+  区間はUTCで区切り、どちらのデータもない区間は含まれません
+
+`maxPoints`は`resolution=raw`(既定値)の場合のみ指定できます。
+
+### キャッシュ
+
+成功したレスポンスには`ETag`ヘッダーが付きます。同じリクエストに前回の`ETag`を`If-None-Match`ヘッダーで付けると、
+そのユーザーの血糖値・HbA1cデータが変わっていない場合は本文なしの`304 Not Modified`を返すので、手元のデータをそのまま使えます。
+
 ## 変更履歴
 
 - 2024/6/13: エンドポイントを追加
+- 2026/10/18: `/bgl-and-hba1c/query`として公開し、血糖値とHbA1cを同時に取得するように変更
+- 2026/10/18: レスポンスのJSONをサービスで一度に生成するように変更(レスポンスの形式は変更なし)
+- 2026/10/18: `maxPoints`による間引きと`resolution`による集計を追加
+- 2026/10/18: `ETag`による条件付きGETに対応(`If-None-Match`が最新なら`304 Not Modified`)
 """,
-    response_description="取得したデータの配列",
+    response_description="取得したデータの配列、または区間ごとの集計",
     operation_id="queryBGLAndHba1cItems",
+    middlewares=[conditional_get_middleware],
     responses={
-        200: {"description": "指定されたデータの取得に成功"},
+        200: {
+            "description": "指定されたデータの取得に成功",
+            "content": {
+                "application/json": {
+                    "model": List[BGLAndHba1cSchema] | List[BGLAndHba1cBucketSchema]
+                }
+            },
+        },
+        304: NOT_MODIFIED_RESPONSE,
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
@@ -82,10 +118,79 @@ def combine_bgl_and_hba1c_list(
             example=datetime.now().strftime("%Y%m%d"),
         ),
     ],
-) -> List[BGLAndHba1cSchema]:
+    resolution: Annotated[
+        Resolution,
+        Query(
+            title="解像度",
+            description="`raw`は個々のデータ、`hourly`・`daily`・`weekly`は区間ごとの集計を返します",
+        ),
+    ] = Resolution.RAW,
+    maxPoints: Annotated[
+        Optional[int],
+        Query(
+            title="最大件数",
+            description="グラフの形を保つように間引いて返す、血糖値・HbA1cそれぞれの最大件数(`resolution=raw`のみ)",
+            ge=MIN_POINTS,
+            le=MAX_POINTS,
+            example=1000,
+        ),
+    ] = None,
+) -> Response[str]:
     try:
+        __from = datetime.strptime(_from, "%Y%m%d")
+        __to = datetime.strptime(_to, "%Y%m%d")
         if _from > _to:
             raise BadRequestError("Invalid date range. Start date should be less than end date")
     except ValueError:
         raise BadRequestError("Invalid date format. Please use YYYYMMDD format")
-    return controller.combine_bgl_and_hba1c_list(userId, _from, _to)  # type: ignore
+    if resolution != Resolution.RAW:
+        if maxPoints is not None:
+            raise BadRequestError("maxPoints can only be used with resolution=raw")
+        body = controller.combine_buckets_json(userId, __from, __to, resolution)
+    elif maxPoints is not None:
+        body = controller.combine_downsampled_json(userId, __from, __to, maxPoints)
+    else:
+        body = controller.combine_bgl_and_hba1c_json(userId, __from, __to)
+    return json_response(body)  # type: ignore
+
+
+@tracer.capture_method
+@router.post(
+    "/",
+    tags=["BGLAndHba1c"],
+    summary="血糖値とHbA1cデータを同時に登録",
+    description="""
+## 概要
+
+同じ記録時間の血糖値データとHbA1cデータを1回のリクエストで登録します。
+
+## 詳細
+
+`POST /bgl/`と`POST /hba1c/`を続けて呼ぶ代わりに使います。
+2件のデータは1つのトランザクション(`TransactWriteItems`)で書き込まれるので、
+片方だけが登録されることはありません(`/bgl-and-hba1c/query`で片方だけが表示されることもありません)。
+
+`recordTime`、`eventTiming`、`sunaoFood`は両方のデータに使われます。
+登録に成功した場合は、`/bgl-and-hba1c/query`と同じ形式で登録したデータが返されます。
+
+## 仕様
+
+`POST /bgl/`、`POST /hba1c/`と同じく、同じユーザーの同じ`recordTime`のデータが既にある場合は上書きされます。
+同じデータが他のリクエストで同時に書き込まれていた場合は、どちらも登録されずに`409 Conflict`が返されます。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+""",
+    response_description="作成されたデータ",
+    operation_id="createBGLAndHba1cItem",
+    responses={
+        201: {"description": "血糖値とHbA1cデータの登録に成功"},
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        409: errors.CONFLICT_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def create_bgl_and_hba1c_item(item: BGLAndHba1cCreateRequestSchema) -> BGLAndHba1cSchema:
+    return controller.create_one(item), HTTPStatus.CREATED
@@ -1,14 +1,17 @@
 # Standard Library
-from typing import List
+from typing import List, Literal, Optional
 
 # Third Party Library
 from aws_lambda_powertools import Logger, Tracer
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, Response
 from aws_lambda_powertools.event_handler.api_gateway import Router
-from aws_lambda_powertools.event_handler.openapi.params import Body, Path
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler.openapi.params import Body, Path, Query
 from aws_lambda_powertools.shared.types import Annotated
 from controllers.user import UserController
+from helper.export import export_response
 from schemas import errors
+from schemas.export import EXPORT_RESPONSE, ExportSchema
 from schemas.user import UserCreateRequestSchema, UserSchema
 
 app = APIGatewayRestResolver(debug=True)
@@ -19,32 +22,110 @@ controller = UserController()
 logger = Logger("UserAPI")
 tracer = Tracer("UserAPI")
 
+# NOTE: 複数ユーザー取得で一度に指定できるIDの上限(BatchGetItemの1リクエストの上限)
+MAX_BATCH_USER_IDS = 100
+
 
 @router.get(
     "/",
     tags=["User"],
-    summary="開発用：全てのユーザーデータを取得",
+    summary="開発用：全てのユーザーデータをエクスポート",
     description="""
 ## 概要
 
-開発用に全てのユーザーデータを取得します。
-このエンドポイントは開発用途のみで使用してください。
+全てのユーザーデータをNDJSON形式でエクスポートします。
+
+こちらは開発用のエンドポイントです。本番環境で使用されることを想定していません。
+
+## 詳細
+
+テーブルを少しずつScanしながら、1行に1件の`UserSchema`(JSON)を書き出します。
+論理削除済みのデータも含まれます。
+
+1回のリクエストで書き出すのは、約20秒分かつ5MBまでです。
+続きがある場合は`X-Next-Cursor`ヘッダーにカーソルが入るので、`cursor`に指定して続きを取得してください。
+`X-Next-Cursor`ヘッダーがなければ全て書き出し済みです。
+
+`destination=s3`を指定すると、NDJSONをS3に書き出して署名付きURL(有効期限1時間)を返します。
+この場合はサイズの上限がなく、続きのカーソルはレスポンスの`nextCursor`に入ります。
 
 ## 変更履歴
 
 - 2024/6/3: エンドポイントを追加
+- 2026/10/18: 全件を1つの配列で返す代わりに、NDJSONで分割してエクスポートするように変更
 """,
-    response_description="全てのユーザーデータの取得に成功",
+    response_description="NDJSON、またはS3に書き出したファイルの情報",
     operation_id="fetchAllUserData",
     responses={
-        200: {"description": "全てのユーザーデータの取得に成功"},
+        200: EXPORT_RESPONSE,
         400: errors.BAD_REQUEST_ERROR,
         401: errors.UNAUTHORIZED_ERROR,
         500: errors.INTERNAL_SERVER_ERROR,
     },
 )
-def find_all() -> List[UserSchema]:
-    return controller.find_all()  # type: ignore
+def find_all(
+    cursor: Annotated[
+        Optional[str],
+        Query(
+            title="カーソル",
+            description="前回のエクスポートの`X-Next-Cursor`ヘッダー、または`nextCursor`",
+        ),
+    ] = None,
+    destination: Annotated[
+        Literal["inline", "s3"],
+        Query(
+            title="書き出し先",
+            description="`inline`はレスポンスにNDJSONを返し、`s3`はS3に書き出して署名付きURLを返します",
+        ),
+    ] = "inline",
+) -> Response[ExportSchema]:
+    return export_response(controller.export_all, ("id",), "user", cursor, destination)  # type: ignore
+
+
+@router.get(
+    "/batch",
+    tags=["User"],
+    summary="IDを複数指定してユーザーデータを取得",
+    description=f"""
+## 概要
+
+IDを複数指定してユーザーデータをまとめて取得します。
+
+## 詳細
+
+`userIds`にカンマ区切りでユーザーIDを指定してください。一度に指定できるIDは{MAX_BATCH_USER_IDS}件までです。
+レスポンスは指定された順に並びます。存在しないユーザーIDは結果に含まれません。
+
+## 変更履歴
+
+- 2026/10/18: エンドポイントを追加
+""",
+    response_description="ユーザーデータの配列",
+    operation_id="fetchUserDataByIds",
+    responses={
+        200: {"description": "ユーザーデータの取得に成功"},
+        400: errors.BAD_REQUEST_ERROR,
+        401: errors.UNAUTHORIZED_ERROR,
+        500: errors.INTERNAL_SERVER_ERROR,
+    },
+)
+def find_many(
+    userIds: Annotated[
+        str,
+        Query(
+            ...,
+            title="ユーザーIDのリスト",
+            description="取得したいユーザーのID(カンマ区切り)",
+            example="000001,000002",
+        ),
+    ],
+) -> List[UserSchema]:
+    user_ids = [user_id.strip() for user_id in userIds.split(",") if user_id.strip()]
+    if not user_ids:
+        raise BadRequestError("userIds must not be empty")
+    if len(user_ids) > MAX_BATCH_USER_IDS:
+        raise BadRequestError(f"userIds must be {MAX_BATCH_USER_IDS} or less")
+    return controller.find_many(user_ids)  # type: ignore
 
 
 @router.get(
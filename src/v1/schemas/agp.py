@@ -0,0 +1,59 @@
+# Standard Library
+import datetime
+from typing import List
+
+# Third Party Library
+from pydantic import Field
+from schemas.base import BaseSchema
+
+# NOTE: AGP(Ambulatory Glucose Profile)の期間(日数)。14日未満では時刻ごとの分布が安定しない
+AGP_MIN_DAYS = 14
+AGP_MAX_DAYS = 90
+# NOTE: 時刻の区切り(分)。1日(1440分)を割り切れる値だけを受け付ける
+AGP_DEFAULT_BUCKET_MINUTES = 60
+AGP_MIN_BUCKET_MINUTES = 15
+AGP_MAX_BUCKET_MINUTES = 240
+AGP_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class AGPSchema(BaseSchema):
+    start_date: datetime.date = Field(
+        ..., title="範囲開始日", description="集計したデータの範囲開始日", example="2024-01-01"  # type: ignore
+    )
+    end_date: datetime.date = Field(
+        ..., title="範囲終了日", description="集計したデータの範囲終了日", example="2024-01-14"  # type: ignore
+    )
+    bucket_minutes: int = Field(
+        ..., title="時刻の区切り", description="1つの時刻帯の長さ(分)", example=60  # type: ignore
+    )
+    utc_offset: int = Field(
+        ..., title="UTCとの時差", description="時刻の計算に使ったUTCとの時差(分)", example=0  # type: ignore
+    )
+    count: int = Field(..., title="件数", description="集計したデータの件数", example=210)  # type: ignore
+    times: List[str] = Field(
+        ...,
+        title="時刻帯",
+        description="各時刻帯の開始時刻(HH:MM)。以下の配列は全てこの順に並びます",
+        example=["00:00", "01:00"],  # type: ignore
+    )
+    counts: List[int] = Field(
+        ..., title="時刻帯ごとの件数", description="各時刻帯のデータの件数", example=[8, 6]  # type: ignore
+    )
+    p5: List[float | None] = Field(
+        ...,
+        title="5パーセンタイル",
+        description="各時刻帯の血糖値の5パーセンタイル(mg/dl)。データのない時刻帯は`null`",
+        example=[72.0, None],  # type: ignore
+    )
+    p25: List[float | None] = Field(
+        ..., title="25パーセンタイル", description="各時刻帯の血糖値の25パーセンタイル(mg/dl)", example=[88.5, None]  # type: ignore
+    )
+    p50: List[float | None] = Field(
+        ..., title="中央値", description="各時刻帯の血糖値の中央値(mg/dl)", example=[101.0, None]  # type: ignore
+    )
+    p75: List[float | None] = Field(
+        ..., title="75パーセンタイル", description="各時刻帯の血糖値の75パーセンタイル(mg/dl)", example=[118.0, None]  # type: ignore
+    )
+    p95: List[float | None] = Field(
+        ..., title="95パーセンタイル", description="各時刻帯の血糖値の95パーセンタイル(mg/dl)", example=[152.3, None]  # type: ignore
+    )
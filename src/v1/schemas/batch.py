@@ -0,0 +1,29 @@
+# Standard Library
+from enum import Enum
+from typing import List
+
+# Third Party Library
+from pydantic import Field
+from schemas.base import BaseSchema
+
+# NOTE: 一括処理で1回のリクエストに含められる最大件数
+MAX_BATCH_SIZE = 500
+
+
+class BatchItemStatus(str, Enum):
+    CREATED = "created"
+    FOUND = "found"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
+
+
+class BatchIdsRequestSchema(BaseSchema):
+    ids: List[str] = Field(
+        ...,
+        title="データID",
+        description=f"対象のデータID(最大{MAX_BATCH_SIZE}件)。重複したIDは1つにまとめられます",
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        example=["e7b45a9810317095d7ee6748af941d2"],  # type: ignore
+    )
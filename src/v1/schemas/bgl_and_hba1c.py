@@ -60,3 +60,41 @@ class BGLAndHba1cSchema(BaseSchema):
         ge=0.0,
         example=5.5,  # type: ignore
     )
+
+
+class BGLAndHba1cCreateRequestSchema(BaseSchema):
+    user_id: str = Field(
+        ..., title="User ID", description="ユーザーのID", example=generate_id()  # type: ignore
+    )
+    record_time: datetime = Field(
+        ...,
+        title="記録時間",
+        description="ユーザーが計測した時間。血糖値とHbA1cの両方に使われる",
+        example=datetime.now().isoformat(),  # type: ignore
+    )
+    event_timing: EventTiming = Field(
+        ...,
+        title="時間帯",
+        description="ユーザーが計測した時間帯。血糖値とHbA1cの両方に使われる",
+        example=EventTiming.AFTER_MEAL,  # type: ignore
+    )
+    sunao_food: SunaoFoods | None = Field(
+        default=None,
+        title="SUNAO商品の摂取",
+        description="SUNAO商品の摂取の有無。血糖値とHbA1cの両方に使われる",
+        example=SunaoFoods.PASTA,  # type: ignore
+    )
+    bgl_value: float = Field(
+        ...,
+        title="血糖値の値(mg/dl)",
+        description="実際に計測したユーザーの血糖値の値",
+        ge=0.0,
+        example=89.0,  # type: ignore
+    )
+    hba1c_value: float = Field(
+        ...,
+        title="Hba1cの値(%)",
+        description="実際に計測したユーザーのHba1cの値(%)",
+        ge=0.0,
+        example=5.5,  # type: ignore
+    )
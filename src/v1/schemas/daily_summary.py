@@ -0,0 +1,29 @@
+# Standard Library
+import datetime
+
+# Third Party Library
+from pydantic import Field
+from schemas.base import BaseSchema
+from schemas.event_timing import EventTiming
+
+# NOTE: 集計を取得できる期間(日数)の上限。1年分(366日×時間帯)でも1回のQueryで読める件数
+SUMMARY_MAX_DAYS = 366
+
+
+class DailySummarySchema(BaseSchema):
+    date: datetime.date = Field(
+        ..., title="日付", description="計測した日(記録時間の日付)", example="2024-01-01"  # type: ignore
+    )
+    event_timing: EventTiming = Field(
+        ..., title="時間帯", description="ユーザーが計測した時間帯", example=EventTiming.AFTER_MEAL  # type: ignore
+    )
+    count: int = Field(..., title="件数", description="その日・時間帯のデータの件数", example=3)  # type: ignore
+    min_value: float = Field(..., title="最小値", description="値の最小値", example=82.0)  # type: ignore
+    max_value: float = Field(..., title="最大値", description="値の最大値", example=141.0)  # type: ignore
+    mean: float = Field(..., title="平均値", description="値の平均値", example=104.3)  # type: ignore
+    sum_squares: float = Field(
+        ...,
+        title="二乗和",
+        description="値の二乗の合計。複数の日をまとめた分散・標準偏差の計算に使います",
+        example=33437.0,  # type: ignore
+    )
@@ -0,0 +1,49 @@
+# Standard Library
+from datetime import datetime
+from enum import Enum
+
+# Third Party Library
+from pydantic import Field
+from schemas.base import BaseSchema
+
+# NOTE: maxPointsの範囲。グラフの横幅(px)程度を想定する
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+
+class Resolution(str, Enum):
+    RAW = "raw"
+    HOURLY = "hourly"
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+class BucketStatsSchema(BaseSchema):
+    count: int = Field(..., title="件数", description="区間内のデータの件数", example=4)  # type: ignore
+    mean: float = Field(..., title="平均値", description="区間内の値の平均値", example=112.5)  # type: ignore
+    min_value: float = Field(..., title="最小値", description="区間内の値の最小値", example=88.0)  # type: ignore
+    max_value: float = Field(..., title="最大値", description="区間内の値の最大値", example=141.0)  # type: ignore
+
+
+class ValueBucketSchema(BucketStatsSchema):
+    start: datetime = Field(
+        ...,
+        title="区間の開始時刻",
+        description="区間(1時間・1日・1週間)の開始時刻(UTC)。週は月曜日から始まります",
+        example=datetime(2024, 1, 1).isoformat(),  # type: ignore
+    )
+
+
+class BGLAndHba1cBucketSchema(BaseSchema):
+    start: datetime = Field(
+        ...,
+        title="区間の開始時刻",
+        description="区間(1時間・1日・1週間)の開始時刻(UTC)。週は月曜日から始まります",
+        example=datetime(2024, 1, 1).isoformat(),  # type: ignore
+    )
+    bgl: BucketStatsSchema | None = Field(
+        default=None, title="血糖値", description="区間内の血糖値の集計。データがない場合は`null`"
+    )
+    hba1c: BucketStatsSchema | None = Field(
+        default=None, title="HbA1c", description="区間内のHbA1cの集計。データがない場合は`null`"
+    )
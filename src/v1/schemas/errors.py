@@ -55,6 +55,22 @@ HTTPのステータスコードです。
     message: str = Field(..., title="エラーメッセージ", description="Not Found Error Message", example="Not Found")  # type: ignore
 
 
+class ConflictErrorSchema(BaseSchema):
+    """Conflict Error Schema"""
+
+    status_code: int = Field(
+        ...,
+        title="HTTPステータスコード",
+        description="""
+HTTPのステータスコードです。
+詳しくは、[HTTPステータスコード](https://developer.mozilla.org/ja/docs/Web/HTTP/Status)を参照してください。
+これがレスポンスの型に入るのはLambda Powertoolsの仕様です。
+""",
+        example=HTTPStatus.CONFLICT.value,  # type: ignore
+    )
+    message: str = Field(..., title="エラーメッセージ", description="Conflict Error Message", example="Conflict")  # type: ignore
+
+
 class InternalServerErrorSchema(BaseSchema):
     """Internal Server Error Schema"""
 
@@ -88,6 +104,10 @@ NOT_FOUND_ERROR = OpenAPIResponse(
     description="Not Found Error",
     content={"application/json": {"schema": NotFoundErrorSchema.model_json_schema()}},
 )
+CONFLICT_ERROR = OpenAPIResponse(
+    description="Conflict Error",
+    content={"application/json": {"schema": ConflictErrorSchema.model_json_schema()}},
+)
 INTERNAL_SERVER_ERROR = OpenAPIResponse(
     description="Internal Server Error",
     content={"application/json": {"schema": InternalServerErrorSchema.model_json_schema()}},
@@ -0,0 +1,37 @@
+# Third Party Library
+from aws_lambda_powertools.event_handler.openapi.types import OpenAPIResponse
+from pydantic import Field
+from schemas.base import BaseSchema
+
+
+class ExportSchema(BaseSchema):
+    """S3に書き出したエクスポートの情報"""
+
+    url: str = Field(
+        ...,
+        title="ダウンロードURL",
+        description="書き出したNDJSONファイルの署名付きURL",
+        example="https://example-bucket.s3.amazonaws.com/exports/bgl/20240101000000-xxxx.ndjson",  # type: ignore
+    )
+    count: int = Field(..., title="件数", description="書き出したデータの件数", example=1000)  # type: ignore
+    size: int = Field(..., title="サイズ", description="書き出したファイルのバイト数", example=350000)  # type: ignore
+    next_cursor: str | None = Field(
+        default=None,
+        title="次のカーソル",
+        description="続きを書き出すときに`cursor`に指定する値。全て書き出した場合は`null`",
+        example=None,  # type: ignore
+    )
+
+
+EXPORT_RESPONSE = OpenAPIResponse(
+    description="エクスポートに成功",
+    content={
+        "application/x-ndjson": {
+            "schema": {
+                "type": "string",
+                "description": "1行に1件のデータ(JSON)を並べたNDJSON。続きがある場合は`X-Next-Cursor`ヘッダーにカーソルが入ります",
+            }
+        },
+        "application/json": {"schema": ExportSchema.model_json_schema()},
+    },
+)
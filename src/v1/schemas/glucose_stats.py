@@ -0,0 +1,72 @@
+# Standard Library
+from typing import List
+
+# Third Party Library
+from pydantic import Field
+from schemas.base import BaseSchema
+from schemas.event_timing import EventTiming
+
+# NOTE: 目標範囲(mg/dl)の既定値。国際コンセンサス(TIR 70-180mg/dl)に合わせる
+DEFAULT_TARGET_LOW = 70.0
+DEFAULT_TARGET_HIGH = 180.0
+
+
+class GlucoseStatsSchema(BaseSchema):
+    count: int = Field(..., title="件数", description="集計したデータの件数", example=120)  # type: ignore
+    mean: float | None = Field(
+        default=None, title="平均値", description="血糖値の平均値(mg/dl)", example=128.4  # type: ignore
+    )
+    sd: float | None = Field(
+        default=None,
+        title="標準偏差",
+        description="血糖値の標準偏差(mg/dl)。データが2件未満の場合は`null`",
+        example=32.1,  # type: ignore
+    )
+    cv: float | None = Field(
+        default=None,
+        title="変動係数",
+        description="標準偏差を平均値で割った値(%)。36%以下が安定の目安です",
+        example=25.0,  # type: ignore
+    )
+    gmi: float | None = Field(
+        default=None,
+        title="GMI",
+        description="平均値から推定したHbA1c(Glucose Management Indicator, %)。3.31 + 0.02392 × 平均値",
+        example=6.38,  # type: ignore
+    )
+    time_below_range: float | None = Field(
+        default=None,
+        title="範囲未満の割合",
+        description="目標範囲の下限未満のデータの割合(%)",
+        example=2.5,  # type: ignore
+    )
+    time_in_range: float | None = Field(
+        default=None,
+        title="範囲内の割合",
+        description="目標範囲(下限・上限を含む)のデータの割合(%)",
+        example=80.0,  # type: ignore
+    )
+    time_above_range: float | None = Field(
+        default=None,
+        title="範囲超過の割合",
+        description="目標範囲の上限を超えたデータの割合(%)",
+        example=17.5,  # type: ignore
+    )
+
+
+class EventTimingGlucoseStatsSchema(GlucoseStatsSchema):
+    event_timing: EventTiming = Field(
+        ..., title="時間帯", description="ユーザーが計測した時間帯", example=EventTiming.AFTER_MEAL  # type: ignore
+    )
+
+
+class BGLStatsSchema(GlucoseStatsSchema):
+    target_low: float = Field(
+        ..., title="目標範囲の下限", description="目標範囲の下限(mg/dl)", example=DEFAULT_TARGET_LOW  # type: ignore
+    )
+    target_high: float = Field(
+        ..., title="目標範囲の上限", description="目標範囲の上限(mg/dl)", example=DEFAULT_TARGET_HIGH  # type: ignore
+    )
+    by_event_timing: List[EventTimingGlucoseStatsSchema] = Field(
+        ..., title="時間帯ごとの集計", description="データのある時間帯ごとの集計"
+    )
@@ -1,15 +1,17 @@
 # Standard Library
 from datetime import datetime
+from typing import List
 
 # Third Party Library
 from helper.generator import generate_id
 from pydantic import Field
 from schemas.base import BaseSchema
+from schemas.batch import MAX_BATCH_SIZE, BatchItemStatus
 from schemas.event_timing import EventTiming
 from schemas.sunao_foods import SunaoFoods
 
 
-class Hba1cUpdateRequestSchema(BaseSchema):
+class Hba1cBaseSchema(BaseSchema):
     value: float = Field(
         ..., title="Hba1cの値(%)", description="実際に計測したユーザーのHba1cの値(%)", ge=0.0, example=5.5  # type: ignore
     )
@@ -30,7 +32,16 @@ class Hba1cUpdateRequestSchema(BaseSchema):
     )
 
 
-class Hba1cCreateRequestSchema(Hba1cUpdateRequestSchema):
+class Hba1cUpdateRequestSchema(Hba1cBaseSchema):
+    version: int | None = Field(
+        default=None,
+        title="バージョン",
+        description="取得時のデータのバージョン。指定した場合、サーバー上のバージョンと一致しないと更新に失敗します(楽観ロック)",
+        example=1,  # type: ignore
+    )
+
+
+class Hba1cCreateRequestSchema(Hba1cBaseSchema):
     user_id: str = Field(
         ..., title="User ID", description="ユーザーのID", example=generate_id()  # type: ignore
     )
@@ -55,3 +66,86 @@ class Hba1cSchema(Hba1cCreateRequestSchema):
         description="データが最後に更新された日時",
         example=datetime.now().isoformat(),  # type: ignore
     )
+    version: int | None = Field(
+        default=None,
+        title="バージョン",
+        description="データが更新されるたびに1ずつ増えるバージョン",
+        example=1,  # type: ignore
+    )
+
+
+class Hba1cPageSchema(BaseSchema):
+    items: List[Hba1cSchema] = Field(..., title="データ", description="このページのHba1cデータ")
+    next_cursor: str | None = Field(
+        default=None,
+        title="次のページのカーソル",
+        description="次のページを取得するときに`cursor`に指定する値。最後のページの場合は`null`",
+        example=None,  # type: ignore
+    )
+
+
+class Hba1cBatchCreateRequestSchema(BaseSchema):
+    items: List[Hba1cCreateRequestSchema] = Field(
+        ...,
+        title="データ",
+        description=f"登録するHba1cデータ(最大{MAX_BATCH_SIZE}件)",
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+    )
+
+
+class Hba1cBatchItemResultSchema(BaseSchema):
+    index: int = Field(
+        ..., title="インデックス", description="リクエストの`items`での位置(0始まり)", example=0  # type: ignore
+    )
+    status: BatchItemStatus = Field(
+        ..., title="結果", description="登録の結果", example=BatchItemStatus.CREATED  # type: ignore
+    )
+    item: Hba1cSchema | None = Field(
+        default=None, title="データ", description="登録したデータ。失敗した場合は`null`"
+    )
+    error: str | None = Field(
+        default=None,
+        title="エラー",
+        description="失敗した理由。成功した場合は`null`",
+        example=None,  # type: ignore
+    )
+
+
+class Hba1cBatchCreateResponseSchema(BaseSchema):
+    items: List[Hba1cBatchItemResultSchema] = Field(
+        ..., title="結果", description="リクエストの`items`と同じ順番の、1件ごとの結果"
+    )
+    created: int = Field(..., title="登録件数", description="登録に成功した件数", example=1)  # type: ignore
+    failed: int = Field(..., title="失敗件数", description="登録に失敗した件数", example=0)  # type: ignore
+
+
+class Hba1cBatchIdResultSchema(BaseSchema):
+    id: str = Field(
+        ..., title="ID", description="Hba1cデータのID", example=generate_id()  # type: ignore
+    )
+    status: BatchItemStatus = Field(
+        ...,
+        title="結果",
+        description="`found`/`deleted`は成功、`not_found`はデータがない、`failed`はそれ以外の失敗",
+        example=BatchItemStatus.FOUND,  # type: ignore
+    )
+    item: Hba1cSchema | None = Field(
+        default=None, title="データ", description="取得・論理削除したデータ。失敗した場合は`null`"
+    )
+    error: str | None = Field(
+        default=None,
+        title="エラー",
+        description="失敗した理由。成功した場合は`null`",
+        example=None,  # type: ignore
+    )
+
+
+class Hba1cBatchIdResponseSchema(BaseSchema):
+    items: List[Hba1cBatchIdResultSchema] = Field(
+        ..., title="結果", description="リクエストの`ids`と同じ順番の、IDごとの結果"
+    )
+    succeeded: int = Field(..., title="成功件数", description="成功した件数", example=1)  # type: ignore
+    failed: int = Field(
+        ..., title="失敗件数", description="`not_found`と`failed`の件数", example=0  # type: ignore
+    )
@@ -1,13 +1,32 @@
 # Standard Library
-from typing import List
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
 
 # Third Party Library
+from aws_lambda_powertools.event_handler.exceptions import ServiceError
+from database.base import is_transaction_conflict
 from helper.generator import generate_id
-from routes.bgl import fetch_bgl_items_by_user_id
-from routes.hba1c import fetch_Hba1c_items_by_user_id
-from schemas.bgl import BGLSchema
-from schemas.bgl_and_hba1c import BGLAndHba1cSchema
-from schemas.hba1c import Hba1cSchema
+from helper.json_response import dump_json
+from pynamodb.exceptions import TransactWriteError
+from repositories.bgl_and_hba1c_repository import BGLAndHba1cRepository
+from schemas.bgl import BGLCreateRequestSchema, BGLSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cCreateRequestSchema, BGLAndHba1cSchema
+from schemas.downsampling import (
+    BGLAndHba1cBucketSchema,
+    BucketStatsSchema,
+    Resolution,
+    ValueBucketSchema,
+)
+from schemas.hba1c import Hba1cCreateRequestSchema, Hba1cSchema
+from services.bgl_service import BGLService
+from services.data_version_service import DataVersionService
+from services.hba1c_service import Hba1cService
+
+# NOTE: BGLとHbA1cの2本のQueryを同時に投げる
+FETCH_MAX_WORKERS = 2
 
 
 # BGLの要素のみを代入する関数
@@ -29,79 +48,191 @@ def make_append_hba1c_item(hba1c_item: Hba1cSchema) -> BGLAndHba1cSchema:
         record_time=hba1c_item.record_time,
         event_timing=hba1c_item.event_timing,
         sunao_food=hba1c_item.sunao_food,
-        bgl_id=hba1c_item.id,
-        bgl_value=hba1c_item.value,
+        hba1c_id=hba1c_item.id,
+        hba1c_value=hba1c_item.value,
     )
 
 
+# BGLとHbA1cの両方の要素を代入する関数
+def make_append_bgl_and_hba1c_item(
+    bgl_item: BGLSchema, hba1c_item: Hba1cSchema
+) -> BGLAndHba1cSchema:
+    return BGLAndHba1cSchema(
+        id=generate_id(),
+        record_time=bgl_item.record_time,
+        event_timing=bgl_item.event_timing,
+        sunao_food=bgl_item.sunao_food,
+        bgl_id=bgl_item.id,
+        bgl_value=bgl_item.value,
+        hba1c_id=hba1c_item.id,
+        hba1c_value=hba1c_item.value,
+    )
+
+
+def merge_bgl_and_hba1c(
+    bgl_items: Iterable[BGLSchema], hba1c_items: Iterable[Hba1cSchema]
+) -> Iterator[BGLAndHba1cSchema]:
+    """Merge BGL and HbA1c readings into one timeline in a single pass
+
+    Both inputs must already be sorted by `record_time` (DynamoDB returns them in that order).
+    A BGL and an HbA1c reading with the same `record_time` become one row.
+    Rows are yielded lazily, so the inputs can also be iterators.
+
+    Args:
+        bgl_items (Iterable[BGLSchema]): BGL readings sorted by record_time
+        hba1c_items (Iterable[Hba1cSchema]): HbA1c readings sorted by record_time
+
+    Yields:
+        Iterator[BGLAndHba1cSchema]: rows sorted by record_time
+    """
+    bgl_iter = iter(bgl_items)
+    hba1c_iter = iter(hba1c_items)
+    bgl_item = next(bgl_iter, None)
+    hba1c_item = next(hba1c_iter, None)
+
+    while bgl_item is not None and hba1c_item is not None:
+        # 記録時間が同じとき
+        # （同じ日時に計測されたBGLとHbA1cの記録時間は
+        # 同年同月同日同時00分00秒の形でフロントエンドから登録されている）
+        if bgl_item.record_time == hba1c_item.record_time:
+            yield make_append_bgl_and_hba1c_item(bgl_item, hba1c_item)
+            bgl_item = next(bgl_iter, None)
+            hba1c_item = next(hba1c_iter, None)
+        elif bgl_item.record_time < hba1c_item.record_time:
+            yield make_append_bgl_item(bgl_item)
+            bgl_item = next(bgl_iter, None)
+        else:
+            yield make_append_hba1c_item(hba1c_item)
+            hba1c_item = next(hba1c_iter, None)
+
+    # どちらかが空になったら、残りをそのまま流す
+    while bgl_item is not None:
+        yield make_append_bgl_item(bgl_item)
+        bgl_item = next(bgl_iter, None)
+    while hba1c_item is not None:
+        yield make_append_hba1c_item(hba1c_item)
+        hba1c_item = next(hba1c_iter, None)
+
+
 class BGLAndHba1cService:
 
+    def __init__(self, max_workers: int = FETCH_MAX_WORKERS) -> None:
+        self.repository = BGLAndHba1cRepository()
+        self.bgl_service = BGLService()
+        self.hba1c_service = Hba1cService()
+        self.data_version = DataVersionService()
+        # NOTE: Lambdaのコンテナが再利用される間はスレッドも使い回す
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bgl-and-hba1c"
+        )
+
     def combine_bgl_and_hba1c_list(
-        self, user_id: str, _from: str, _to: str
+        self, user_id: str, _from: datetime, _to: datetime
     ) -> List[BGLAndHba1cSchema]:
 
-        # BGLとHbA1cデータをfetch
-        bgl_items = fetch_bgl_items_by_user_id(user_id, _from, _to)
-        hba1c_items = fetch_Hba1c_items_by_user_id(user_id, _from, _to)
-
-        # 日付でソート
-        bgl_items = sorted(bgl_items, key=lambda x: x.record_time)
-        hba1c_items = sorted(hba1c_items, key=lambda x: x.record_time)
-
-        # BGLとHbA1cを結合したデータを入れるリストを定義
-        combined_items: List[BGLAndHba1cSchema] = []
-
-        # BGLかHbA1cどちらかに要素が残っている間
-        while bgl_items or hba1c_items:
-
-            # BGLリストが空のとき
-            if not bgl_items:
-                # HbA1cリストの先頭の要素を挿入
-                combined_items.append(make_append_hba1c_item(hba1c_items[0]))
-                hba1c_items.pop(0)
-                continue
-
-            # HbA1cリストが空のとき
-            if not hba1c_items:
-                # BGLリストの先頭の要素を挿入
-                combined_items.append(make_append_bgl_item(bgl_items[0]))
-                bgl_items.pop(0)
-                continue
-
-            # 先頭要素の記録時間を取り出す
-            bgl_record_time = bgl_items[0].record_time
-            hba1c_record_time = hba1c_items[0].record_time
-
-            # 先頭要素の記録時間が同じとき
-            # （同じ日時に計測されたBGLとHbA1cの記録時間は
-            # 同年同月同日同時00分00秒の形でフロントエンドから登録されている）
-            if bgl_record_time == hba1c_record_time:
-                # BGLとHbA1cの要素を入れる
-                append_item = BGLAndHba1cSchema(
-                    id=generate_id(),
-                    record_time=bgl_items[0].record_time,
-                    event_timing=bgl_items[0].event_timing,
-                    sunao_food=bgl_items[0].sunao_food,
-                    bgl_id=bgl_items[0].id,
-                    bgl_value=bgl_items[0].value,
-                    hba1c_id=hba1c_items[0].id,
-                    hba1c_value=hba1c_items[0].value,
+        # BGLとHbA1cデータを同時にfetch
+        bgl_future = self.executor.submit(
+            self.bgl_service.find_many_by_user_id, user_id, _from, _to
+        )
+        hba1c_future = self.executor.submit(
+            self.hba1c_service.find_many_by_user_id, user_id, _from, _to
+        )
+        bgl_items = bgl_future.result()
+        hba1c_items = hba1c_future.result()
+
+        # NOTE: どちらもrecord_timeの昇順で返ってくるので、ソートせずに1回の走査で結合する
+        return list(merge_bgl_and_hba1c(bgl_items, hba1c_items))
+
+    def combine_bgl_and_hba1c_json(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        return dump_json(  # type: ignore
+            List[BGLAndHba1cSchema], self.combine_bgl_and_hba1c_list(user_id, _from, _to)
+        )
+
+    def after_write(
+        self,
+        bgl_readings: Iterable[Tuple[str, datetime]],
+        hba1c_readings: Iterable[Tuple[str, datetime]],
+    ) -> None:
+        """Update the data derived from readings written together, then bump each user once
+
+        Both summaries are refreshed (neither failure skips the other) before one bump per user,
+        with the summaries that could not be refreshed of both kinds. Nothing is raised.
+
+        Args:
+            bgl_readings (Iterable[Tuple[str, datetime]]): user id and record time of the BGLs
+            hba1c_readings (Iterable[Tuple[str, datetime]]): user id and record time of the HbA1cs
+        """
+        bgl_readings, hba1c_readings = list(bgl_readings), list(hba1c_readings)
+        dirty: Dict[str, Set[str]] = defaultdict(set)
+        for service_dirty in (
+            self.bgl_service.refresh_derived(bgl_readings),
+            self.hba1c_service.refresh_derived(hba1c_readings),
+        ):
+            for user_id, summaries in service_dirty.items():
+                dirty[user_id] |= summaries
+        user_ids = {user_id for user_id, _ in bgl_readings + hba1c_readings}
+        self.data_version.bump(user_ids, dirty)
+
+    def create_one(self, data: BGLAndHba1cCreateRequestSchema) -> BGLAndHba1cSchema:
+        common = data.model_dump(include={"user_id", "record_time", "event_timing", "sunao_food"})
+        try:
+            bgl_item, hba1c_item = self.repository.create_pair(
+                BGLCreateRequestSchema(**common, value=data.bgl_value),
+                Hba1cCreateRequestSchema(**common, value=data.hba1c_value),
+            )
+        except TransactWriteError as e:
+            if is_transaction_conflict(e):
+                raise ServiceError(
+                    HTTPStatus.CONFLICT, "BGL or Hba1c is being modified by another request."
                 )
-                combined_items.append(append_item)
-                bgl_items.pop(0)
-                hba1c_items.pop(0)
-                continue
-
-            # BGLデータの記録時間のほうが早いとき
-            if bgl_record_time < hba1c_record_time:
-                # BGLリストの先頭の要素を挿入
-                combined_items.append(make_append_bgl_item(bgl_items[0]))
-                bgl_items.pop(0)
-                continue
-            else:
-                # HbA1cリストの先頭の要素を挿入
-                combined_items.append(make_append_hba1c_item(hba1c_items[0]))
-                hba1c_items.pop(0)
-                continue
-
-        return combined_items
+            raise
+        self.after_write(
+            [(bgl_item.user_id, bgl_item.record_time)],
+            [(hba1c_item.user_id, hba1c_item.record_time)],
+        )
+        return make_append_bgl_and_hba1c_item(bgl_item.serializer(), hba1c_item.serializer())
+
+    def combine_buckets(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> List[BGLAndHba1cBucketSchema]:
+        bgl_future = self.executor.submit(
+            self.bgl_service.find_buckets_by_user_id, user_id, _from, _to, resolution
+        )
+        hba1c_future = self.executor.submit(
+            self.hba1c_service.find_buckets_by_user_id, user_id, _from, _to, resolution
+        )
+        rows: Dict[datetime, BGLAndHba1cBucketSchema] = {}
+
+        def stats(bucket: ValueBucketSchema) -> BucketStatsSchema:
+            return BucketStatsSchema(**bucket.model_dump(exclude={"start"}))
+
+        for bucket in bgl_future.result():
+            rows[bucket.start] = BGLAndHba1cBucketSchema(start=bucket.start, bgl=stats(bucket))
+        for bucket in hba1c_future.result():
+            row = rows.setdefault(bucket.start, BGLAndHba1cBucketSchema(start=bucket.start))
+            row.hba1c = stats(bucket)
+        return sorted(rows.values(), key=lambda row: row.start)
+
+    def combine_downsampled(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> List[BGLAndHba1cSchema]:
+        # NOTE: 血糖値とHbA1cをそれぞれmax_points件まで間引いてから結合する
+        bgl_future = self.executor.submit(
+            self.bgl_service.find_downsampled_by_user_id, user_id, _from, _to, max_points
+        )
+        hba1c_future = self.executor.submit(
+            self.hba1c_service.find_downsampled_by_user_id, user_id, _from, _to, max_points
+        )
+        return list(merge_bgl_and_hba1c(bgl_future.result(), hba1c_future.result()))
+
+    def combine_buckets_json(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        rows = self.combine_buckets(user_id, _from, _to, resolution)
+        return dump_json(List[BGLAndHba1cBucketSchema], rows)  # type: ignore
+
+    def combine_downsampled_json(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        rows = self.combine_downsampled(user_id, _from, _to, max_points)
+        return dump_json(List[BGLAndHba1cSchema], rows)  # type: ignore
@@ -1,20 +1,99 @@
 # Standard Library
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 # Third Party Library
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler.exceptions import NotFoundError, ServiceError
+from config.api import AGP_CACHE_TTL
+from database.base import SUMMARY_KIND_BGL, BGLModel, is_condition_failure
+from helper.export import EXPORT_SCAN_PAGE_SIZE, ExportResult, export_ndjson
+from helper.json_response import dump_json
+from helper.pagination import encode_cursor
+from helper.ttl_cache import TTLCache
+from pynamodb.exceptions import TransactWriteError, UpdateError
 from repositories.bgl_repository import BGLRepository
-from schemas.bgl import BGLCreateRequestSchema, BGLSchema, BGLUpdateRequestSchema
+from schemas.agp import AGP_PERCENTILES, AGPSchema
+from schemas.batch import BatchItemStatus
+from schemas.bgl import (
+    BGLBatchCreateResponseSchema,
+    BGLBatchIdResponseSchema,
+    BGLBatchIdResultSchema,
+    BGLBatchItemResultSchema,
+    BGLCreateRequestSchema,
+    BGLPageSchema,
+    BGLSchema,
+    BGLUpdateRequestSchema,
+)
+from schemas.downsampling import Resolution, ValueBucketSchema
+from schemas.glucose_stats import BGLStatsSchema
+from services.daily_summary_service import DailySummaryService
+from services.data_version_service import DataVersionService
+
+logger = Logger("BGL")
+
+# NOTE: AGPの結果を(ユーザー, データのバージョン, 期間, 時刻の区切り, 時差)ごとにコンテナ内でキャッシュする。
+# キーにバージョンを含むので、他のコンテナで書き込まれた後に古い結果を返すことはない。
+# 最後の書き込みがlive-indexに反映された後に読んだ結果だけをキャッシュする
+agp_cache: TTLCache[Tuple[str, int, datetime, datetime, int, int], AGPSchema] = TTLCache(
+    AGP_CACHE_TTL
+)
 
 
 class BGLService:
 
     def __init__(self) -> None:
         self.repository = BGLRepository()
+        self.daily_summary = DailySummaryService(BGLModel, SUMMARY_KIND_BGL)
+        self.data_version = DataVersionService()
 
-    def find_all(self) -> List[BGLSchema]:
-        items = self.repository.find_all()
-        return [item.serializer() for item in items]
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        items = self.repository.scan(last_evaluated_key, page_size=EXPORT_SCAN_PAGE_SIZE)
+        return export_ndjson(items, lambda item: item.serializer(), write, max_bytes)
+
+    def refresh_derived(self, readings: Iterable[Tuple[str, datetime]]) -> Dict[str, Set[str]]:
+        """Refresh the daily summaries and drop the cached AGPs of the written readings
+
+        Nothing is raised: the readings are already written, and an error response would make
+        the client send them again.
+
+        Args:
+            readings (Iterable[Tuple[str, datetime]]): user id and record time of each reading
+                written (for an update, both the old and the new record time)
+
+        Returns:
+            Dict[str, Set[str]]: summaries of each user that could not be refreshed
+        """
+        readings = list(readings)
+        dirty: Dict[str, Set[str]] = self.daily_summary.refresh(readings)
+        user_ids = {user_id for user_id, _ in readings}
+        try:
+            agp_cache.discard_where(lambda key: key[0] in user_ids)
+        except Exception:
+            logger.exception("Failed to drop cached AGPs", user_ids=sorted(user_ids))
+        return dirty
+
+    def after_write(self, readings: Iterable[Tuple[str, datetime]]) -> None:
+        """Update the data derived from the written readings
+
+        The derived data is refreshed before the users' data versions are bumped,
+        so a response tagged with the new version is never stale.
+        Summaries that could not be refreshed are marked dirty with the version
+        and computed again on the next read. Nothing is raised.
+
+        Args:
+            readings (Iterable[Tuple[str, datetime]]): user id and record time of each reading
+                written (for an update, both the old and the new record time)
+        """
+        readings = list(readings)
+        dirty = self.refresh_derived(readings)
+        self.data_version.bump((user_id for user_id, _ in readings), dirty)
 
     def find_one(self, id: str) -> BGLSchema:
         data = self.repository.find_one(id)
@@ -25,17 +104,230 @@ class BGLService:
 
     def create_one(self, data: BGLCreateRequestSchema) -> BGLSchema:
         item = self.repository.create_one(data)
+        self.after_write([(item.user_id, item.record_time)])
         return item.serializer()
 
+    def create_many(self, data: List[BGLCreateRequestSchema]) -> BGLBatchCreateResponseSchema:
+        created = self.repository.create_many(data)
+        self.after_write(
+            (item.user_id, item.record_time) for item, error in created if error is None
+        )
+        results = [
+            (
+                BGLBatchItemResultSchema(
+                    index=index, status=BatchItemStatus.CREATED, item=item.serializer()
+                )
+                if error is None
+                else BGLBatchItemResultSchema(
+                    index=index, status=BatchItemStatus.FAILED, error=error
+                )
+            )
+            for index, (item, error) in enumerate(created)
+        ]
+        failed = sum(1 for result in results if result.status == BatchItemStatus.FAILED)
+        return BGLBatchCreateResponseSchema(
+            items=results, created=len(results) - failed, failed=failed
+        )
+
     def delete_one(self, id: str) -> BGLSchema:
-        item = self.repository.delete_one(id)
+        try:
+            item = self.repository.delete_one(id)
+        except UpdateError as e:
+            # NOTE: 削除と同時にrecord_timeの変更で元のアイテムが移動した場合
+            if is_condition_failure(e):
+                raise ServiceError(HTTPStatus.CONFLICT, "BGL was modified by another request.")
+            raise
+        self.after_write([(item.user_id, item.record_time)])
         return item.serializer()
 
+    def _id_results(
+        self,
+        ids: List[str],
+        results: List[Tuple[Optional[BGLModel], Optional[Exception]]],
+        status: BatchItemStatus,
+    ) -> BGLBatchIdResponseSchema:
+        items = []
+        for id, (item, error) in zip(ids, results):
+            if item is not None:
+                items.append(BGLBatchIdResultSchema(id=id, status=status, item=item.serializer()))
+            elif isinstance(error, BGLModel.DoesNotExist):
+                items.append(
+                    BGLBatchIdResultSchema(
+                        id=id, status=BatchItemStatus.NOT_FOUND, error="BGL not found."
+                    )
+                )
+            elif isinstance(error, UpdateError) and is_condition_failure(error):
+                items.append(
+                    BGLBatchIdResultSchema(
+                        id=id,
+                        status=BatchItemStatus.FAILED,
+                        error="BGL was modified by another request.",
+                    )
+                )
+            else:
+                items.append(
+                    BGLBatchIdResultSchema(id=id, status=BatchItemStatus.FAILED, error=str(error))
+                )
+        succeeded = sum(1 for item in items if item.status == status)
+        return BGLBatchIdResponseSchema(
+            items=items, succeeded=succeeded, failed=len(items) - succeeded
+        )
+
+    def find_many(self, ids: List[str]) -> BGLBatchIdResponseSchema:
+        ids = list(dict.fromkeys(ids))
+        return self._id_results(ids, self.repository.find_many(ids), BatchItemStatus.FOUND)
+
+    def delete_many(self, ids: List[str]) -> BGLBatchIdResponseSchema:
+        ids = list(dict.fromkeys(ids))
+        results = self.repository.delete_many(ids)
+        self.after_write(
+            (item.user_id, item.record_time) for item, _ in results if item is not None
+        )
+        return self._id_results(ids, results, BatchItemStatus.DELETED)
+
     def update_one(self, id: str, data: BGLUpdateRequestSchema) -> BGLSchema:
-        item = self.repository.update_one(id, data)
+        # NOTE: id-indexとテーブルを1回ずつだけ読み、読んだアイテムをそのまま更新に使う
+        try:
+            item = self.repository.find_one_consistent(id)
+        except BGLModel.DoesNotExist:
+            # NOTE: id-indexで見つけたキーのアイテムが、他のリクエストで記録時間を変更されて無くなった
+            raise ServiceError(HTTPStatus.CONFLICT, "BGL was modified by another request.")
+        if item is None:
+            raise NotFoundError("BGL not found.")
+        # NOTE: 記録時間が変わると元の日の集計も変わるので、更新前の値を控えておく
+        written = [(item.user_id, item.record_time)]
+        try:
+            item = self.repository.update_one(item, data)
+        except (UpdateError, TransactWriteError) as e:
+            if is_condition_failure(e):
+                raise ServiceError(
+                    HTTPStatus.CONFLICT,
+                    "BGL was modified by another request or the record time is already used.",
+                )
+            raise
+        self.after_write(written + [(item.user_id, item.record_time)])
         return item.serializer()
 
     def find_many_by_user_id(self, user_id: str, _from: datetime, _to: datetime) -> List[BGLSchema]:
         items = self.repository.find_many_by_user_id(user_id, _from, _to)
         serialized_items: List[BGLSchema] = [item.serializer() for item in items]
         return serialized_items
+
+    def find_page_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> BGLPageSchema:
+        items, next_key = self.repository.find_page_by_user_id(
+            user_id, _from, _to, limit, last_evaluated_key
+        )
+        return BGLPageSchema(
+            items=[item.serializer() for item in items], next_cursor=encode_cursor(next_key)
+        )
+
+    def find_many_json_by_user_id(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        items = self.find_many_by_user_id(user_id, _from, _to)
+        return dump_json(List[BGLSchema], items)  # type: ignore
+
+    def find_page_json_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bytes:
+        page = self.find_page_by_user_id(user_id, _from, _to, limit, last_evaluated_key)
+        return dump_json(BGLPageSchema, page)  # type: ignore
+
+    def find_summary_json(self, user_id: str, _from: date, _to: date) -> bytes:
+        return self.daily_summary.find_range_json(user_id, _from, _to)  # type: ignore
+
+    def find_stats_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, target_low: float, target_high: float
+    ) -> BGLStatsSchema:
+        # NOTE: numpyのimport(約90ms)をコールドスタートに含めないように、使うときにimportする
+        # Third Party Library
+        from analytics.glucose_stats import glucose_stats, to_arrays
+
+        values, codes = to_arrays(self.repository.find_values_by_user_id(user_id, _from, _to))
+        return glucose_stats(values, codes, target_low, target_high)
+
+    def find_agp_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, bucket_minutes: int, utc_offset: int
+    ) -> AGPSchema:
+        # NOTE: バージョンはデータより先に読む。後に読むと、その間の書き込みで上がったバージョンで
+        # 書き込み前のデータから作ったAGPをキャッシュしてしまう
+        settled = self.data_version.is_settled(user_id)
+        key = (
+            user_id,
+            self.data_version.find_version(user_id),
+            _from,
+            _to,
+            bucket_minutes,
+            utc_offset,
+        )
+        cached = agp_cache.get(key)
+        if cached is not None:
+            return cached
+        # NOTE: numpyのimport(約90ms)をコールドスタートに含めないように、使うときにimportする
+        # Third Party Library
+        from analytics.agp import bucket_labels, bucket_percentiles, to_arrays, to_list
+
+        minutes, values = to_arrays(
+            self.repository.find_times_and_values_by_user_id(user_id, _from, _to)
+        )
+        counts, percentiles = bucket_percentiles(minutes, values, bucket_minutes, utc_offset)
+        agp = AGPSchema(
+            start_date=_from.date(),
+            end_date=_to.date(),
+            bucket_minutes=bucket_minutes,
+            utc_offset=utc_offset,
+            count=len(values),
+            times=bucket_labels(bucket_minutes),
+            counts=counts.tolist(),
+            **{
+                f"p{percentile}": to_list(row)
+                for percentile, row in zip(AGP_PERCENTILES, percentiles)
+            },
+        )
+        if settled:
+            agp_cache.put(key, agp)
+        return agp
+
+    def find_buckets_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> List[ValueBucketSchema]:
+        # NOTE: numpyのimport(約90ms)をコールドスタートに含めないように、使うときにimportする
+        # Third Party Library
+        from analytics.downsampling import bucket_stats, to_arrays
+
+        seconds, values = to_arrays(
+            self.repository.find_times_and_values_by_user_id(user_id, _from, _to)
+        )
+        return bucket_stats(seconds, values, resolution)  # type: ignore
+
+    def find_downsampled_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> List[BGLSchema]:
+        # Third Party Library
+        from analytics.downsampling import downsample
+
+        # NOTE: 間引いてからスキーマに変換する
+        items = downsample(self.repository.find_many_by_user_id(user_id, _from, _to), max_points)
+        return [item.serializer() for item in items]
+
+    def find_buckets_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        buckets = self.find_buckets_by_user_id(user_id, _from, _to, resolution)
+        return dump_json(List[ValueBucketSchema], buckets)  # type: ignore
+
+    def find_downsampled_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        items = self.find_downsampled_by_user_id(user_id, _from, _to, max_points)
+        return dump_json(List[BGLSchema], items)  # type: ignore
@@ -0,0 +1,81 @@
+# Standard Library
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Third Party Library
+from aws_lambda_powertools import Logger
+from helper.json_response import dump_json
+from repositories.daily_summary_repository import (
+    DailySummaryRepository,
+    ReadingModel,
+    reading_day,
+    summary_day_key,
+)
+from schemas.daily_summary import DailySummarySchema
+from services.data_version_service import DataVersionService
+
+logger = Logger("DailySummary")
+
+
+class DailySummaryService:
+
+    def __init__(self, model: ReadingModel, kind: str) -> None:
+        self.repository = DailySummaryRepository(model, kind)
+        self.data_version = DataVersionService()
+
+    def refresh(self, readings: Iterable[Tuple[str, datetime]]) -> Dict[str, Set[str]]:
+        """Recompute the summaries of the days the written readings belong to
+
+        A failure is logged instead of raised: the readings are already written.
+        The days that failed are returned, to be marked dirty and computed again on the next read.
+
+        Args:
+            readings (Iterable[Tuple[str, datetime]]): user id and record time of each reading
+                written (for an update, both the old and the new record time)
+
+        Returns:
+            Dict[str, Set[str]]: summaries (`{kind}#{date}`) of each user that could not be refreshed
+        """
+        days: Dict[str, Set[date]] = defaultdict(set)
+        for user_id, record_time in readings:
+            days[user_id].add(reading_day(record_time))
+        dirty: Dict[str, Set[str]] = {}
+        for user_id, user_days in days.items():
+            try:
+                self.repository.refresh(user_id, user_days)
+            except Exception:
+                logger.exception(
+                    "Failed to refresh daily summaries",
+                    kind=self.repository.kind,
+                    user_id=user_id,
+                    days=sorted(day.isoformat() for day in user_days),
+                )
+                dirty[user_id] = {summary_day_key(self.repository.kind, day) for day in user_days}
+        return dirty
+
+    def repair(self, user_id: str) -> None:
+        """Compute again the user's summaries that a failed refresh left dirty
+
+        The dirty set comes with the data version, which the conditional GET already read
+        in the request, so this costs nothing when there is nothing to repair.
+
+        Args:
+            user_id (str): user id
+        """
+        prefix = f"{self.repository.kind}#"
+        dirty = {
+            key for key in self.data_version.find_dirty_summaries(user_id) if key.startswith(prefix)
+        }
+        if not dirty:
+            return
+        self.repository.refresh(user_id, {date.fromisoformat(key[len(prefix) :]) for key in dirty})
+        self.data_version.clear_dirty_summaries(user_id, dirty)
+
+    def find_range(self, user_id: str, _from: date, _to: date) -> List[DailySummarySchema]:
+        self.repair(user_id)
+        return [item.serializer() for item in self.repository.find_range(user_id, _from, _to)]
+
+    def find_range_json(self, user_id: str, _from: date, _to: date) -> bytes:
+        items = self.find_range(user_id, _from, _to)
+        return dump_json(List[DailySummarySchema], items)  # type: ignore
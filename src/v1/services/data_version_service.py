@@ -0,0 +1,71 @@
+# Standard Library
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Mapping, Optional, Set
+
+# Third Party Library
+from aws_lambda_powertools import Logger
+from config.api import LIVE_INDEX_LAG_SECONDS
+from repositories.data_version_repository import DataVersionRepository
+
+logger = Logger("DataVersion")
+
+
+class DataVersionService:
+
+    def __init__(self) -> None:
+        self.repository = DataVersionRepository()
+
+    def find_version(self, user_id: str) -> int:
+        return self.repository.find_version(user_id)  # type: ignore
+
+    def is_settled(self, user_id: str, lag: float = LIVE_INDEX_LAG_SECONDS) -> bool:
+        """Whether the user's last write has had time to reach the live-index
+
+        The range reads use the eventually consistent live-index, so right after a write
+        they may still return the old readings. A response read before that must not be
+        tagged (or cached) with the new data version, or the stale copy would be kept.
+
+        Args:
+            user_id (str): user id
+            lag (float, optional): seconds to wait after the last write.
+                Defaults to LIVE_INDEX_LAG_SECONDS.
+
+        Returns:
+            bool: True if the range reads now include every write of the version
+        """
+        updated_at = self.repository.find_updated_at(user_id)
+        if updated_at is None:
+            return True
+        return datetime.now(timezone.utc) - updated_at >= timedelta(seconds=lag)  # type: ignore
+
+    def find_dirty_summaries(self, user_id: str) -> Set[str]:
+        return self.repository.find_dirty_summaries(user_id)  # type: ignore
+
+    def clear_dirty_summaries(self, user_id: str, dirty_summaries: Iterable[str]) -> None:
+        self.repository.clear_dirty_summaries(user_id, dirty_summaries)
+
+    def bump(
+        self, user_ids: Iterable[str], dirty_summaries: Optional[Mapping[str, Set[str]]] = None
+    ) -> None:
+        """Increase the data version of each user whose readings were written
+
+        Called after the readings are written, so a version read before a range query
+        is never newer than the data the query returns.
+        A failure is logged instead of raised: the readings are already written, and an error
+        response would make the client send them again.
+
+        Args:
+            user_ids (Iterable[str]): ids of the users whose readings were written
+            dirty_summaries (Optional[Mapping[str, Set[str]]], optional): summaries
+                (`{kind}#{date}`) of each user that could not be refreshed, to be computed again
+                on the next read. Defaults to None.
+        """
+        dirty_summaries = dirty_summaries or {}
+        for user_id in sorted(set(user_ids)):
+            dirty = dirty_summaries.get(user_id, set())
+            try:
+                self.repository.bump(user_id, dirty)
+            except Exception:
+                logger.exception(
+                    "Failed to bump data version", user_id=user_id, dirty_summaries=sorted(dirty)
+                )
@@ -1,20 +1,78 @@
 # Standard Library
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 # Third Party Library
+from aws_lambda_powertools.event_handler.exceptions import NotFoundError, ServiceError
+from database.base import SUMMARY_KIND_HBA1C, Hba1cModel, is_condition_failure
+from helper.export import EXPORT_SCAN_PAGE_SIZE, ExportResult, export_ndjson
+from helper.json_response import dump_json
+from helper.pagination import encode_cursor
+from pynamodb.exceptions import TransactWriteError, UpdateError
 from repositories.hba1c_repository import Hba1cRepository
-from schemas.hba1c import Hba1cCreateRequestSchema, Hba1cSchema, Hba1cUpdateRequestSchema
+from schemas.batch import BatchItemStatus
+from schemas.downsampling import Resolution, ValueBucketSchema
+from schemas.hba1c import (
+    Hba1cBatchCreateResponseSchema,
+    Hba1cBatchIdResponseSchema,
+    Hba1cBatchIdResultSchema,
+    Hba1cBatchItemResultSchema,
+    Hba1cCreateRequestSchema,
+    Hba1cPageSchema,
+    Hba1cSchema,
+    Hba1cUpdateRequestSchema,
+)
+from services.daily_summary_service import DailySummaryService
+from services.data_version_service import DataVersionService
 
 
 class Hba1cService:
 
     def __init__(self) -> None:
         self.repository = Hba1cRepository()
+        self.daily_summary = DailySummaryService(Hba1cModel, SUMMARY_KIND_HBA1C)
+        self.data_version = DataVersionService()
 
-    def find_all(self) -> List[Hba1cSchema]:
-        items = self.repository.find_all()
-        return [item.serializer() for item in items]
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        items = self.repository.scan(last_evaluated_key, page_size=EXPORT_SCAN_PAGE_SIZE)
+        return export_ndjson(items, lambda item: item.serializer(), write, max_bytes)
+
+    def refresh_derived(self, readings: Iterable[Tuple[str, datetime]]) -> Dict[str, Set[str]]:
+        """Refresh the daily summaries of the written readings
+
+        Nothing is raised: the readings are already written, and an error response would make
+        the client send them again.
+
+        Args:
+            readings (Iterable[Tuple[str, datetime]]): user id and record time of each reading
+                written (for an update, both the old and the new record time)
+
+        Returns:
+            Dict[str, Set[str]]: summaries of each user that could not be refreshed
+        """
+        return self.daily_summary.refresh(readings)  # type: ignore
+
+    def after_write(self, readings: Iterable[Tuple[str, datetime]]) -> None:
+        """Update the data derived from the written readings
+
+        The daily summaries are refreshed before the users' data versions are bumped,
+        so a response tagged with the new version is never stale.
+        Summaries that could not be refreshed are marked dirty with the version
+        and computed again on the next read. Nothing is raised.
+
+        Args:
+            readings (Iterable[Tuple[str, datetime]]): user id and record time of each reading
+                written (for an update, both the old and the new record time)
+        """
+        readings = list(readings)
+        dirty = self.refresh_derived(readings)
+        self.data_version.bump((user_id for user_id, _ in readings), dirty)
 
     def find_one(self, id: str) -> Hba1cSchema:
         data = self.repository.find_one(id)
@@ -25,14 +83,108 @@ class Hba1cService:
 
     def create_one(self, data: Hba1cCreateRequestSchema) -> Hba1cSchema:
         item = self.repository.create_one(data)
+        self.after_write([(item.user_id, item.record_time)])
         return item.serializer()
 
+    def create_many(self, data: List[Hba1cCreateRequestSchema]) -> Hba1cBatchCreateResponseSchema:
+        created = self.repository.create_many(data)
+        self.after_write(
+            (item.user_id, item.record_time) for item, error in created if error is None
+        )
+        results = [
+            (
+                Hba1cBatchItemResultSchema(
+                    index=index, status=BatchItemStatus.CREATED, item=item.serializer()
+                )
+                if error is None
+                else Hba1cBatchItemResultSchema(
+                    index=index, status=BatchItemStatus.FAILED, error=error
+                )
+            )
+            for index, (item, error) in enumerate(created)
+        ]
+        failed = sum(1 for result in results if result.status == BatchItemStatus.FAILED)
+        return Hba1cBatchCreateResponseSchema(
+            items=results, created=len(results) - failed, failed=failed
+        )
+
     def delete_one(self, id: str) -> Hba1cSchema:
-        item = self.repository.delete_one(id)
+        try:
+            item = self.repository.delete_one(id)
+        except UpdateError as e:
+            # NOTE: 削除と同時にrecord_timeの変更で元のアイテムが移動した場合
+            if is_condition_failure(e):
+                raise ServiceError(HTTPStatus.CONFLICT, "Hba1c was modified by another request.")
+            raise
+        self.after_write([(item.user_id, item.record_time)])
         return item.serializer()
 
+    def _id_results(
+        self,
+        ids: List[str],
+        results: List[Tuple[Optional[Hba1cModel], Optional[Exception]]],
+        status: BatchItemStatus,
+    ) -> Hba1cBatchIdResponseSchema:
+        items = []
+        for id, (item, error) in zip(ids, results):
+            if item is not None:
+                items.append(Hba1cBatchIdResultSchema(id=id, status=status, item=item.serializer()))
+            elif isinstance(error, Hba1cModel.DoesNotExist):
+                items.append(
+                    Hba1cBatchIdResultSchema(
+                        id=id, status=BatchItemStatus.NOT_FOUND, error="Hba1c not found."
+                    )
+                )
+            elif isinstance(error, UpdateError) and is_condition_failure(error):
+                items.append(
+                    Hba1cBatchIdResultSchema(
+                        id=id,
+                        status=BatchItemStatus.FAILED,
+                        error="Hba1c was modified by another request.",
+                    )
+                )
+            else:
+                items.append(
+                    Hba1cBatchIdResultSchema(id=id, status=BatchItemStatus.FAILED, error=str(error))
+                )
+        succeeded = sum(1 for item in items if item.status == status)
+        return Hba1cBatchIdResponseSchema(
+            items=items, succeeded=succeeded, failed=len(items) - succeeded
+        )
+
+    def find_many(self, ids: List[str]) -> Hba1cBatchIdResponseSchema:
+        ids = list(dict.fromkeys(ids))
+        return self._id_results(ids, self.repository.find_many(ids), BatchItemStatus.FOUND)
+
+    def delete_many(self, ids: List[str]) -> Hba1cBatchIdResponseSchema:
+        ids = list(dict.fromkeys(ids))
+        results = self.repository.delete_many(ids)
+        self.after_write(
+            (item.user_id, item.record_time) for item, _ in results if item is not None
+        )
+        return self._id_results(ids, results, BatchItemStatus.DELETED)
+
     def update_one(self, id: str, data: Hba1cUpdateRequestSchema) -> Hba1cSchema:
-        item = self.repository.update_one(id, data)
+        # NOTE: id-indexとテーブルを1回ずつだけ読み、読んだアイテムをそのまま更新に使う
+        try:
+            item = self.repository.find_one_consistent(id)
+        except Hba1cModel.DoesNotExist:
+            # NOTE: id-indexで見つけたキーのアイテムが、他のリクエストで記録時間を変更されて無くなった
+            raise ServiceError(HTTPStatus.CONFLICT, "Hba1c was modified by another request.")
+        if item is None:
+            raise NotFoundError("Hba1c not found.")
+        # NOTE: 記録時間が変わると元の日の集計も変わるので、更新前の値を控えておく
+        written = [(item.user_id, item.record_time)]
+        try:
+            item = self.repository.update_one(item, data)
+        except (UpdateError, TransactWriteError) as e:
+            if is_condition_failure(e):
+                raise ServiceError(
+                    HTTPStatus.CONFLICT,
+                    "Hba1c was modified by another request or the record time is already used.",
+                )
+            raise
+        self.after_write(written + [(item.user_id, item.record_time)])
         return item.serializer()
 
     def find_many_by_user_id(
@@ -41,3 +193,70 @@ class Hba1cService:
         items = self.repository.find_many_by_user_id(user_id, _from, _to)
         serialized_items: List[Hba1cSchema] = [item.serializer() for item in items]
         return serialized_items
+
+    def find_page_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Hba1cPageSchema:
+        items, next_key = self.repository.find_page_by_user_id(
+            user_id, _from, _to, limit, last_evaluated_key
+        )
+        return Hba1cPageSchema(
+            items=[item.serializer() for item in items], next_cursor=encode_cursor(next_key)
+        )
+
+    def find_many_json_by_user_id(self, user_id: str, _from: datetime, _to: datetime) -> bytes:
+        items = self.find_many_by_user_id(user_id, _from, _to)
+        return dump_json(List[Hba1cSchema], items)  # type: ignore
+
+    def find_page_json_by_user_id(
+        self,
+        user_id: str,
+        _from: datetime,
+        _to: datetime,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bytes:
+        page = self.find_page_by_user_id(user_id, _from, _to, limit, last_evaluated_key)
+        return dump_json(Hba1cPageSchema, page)  # type: ignore
+
+    def find_summary_json(self, user_id: str, _from: date, _to: date) -> bytes:
+        return self.daily_summary.find_range_json(user_id, _from, _to)  # type: ignore
+
+    def find_buckets_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> List[ValueBucketSchema]:
+        # NOTE: numpyのimport(約90ms)をコールドスタートに含めないように、使うときにimportする
+        # Third Party Library
+        from analytics.downsampling import bucket_stats, to_arrays
+
+        seconds, values = to_arrays(
+            self.repository.find_times_and_values_by_user_id(user_id, _from, _to)
+        )
+        return bucket_stats(seconds, values, resolution)  # type: ignore
+
+    def find_downsampled_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> List[Hba1cSchema]:
+        # Third Party Library
+        from analytics.downsampling import downsample
+
+        # NOTE: 間引いてからスキーマに変換する
+        items = downsample(self.repository.find_many_by_user_id(user_id, _from, _to), max_points)
+        return [item.serializer() for item in items]
+
+    def find_buckets_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, resolution: Resolution
+    ) -> bytes:
+        buckets = self.find_buckets_by_user_id(user_id, _from, _to, resolution)
+        return dump_json(List[ValueBucketSchema], buckets)  # type: ignore
+
+    def find_downsampled_json_by_user_id(
+        self, user_id: str, _from: datetime, _to: datetime, max_points: int
+    ) -> bytes:
+        items = self.find_downsampled_by_user_id(user_id, _from, _to, max_points)
+        return dump_json(List[Hba1cSchema], items)  # type: ignore
@@ -1,8 +1,10 @@
 # Standard Library
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 
 # Third Party Library
 from aws_lambda_powertools.event_handler.exceptions import NotFoundError
+from helper.export import EXPORT_SCAN_PAGE_SIZE, ExportResult, export_ndjson
+from pynamodb.exceptions import DoesNotExist
 from repositories.user_repository import UserRepository
 from schemas.user import UserCreateRequestSchema, UserSchema
 
@@ -12,28 +14,40 @@ class UserService:
     def __init__(self) -> None:
         self.repository = UserRepository()
 
-    def find_all(self) -> List[UserSchema]:
-        items = self.repository.find_all()
-        return [item.serializer() for item in items]
+    def export_all(
+        self,
+        write: Callable[[bytes], None],
+        last_evaluated_key: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ExportResult:
+        items = self.repository.scan(last_evaluated_key, page_size=EXPORT_SCAN_PAGE_SIZE)
+        return export_ndjson(items, lambda item: item.serializer(), write, max_bytes)
 
     def find_one(self, user_id: str) -> UserSchema:
-        if not self.repository.is_exist(user_id):
+        try:
+            data = self.repository.find_one(user_id)
+        except DoesNotExist:
             raise NotFoundError("User not found")
-        data = self.repository.find_one(user_id)
         return data.serializer()
 
+    def find_many(self, user_ids: List[str]) -> List[UserSchema]:
+        items = self.repository.find_many(user_ids)
+        return [item.serializer() for item in items]
+
     def create_one(self, data: UserCreateRequestSchema) -> UserSchema:
         item = self.repository.create_one(data)
         return item.serializer()
 
     def update_term_agreed_at(self, user_id: str) -> UserSchema:
-        if not self.repository.is_exist(user_id):
+        try:
+            item = self.repository.update_term_agreed_at(user_id)
+        except DoesNotExist:
             raise NotFoundError("User not found")
-        item = self.repository.update_term_agreed_at(user_id)
         return item.serializer()
 
     def delete_one(self, user_id: str) -> UserSchema:
-        if not self.repository.is_exist(user_id):
+        try:
+            item = self.repository.delete_one(user_id)
+        except DoesNotExist:
             raise NotFoundError("User not found")
-        item = self.repository.delete_one(user_id)
         return item.serializer()
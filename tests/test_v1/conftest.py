@@ -0,0 +1,13 @@
+# Standard Library
+from typing import Iterator
+
+# Third Party Library
+import pytest
+from repositories.identity_map import identity_map
+
+
+@pytest.fixture(autouse=True)
+def reset_identity_map() -> Iterator[None]:
+    identity_map.reset()
+    yield
+    identity_map.reset()
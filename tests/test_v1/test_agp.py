@@ -0,0 +1,92 @@
+# Standard Library
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+import numpy as np
+import pytest
+from analytics.agp import bucket_labels, bucket_percentiles, to_arrays, to_list
+from database.base import BGLModel
+from helper.ttl_cache import TTLCache
+from schemas.event_timing import EventTiming
+from services.bgl_service import BGLService
+from services.data_version_service import DataVersionService
+
+
+def test_bucket_percentiles_match_numpy() -> None:
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    readings = [
+        (start + timedelta(minutes=int(minute)), float(value))
+        for minute, value in zip(rng.integers(0, 14 * 24 * 60, 2000), rng.normal(130, 30, 2000))
+        # NOTE: 3時台にはデータを置かない
+        if (minute % (24 * 60)) // 60 != 3
+    ]
+    minutes, values = to_arrays(readings)
+
+    counts, percentiles = bucket_percentiles(minutes, values, 60)
+
+    assert counts.sum() == len(readings)
+    assert counts[3] == 0
+    assert np.isnan(percentiles[:, 3]).all()
+    for bucket in range(24):
+        if bucket == 3:
+            continue
+        in_bucket = values[minutes // 60 == bucket]
+        assert np.allclose(percentiles[:, bucket], np.percentile(in_bucket, [5, 25, 50, 75, 95]))
+
+
+def test_bucket_percentiles_with_utc_offset() -> None:
+    # NOTE: UTCの23:30は日本時間(+540分)の8:30
+    minutes, values = to_arrays([(datetime(2024, 1, 1, 23, 30), 100.0)])
+
+    counts, percentiles = bucket_percentiles(minutes, values, 30, utc_offset=540)
+
+    assert len(counts) == 48
+    assert counts[17] == 1
+    assert to_list(percentiles[:, 17]) == [100.0] * 5
+    assert to_list(percentiles[:, 0]) == [None] * 5
+
+
+def test_bucket_percentiles_without_readings() -> None:
+    counts, percentiles = bucket_percentiles(*to_arrays([]), 60)
+
+    assert counts.tolist() == [0] * 24
+    assert np.isnan(percentiles).all()
+    assert bucket_labels(60)[:2] == ["00:00", "01:00"]
+
+
+@pytest.mark.parametrize("settled", [True, False])
+@patch.object(BGLModel.live_index, "query")
+@patch.object(DataVersionService, "is_settled")
+@patch.object(DataVersionService, "find_version")
+def test_find_agp_caches_only_settled_versions(
+    mock_find_version: MagicMock, mock_is_settled: MagicMock, mock_query: MagicMock, settled: bool
+) -> None:
+    calls = MagicMock()
+    calls.attach_mock(mock_find_version, "find_version")
+    calls.attach_mock(mock_query, "query")
+    mock_find_version.return_value = 1
+    mock_is_settled.return_value = settled
+    mock_query.return_value = [
+        BGLModel(
+            user_id="000001",
+            record_time=datetime(2024, 1, 1, 8),
+            value=100,
+            event_timing=EventTiming.EMPTY_STOMACH,
+        )
+    ]
+    cache: TTLCache[Any, Any] = TTLCache(300)
+
+    with patch("services.bgl_service.agp_cache", cache):
+        agp = BGLService().find_agp_by_user_id(
+            "000001", datetime(2024, 1, 1), datetime(2024, 1, 1), 60, 0
+        )
+
+    # NOTE: バージョンより後の書き込みが見えても、バージョンより古いデータでキャッシュしない
+    assert [name for name, _, _ in calls.mock_calls[:2]] == ["find_version", "query"]
+    assert agp.count == 1
+    # NOTE: live-indexに最後の書き込みが反映される前に読んだ結果はキャッシュしない
+    cached = cache.get(("000001", 1, datetime(2024, 1, 1), datetime(2024, 1, 1), 60, 0))
+    assert (cached is not None) == settled
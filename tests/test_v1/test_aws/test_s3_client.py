@@ -0,0 +1,38 @@
+# Standard Library
+from unittest.mock import MagicMock
+
+# Third Party Library
+from aws.s3_client import S3Client, S3MultipartWriter
+
+
+def _s3() -> S3Client:
+    s3 = S3Client.__new__(S3Client)
+    s3._bucket_name = "bucket"
+    s3.client = MagicMock()
+    s3.client.create_multipart_upload.return_value = {"UploadId": "upload"}
+    s3.client.upload_part.side_effect = lambda **kwargs: {"ETag": str(kwargs["PartNumber"])}
+    return s3
+
+
+def test_small_object_is_put_at_once() -> None:
+    s3 = _s3()
+    writer = s3.open_writer("key", "application/x-ndjson")
+
+    writer.write(b"line\n")
+    writer.close()
+
+    s3.client.put_object.assert_called_once()
+    s3.client.create_multipart_upload.assert_not_called()
+
+
+def test_large_object_is_uploaded_in_parts() -> None:
+    s3 = _s3()
+    writer = s3.open_writer("key", "application/x-ndjson")
+
+    writer.write(b"x" * S3MultipartWriter.PART_SIZE)
+    writer.write(b"rest")
+    writer.close()
+
+    assert s3.client.upload_part.call_count == 2
+    parts = s3.client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+    assert [part["PartNumber"] for part in parts] == [1, 2]
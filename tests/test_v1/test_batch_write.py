@@ -0,0 +1,76 @@
+# Standard Library
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+from database.base import BGLModel
+from pynamodb.exceptions import PutError
+from repositories.batch_write import DUPLICATE_KEY_ERROR, UNPROCESSED_ERROR, batch_put
+from schemas.event_timing import EventTiming
+
+record_time = datetime(2024, 1, 1)
+
+
+def make_items(size: int) -> List[BGLModel]:
+    return [
+        BGLModel(
+            user_id="000001",
+            value=100,
+            event_timing=EventTiming.EMPTY_STOMACH,
+            record_time=record_time + timedelta(minutes=index),
+        )
+        for index in range(size)
+    ]
+
+
+def unprocessed(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "UnprocessedItems": {
+            BGLModel.Meta.table_name: [{"PutRequest": {"Item": item}} for item in items]
+        }
+    }
+
+
+@patch.object(BGLModel, "_get_connection")
+def test_batch_put_chunks_and_retries(mock_connection: MagicMock) -> None:
+    items = make_items(30)
+    # NOTE: 最初のチャンクは2件が未処理になり、再試行で書き込まれる
+    first_chunk = [item.serialize() for item in items[:25]]
+    mock_connection.return_value.batch_write_item.side_effect = [
+        unprocessed(first_chunk[:2]),
+        {},
+        {},
+    ]
+    sleep = MagicMock()
+
+    errors = batch_put(BGLModel, items, sleep=sleep)
+
+    assert errors == [None] * 30
+    calls = mock_connection.return_value.batch_write_item.call_args_list
+    assert [len(call.kwargs["put_items"]) for call in calls] == [25, 2, 5]
+    sleep.assert_called_once()
+
+
+@patch.object(BGLModel, "_get_connection")
+def test_batch_put_reports_failures(mock_connection: MagicMock) -> None:
+    items = make_items(3) + make_items(1)
+    mock_connection.return_value.batch_write_item.side_effect = lambda put_items: unprocessed(
+        put_items[:1]
+    )
+
+    errors = batch_put(BGLModel, items, max_attempts=3, sleep=MagicMock())
+
+    assert errors == [UNPROCESSED_ERROR, None, None, DUPLICATE_KEY_ERROR]
+    assert mock_connection.return_value.batch_write_item.call_count == 3
+
+
+@patch.object(BGLModel, "_get_connection")
+def test_batch_put_continues_after_error(mock_connection: MagicMock) -> None:
+    items = make_items(26)
+    mock_connection.return_value.batch_write_item.side_effect = [PutError("throttled"), {}]
+
+    errors = batch_put(BGLModel, items, sleep=MagicMock())
+
+    assert errors[:25] == ["Not written: throttled"] * 25
+    assert errors[25] is None
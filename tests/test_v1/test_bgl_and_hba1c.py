@@ -0,0 +1,140 @@
+# Standard Library
+from datetime import datetime, timedelta
+from threading import Barrier
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+import pytest
+from aws_lambda_powertools.event_handler.exceptions import ServiceError
+from pynamodb.exceptions import CancellationReason, TransactWriteError, VerboseClientError
+from schemas.bgl import BGLSchema
+from schemas.bgl_and_hba1c import BGLAndHba1cCreateRequestSchema
+from schemas.event_timing import EventTiming
+from schemas.hba1c import Hba1cSchema
+from services.bgl_and_hba1c_service import BGLAndHba1cService, merge_bgl_and_hba1c
+
+test_user_id = "test_user_id"
+test_record_time = datetime(2024, 1, 1)
+
+
+def _bgl(id: str, hours: int) -> BGLSchema:
+    return BGLSchema(
+        id=id,
+        user_id=test_user_id,
+        value=100.0,
+        event_timing="空腹時",
+        record_time=test_record_time + timedelta(hours=hours),
+        is_deleted=False,
+        created_at=test_record_time,
+        updated_at=test_record_time,
+    )
+
+
+def _hba1c(id: str, hours: int) -> Hba1cSchema:
+    return Hba1cSchema(
+        id=id,
+        user_id=test_user_id,
+        value=5.5,
+        event_timing="空腹時",
+        record_time=test_record_time + timedelta(hours=hours),
+        is_deleted=False,
+        created_at=test_record_time,
+        updated_at=test_record_time,
+    )
+
+
+def test_merge_bgl_and_hba1c() -> None:
+    bgl_items = [_bgl("bgl-0", 0), _bgl("bgl-2", 2), _bgl("bgl-5", 5)]
+    hba1c_items = [_hba1c("hba1c-1", 1), _hba1c("hba1c-2", 2), _hba1c("hba1c-7", 7)]
+
+    rows = list(merge_bgl_and_hba1c(iter(bgl_items), iter(hba1c_items)))
+
+    assert [(row.bgl_id, row.hba1c_id) for row in rows] == [
+        ("bgl-0", None),
+        (None, "hba1c-1"),
+        ("bgl-2", "hba1c-2"),
+        ("bgl-5", None),
+        (None, "hba1c-7"),
+    ]
+    assert [row.record_time for row in rows] == sorted(row.record_time for row in rows)
+    assert rows[1].hba1c_value == 5.5
+    assert rows[1].bgl_value is None
+
+
+def test_merge_bgl_and_hba1c_with_empty_side() -> None:
+    assert list(merge_bgl_and_hba1c([], [])) == []
+    rows = list(merge_bgl_and_hba1c([], [_hba1c("hba1c-1", 1)]))
+    assert [row.hba1c_id for row in rows] == ["hba1c-1"]
+
+
+def test_combine_bgl_and_hba1c_list_fetches_concurrently() -> None:
+    service = BGLAndHba1cService()
+    # NOTE: 2つの取得が同時に走らないとBarrierがタイムアウトする
+    barrier = Barrier(2, timeout=5)
+
+    def find_bgl(*args: Any) -> List[BGLSchema]:
+        barrier.wait()
+        return [_bgl("bgl-0", 0)]
+
+    def find_hba1c(*args: Any) -> List[Hba1cSchema]:
+        barrier.wait()
+        return [_hba1c("hba1c-0", 0)]
+
+    service.bgl_service.find_many_by_user_id = find_bgl
+    service.hba1c_service.find_many_by_user_id = find_hba1c
+
+    rows = service.combine_bgl_and_hba1c_list(test_user_id, test_record_time, test_record_time)
+
+    assert [(row.bgl_id, row.hba1c_id) for row in rows] == [("bgl-0", "hba1c-0")]
+
+
+test_pair = BGLAndHba1cCreateRequestSchema(
+    user_id=test_user_id,
+    record_time=test_record_time,
+    event_timing=EventTiming.EMPTY_STOMACH,
+    bgl_value=120.0,
+    hba1c_value=5.8,
+)
+
+
+@patch("services.data_version_service.DataVersionService.bump")
+@patch("services.hba1c_service.Hba1cService.refresh_derived")
+@patch("services.bgl_service.BGLService.refresh_derived")
+@patch("pynamodb.transactions.TransactWrite._commit")
+def test_create_one_writes_both_in_one_transaction(
+    mock_commit: MagicMock,
+    mock_bgl_refresh: MagicMock,
+    mock_hba1c_refresh: MagicMock,
+    mock_bump: MagicMock,
+) -> None:
+    mock_bgl_refresh.return_value = {"test_user_id": {"bgl#2024-01-01"}}
+    mock_hba1c_refresh.return_value = {"test_user_id": {"hba1c#2024-01-01"}}
+
+    row = BGLAndHba1cService().create_one(test_pair)
+
+    mock_commit.assert_called_once()
+    # NOTE: 両方の集計を更新してから、ユーザーごとに1回だけバージョンを上げる
+    mock_bgl_refresh.assert_called_once()
+    mock_hba1c_refresh.assert_called_once()
+    mock_bump.assert_called_once_with(
+        {"test_user_id"}, {"test_user_id": {"bgl#2024-01-01", "hba1c#2024-01-01"}}
+    )
+    assert (row.bgl_value, row.hba1c_value) == (120.0, 5.8)
+    assert row.record_time == test_record_time
+    assert row.bgl_id is not None and row.hba1c_id is not None
+
+
+@patch("pynamodb.transactions.TransactWrite._commit")
+def test_create_one_conflict(mock_commit: MagicMock) -> None:
+    cause = VerboseClientError(
+        {"Error": {"Code": "TransactionCanceledException"}},
+        "TransactWriteItems",
+        cancellation_reasons=[CancellationReason(code="TransactionConflict"), None],
+    )
+    mock_commit.side_effect = TransactWriteError("cancelled", cause=cause)
+
+    with pytest.raises(ServiceError) as e:
+        BGLAndHba1cService().create_one(test_pair)
+
+    assert e.value.status_code == 409
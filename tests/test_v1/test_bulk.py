@@ -0,0 +1,46 @@
+# Standard Library
+import time
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+from database.base import BGLModel
+from repositories.bulk import map_parallel
+from schemas.event_timing import EventTiming
+from services.bgl_service import BGLService
+
+
+def test_map_parallel_keeps_order_and_errors() -> None:
+    def fn(key: int) -> int:
+        # NOTE: DynamoDBの応答待ちの代わり
+        time.sleep(0.05)
+        if key == 3:
+            raise ValueError("failed")
+        return key * 2
+
+    started = time.perf_counter()
+    results = map_parallel(fn, list(range(10)))
+    elapsed = time.perf_counter() - started
+
+    assert [result for result, _ in results] == [0, 2, 4, None, 8, 10, 12, 14, 16, 18]
+    assert isinstance(results[3][1], ValueError)
+    assert elapsed < 0.3
+
+
+@patch("repositories.bgl_repository.BGLRepository.find_one")
+def test_find_many_reports_each_id(mock_find_one: MagicMock) -> None:
+    item = BGLModel(id="000002", user_id="000001", event_timing=EventTiming.EMPTY_STOMACH)
+
+    def find_one(id: str) -> BGLModel:
+        if id == "missing":
+            raise BGLModel.DoesNotExist()
+        return item
+
+    mock_find_one.side_effect = find_one
+
+    result = BGLService().find_many(["000002", "missing", "000002"])
+
+    assert [(item.id, item.status) for item in result.items] == [
+        ("000002", "found"),
+        ("missing", "not_found"),
+    ]
+    assert (result.succeeded, result.failed) == (1, 1)
@@ -0,0 +1,215 @@
+# Standard Library
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+import pytest
+from database.base import SUMMARY_KIND_BGL, BGLModel, DailySummaryModel
+from pynamodb.exceptions import CancellationReason, TransactWriteError, VerboseClientError
+from repositories.daily_summary_repository import (
+    SUMMARY_REFRESH_MAX_ATTEMPTS,
+    DailySummaryRepository,
+    aggregate_daily,
+    reading_day,
+)
+from schemas.event_timing import EventTiming
+from services.daily_summary_service import DailySummaryService
+
+
+def make_item(record_time: datetime, value: float, event_timing: EventTiming) -> BGLModel:
+    return BGLModel(
+        user_id="000001", value=value, event_timing=event_timing, record_time=record_time
+    )
+
+
+def test_aggregate_daily() -> None:
+    items = [
+        make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH),
+        make_item(datetime(2024, 1, 1, 13), 140, EventTiming.AFTER_MEAL),
+        make_item(datetime(2024, 1, 1, 19), 120, EventTiming.AFTER_MEAL),
+        make_item(datetime(2024, 1, 2, 8), 90, EventTiming.EMPTY_STOMACH),
+    ]
+
+    summaries = aggregate_daily(SUMMARY_KIND_BGL, items)
+
+    assert len(summaries) == 3
+    summary = summaries[("000001", date(2024, 1, 1), EventTiming.AFTER_MEAL)]
+    assert summary.summary_key == "bgl#2024-01-01#AFTER_MEAL"
+    assert summary.serializer().model_dump() == {
+        "date": date(2024, 1, 1),
+        "event_timing": EventTiming.AFTER_MEAL,
+        "count": 2,
+        "min_value": 120,
+        "max_value": 140,
+        "mean": 130,
+        "sum_squares": 140**2 + 120**2,
+    }
+
+
+def test_reading_day_uses_utc() -> None:
+    jst = timezone(timedelta(hours=9))
+    assert reading_day(datetime(2024, 1, 2, 8, tzinfo=jst)) == date(2024, 1, 1)
+    assert reading_day(datetime(2024, 1, 2, 8)) == date(2024, 1, 2)
+
+
+def conflict() -> TransactWriteError:
+    cause = VerboseClientError(
+        {"Error": {"Code": "TransactionCanceledException"}},
+        "TransactWriteItems",
+        cancellation_reasons=[CancellationReason(code="ConditionalCheckFailed")],
+    )
+    return TransactWriteError("cancelled", cause=cause)
+
+
+@patch("repositories.daily_summary_repository.TransactWrite")
+@patch.object(DailySummaryModel, "query")
+@patch.object(BGLModel, "query")
+def test_refresh_replaces_summaries_of_the_day(
+    mock_query: MagicMock, mock_summary_query: MagicMock, mock_transact_write: MagicMock
+) -> None:
+    mock_query.return_value = [make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH)]
+    # NOTE: 食後のデータは削除されたので、食後の集計は消える
+    stored = DailySummaryModel("000001", "bgl#2024-01-01#EMPTY_STOMACH", version=2)
+    stale = DailySummaryModel("000001", "bgl#2024-01-01#AFTER_MEAL")
+    mock_summary_query.return_value = [stored, stale]
+    transaction = mock_transact_write.return_value.__enter__.return_value
+
+    DailySummaryRepository(BGLModel, SUMMARY_KIND_BGL).refresh("000001", [date(2024, 1, 1)])
+
+    assert mock_query.call_args.kwargs["consistent_read"] is True
+    assert mock_summary_query.call_args.kwargs["consistent_read"] is True
+    (saved,), kwargs = transaction.save.call_args
+    assert saved.summary_key == "bgl#2024-01-01#EMPTY_STOMACH"
+    assert saved.reading_count == 1
+    assert saved.version == 3
+    assert kwargs["condition"] is not None
+    (deleted,), _ = transaction.delete.call_args
+    assert deleted is stale
+
+
+@patch("repositories.daily_summary_repository.sleep")
+@patch("repositories.daily_summary_repository.TransactWrite")
+@patch.object(DailySummaryModel, "query")
+@patch.object(BGLModel, "query")
+def test_refresh_aggregates_again_on_conflict(
+    mock_query: MagicMock,
+    mock_summary_query: MagicMock,
+    mock_transact_write: MagicMock,
+    mock_sleep: MagicMock,
+) -> None:
+    mock_query.return_value = [make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH)]
+    mock_summary_query.return_value = []
+    mock_transact_write.return_value.__exit__.side_effect = [conflict(), None]
+
+    DailySummaryRepository(BGLModel, SUMMARY_KIND_BGL).refresh("000001", [date(2024, 1, 1)])
+
+    assert mock_query.call_count == 2
+    assert mock_summary_query.call_count == 2
+    mock_sleep.assert_called_once()
+
+
+@patch("repositories.daily_summary_repository.sleep")
+@patch("repositories.daily_summary_repository.TransactWrite")
+@patch.object(DailySummaryModel, "query")
+@patch.object(BGLModel, "query")
+def test_refresh_raises_when_conflicts_continue(
+    mock_query: MagicMock,
+    mock_summary_query: MagicMock,
+    mock_transact_write: MagicMock,
+    mock_sleep: MagicMock,
+) -> None:
+    mock_query.return_value = [make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH)]
+    mock_summary_query.return_value = []
+    mock_transact_write.return_value.__exit__.side_effect = conflict()
+
+    with pytest.raises(TransactWriteError):
+        DailySummaryRepository(BGLModel, SUMMARY_KIND_BGL).refresh("000001", [date(2024, 1, 1)])
+
+    assert mock_query.call_count == SUMMARY_REFRESH_MAX_ATTEMPTS
+
+
+@patch("repositories.daily_summary_repository.TransactWrite")
+@patch.object(DailySummaryModel, "query")
+@patch.object(BGLModel, "query")
+def test_rebuild_replaces_only_changed_days(
+    mock_query: MagicMock, mock_summary_query: MagicMock, mock_transact_write: MagicMock
+) -> None:
+    mock_query.return_value = [
+        make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH),
+        make_item(datetime(2024, 1, 2, 8), 120, EventTiming.EMPTY_STOMACH),
+    ]
+    unchanged = aggregate_daily(SUMMARY_KIND_BGL, mock_query.return_value[:1])
+    (same,) = unchanged.values()
+    same.version = 1
+    # NOTE: 1/3のデータは全て削除されたので、1/3の集計は消える
+    empty = DailySummaryModel(
+        "000001", "bgl#2024-01-03#EMPTY_STOMACH", date="2024-01-03", version=4
+    )
+    mock_summary_query.return_value = [same, empty]
+    transaction = mock_transact_write.return_value.__enter__.return_value
+
+    replaced = DailySummaryRepository(BGLModel, SUMMARY_KIND_BGL).rebuild("000001")
+
+    assert replaced == 2
+    assert mock_query.call_count == 1
+    (saved,), kwargs = transaction.save.call_args
+    assert saved.summary_key == "bgl#2024-01-02#EMPTY_STOMACH"
+    assert saved.version == 1
+    assert kwargs["condition"] is not None
+    (deleted,), _ = transaction.delete.call_args
+    assert deleted is empty
+
+
+@patch.object(DailySummaryRepository, "refresh")
+@patch("repositories.daily_summary_repository.TransactWrite")
+@patch.object(DailySummaryModel, "query")
+@patch.object(BGLModel, "query")
+def test_rebuild_refreshes_the_day_on_conflict(
+    mock_query: MagicMock,
+    mock_summary_query: MagicMock,
+    mock_transact_write: MagicMock,
+    mock_refresh: MagicMock,
+) -> None:
+    mock_query.return_value = [make_item(datetime(2024, 1, 1, 8), 100, EventTiming.EMPTY_STOMACH)]
+    mock_summary_query.return_value = []
+    mock_transact_write.return_value.__exit__.side_effect = conflict()
+
+    DailySummaryRepository(BGLModel, SUMMARY_KIND_BGL).rebuild("000001")
+
+    mock_refresh.assert_called_once_with("000001", [date(2024, 1, 1)])
+
+
+def test_service_refresh_groups_days_and_returns_failures() -> None:
+    service = DailySummaryService(BGLModel, SUMMARY_KIND_BGL)
+    service.repository = MagicMock(kind=SUMMARY_KIND_BGL)
+    service.repository.refresh.side_effect = [Exception("throttled"), None]
+
+    dirty = service.refresh(
+        [
+            ("000001", datetime(2024, 1, 1, 8)),
+            ("000001", datetime(2024, 1, 1, 20)),
+            ("000001", datetime(2024, 1, 3, 8)),
+            ("000002", datetime(2024, 1, 1, 8)),
+        ]
+    )
+
+    # NOTE: 1人目が失敗しても2人目の集計は更新し、失敗した日は次に読むときに集計し直す
+    calls = service.repository.refresh.call_args_list
+    assert [call.args for call in calls] == [
+        ("000001", {date(2024, 1, 1), date(2024, 1, 3)}),
+        ("000002", {date(2024, 1, 1)}),
+    ]
+    assert dirty == {"000001": {"bgl#2024-01-01", "bgl#2024-01-03"}}
+
+
+def test_service_find_range_repairs_dirty_summaries() -> None:
+    service = DailySummaryService(BGLModel, SUMMARY_KIND_BGL)
+    service.repository = MagicMock(kind=SUMMARY_KIND_BGL)
+    service.repository.find_range.return_value = []
+    service.data_version = MagicMock()
+    service.data_version.find_dirty_summaries.return_value = {"bgl#2024-01-01", "hba1c#2024-01-02"}
+
+    service.find_range("000001", date(2024, 1, 1), date(2024, 1, 31))
+
+    service.repository.refresh.assert_called_once_with("000001", {date(2024, 1, 1)})
+    service.data_version.clear_dirty_summaries.assert_called_once_with("000001", {"bgl#2024-01-01"})
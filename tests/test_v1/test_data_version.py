@@ -0,0 +1,30 @@
+# Standard Library
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+# Third Party Library
+from services.data_version_service import DataVersionService
+
+
+def test_bump_logs_failures_and_bumps_every_user() -> None:
+    service = DataVersionService()
+    service.repository = MagicMock()
+    service.repository.bump.side_effect = [Exception("throttled"), None]
+
+    service.bump(["000002", "000001", "000002"], {"000002": {"bgl#2024-01-01"}})
+
+    calls = service.repository.bump.call_args_list
+    assert [call.args for call in calls] == [("000001", set()), ("000002", {"bgl#2024-01-01"})]
+
+
+def test_is_settled_waits_for_the_live_index() -> None:
+    service = DataVersionService()
+    service.repository = MagicMock()
+    now = datetime.now(timezone.utc)
+
+    service.repository.find_updated_at.return_value = None
+    assert service.is_settled("000001", lag=5)
+    service.repository.find_updated_at.return_value = now - timedelta(seconds=1)
+    assert not service.is_settled("000001", lag=5)
+    service.repository.find_updated_at.return_value = now - timedelta(seconds=10)
+    assert service.is_settled("000001", lag=5)
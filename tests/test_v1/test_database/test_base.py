@@ -0,0 +1,37 @@
+# Standard Library
+from datetime import datetime, timezone
+
+# Third Party Library
+from database.base import Hba1cModel, UserModel
+from schemas.event_timing import EventTiming
+
+record_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_hba1c_serializer() -> None:
+    item = Hba1cModel(
+        user_id="000001",
+        id="000002",
+        value=6,
+        event_timing=EventTiming.EMPTY_STOMACH,
+        record_time=record_time,
+        live_user_id="000001",
+    )
+
+    schema = item.serializer()
+
+    assert schema.value == 6.0 and isinstance(schema.value, float)
+    assert schema.event_timing == EventTiming.EMPTY_STOMACH
+    assert schema.record_time == record_time
+    assert schema.sunao_food is None
+    assert schema.version == 1
+    assert "live_user_id" not in schema.model_dump()
+
+
+def test_user_serializer() -> None:
+    assert UserModel(id="000001").serializer().term_agreed is False
+
+    schema = UserModel(id="000001", term_agreed_at=record_time).serializer()
+
+    assert schema.term_agreed is True
+    assert schema.term_agreed_at == record_time
@@ -0,0 +1,107 @@
+# Standard Library
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+from database import migrations
+from database.base import ID_INDEX_NAME, LIVE_INDEX_NAME, SUMMARY_KIND_BGL, BGLModel, Hba1cModel
+
+
+def test_id_index_in_schema() -> None:
+    schema = BGLModel._get_schema()
+    index_names = [index["index_name"] for index in schema["global_secondary_indexes"]]
+    assert ID_INDEX_NAME in index_names
+    assert LIVE_INDEX_NAME in index_names
+
+
+@patch("database.migrations._dynamodb_client")
+@patch("database.base.BGLModel.describe_table")
+def test_ensure_global_secondary_indexes_creates_missing(
+    mock_describe_table: MagicMock, mock_client: MagicMock
+) -> None:
+    mock_describe_table.return_value = {"GlobalSecondaryIndexes": []}
+
+    created = migrations.ensure_global_secondary_indexes(BGLModel, wait=False)
+
+    assert sorted(created) == sorted([ID_INDEX_NAME, LIVE_INDEX_NAME])
+    kwargs = mock_client.return_value.update_table.call_args.kwargs
+    assert kwargs["TableName"] == BGLModel.Meta.table_name
+
+
+@patch("database.migrations._dynamodb_client")
+@patch("database.base.BGLModel.describe_table")
+def test_ensure_global_secondary_indexes_skips_existing(
+    mock_describe_table: MagicMock, mock_client: MagicMock
+) -> None:
+    mock_describe_table.return_value = {
+        "GlobalSecondaryIndexes": [
+            {"IndexName": ID_INDEX_NAME, "IndexStatus": "ACTIVE"},
+            {"IndexName": LIVE_INDEX_NAME, "IndexStatus": "ACTIVE"},
+        ]
+    }
+
+    created = migrations.ensure_global_secondary_indexes(BGLModel, wait=False)
+
+    assert created == []
+    mock_client.return_value.update_table.assert_not_called()
+
+
+@patch("database.migrations.ParallelScan")
+def test_backfill_live_user_id(mock_scan: MagicMock) -> None:
+    item = MagicMock(user_id="000001")
+    mock_scan.return_value = [item]
+
+    updated = migrations.backfill_live_user_id(BGLModel)
+
+    assert updated == 1
+    actions = item.update.call_args.kwargs["actions"]
+    assert str(actions[0]) == str(BGLModel.live_user_id.set("000001"))
+
+
+@patch("database.migrations.DataVersionRepository")
+@patch("database.migrations.DailySummaryRepository")
+@patch("database.migrations.ParallelScan")
+def test_backfill_daily_summaries_rebuilds_each_user(
+    mock_scan: MagicMock, mock_repository: MagicMock, mock_data_version: MagicMock
+) -> None:
+    # NOTE: 集計だけが残っているユーザーも集計し直す(集計が消える)
+    mock_scan.side_effect = [
+        [MagicMock(user_id="000001"), MagicMock(user_id="000001"), MagicMock(user_id="000002")],
+        [MagicMock(user_id="000003")],
+    ]
+    mock_repository.return_value.rebuild.side_effect = [2, 0, 1]
+
+    replaced = migrations.backfill_daily_summaries(BGLModel, SUMMARY_KIND_BGL)
+
+    assert replaced == 3
+    rebuilt = [args for args, _ in mock_repository.return_value.rebuild.call_args_list]
+    assert rebuilt == [("000001",), ("000002",), ("000003",)]
+    bumped = [args for args, _ in mock_data_version.return_value.bump.call_args_list]
+    assert bumped == [("000001",), ("000003",)]
+
+
+def test_create_missing_tables() -> None:
+    existing = MagicMock()
+    existing.exists.return_value = True
+    missing = MagicMock()
+    missing.exists.return_value = False
+    missing.Meta.table_name = "local_missing_table"
+
+    created = migrations.create_missing_tables((existing, missing))
+
+    assert created == ["local_missing_table"]
+    existing.create_table.assert_not_called()
+    missing.create_table.assert_called_once_with(wait=True, billing_mode="PAY_PER_REQUEST")
+
+
+@patch("database.migrations.backfill_live_user_id")
+@patch("database.migrations.ensure_global_secondary_indexes")
+@patch("database.migrations.create_missing_tables")
+def test_migrate_skips_created_tables(
+    mock_create: MagicMock, mock_ensure: MagicMock, mock_backfill: MagicMock
+) -> None:
+    mock_create.return_value = [BGLModel.Meta.table_name]
+
+    migrations.migrate()
+
+    assert [call.args[0] for call in mock_ensure.call_args_list] == [Hba1cModel]
+    assert [call.args[0] for call in mock_backfill.call_args_list] == [Hba1cModel]
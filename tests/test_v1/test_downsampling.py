@@ -0,0 +1,53 @@
+# Standard Library
+from datetime import datetime, timedelta, timezone
+
+# Third Party Library
+import numpy as np
+from analytics.downsampling import bucket_stats, lttb_indices, to_arrays
+from schemas.downsampling import Resolution
+
+
+def test_lttb_keeps_endpoints_and_peaks() -> None:
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    y[500] = 10.0
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+    assert 500 in indices.tolist()
+
+
+def test_lttb_returns_all_points_when_few() -> None:
+    x = np.arange(5, dtype=np.float64)
+
+    assert lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_bucket_stats_daily_and_weekly() -> None:
+    # NOTE: 2024/1/7は日曜日、2024/1/8は月曜日
+    start = datetime(2024, 1, 7, 22, tzinfo=timezone.utc)
+    seconds, values = to_arrays(
+        (start + timedelta(hours=hours), value)
+        for hours, value in [(0, 100.0), (1, 120.0), (2, 80.0), (3, 90.0)]
+    )
+
+    daily = bucket_stats(seconds, values, Resolution.DAILY)
+    weekly = bucket_stats(seconds, values, Resolution.WEEKLY)
+
+    assert [(bucket.start.day, bucket.count, bucket.mean) for bucket in daily] == [
+        (7, 2, 110.0),
+        (8, 2, 85.0),
+    ]
+    assert (daily[1].min_value, daily[1].max_value) == (80.0, 90.0)
+    assert [(bucket.start.date().isoformat(), bucket.count) for bucket in weekly] == [
+        ("2024-01-01", 2),
+        ("2024-01-08", 2),
+    ]
+
+
+def test_bucket_stats_without_readings() -> None:
+    assert bucket_stats(*to_arrays([]), Resolution.HOURLY) == []
@@ -0,0 +1,45 @@
+# Third Party Library
+from repositories.dynamodb_stats import DynamoDBStats, consumed_capacity, returned_items
+
+
+def test_record_totals() -> None:
+    stats = DynamoDBStats()
+    stats.record("Query", "bgl_table/live-index", latency_ms=5.0, items=10, read_capacity_units=1.5)
+    stats.record("Query", "bgl_table/live-index", latency_ms=3.0, items=2, read_capacity_units=0.5)
+    stats.record("PutItem", "bgl_table", latency_ms=4.0, write_capacity_units=1.0, error=True)
+
+    assert stats.totals == {
+        "calls": 3,
+        "errors": 1,
+        "latency_ms": 12.0,
+        "items": 12,
+        "read_capacity_units": 2.0,
+        "write_capacity_units": 1.0,
+    }
+    assert [(call["operation"], call["calls"]) for call in stats.calls] == [
+        ("Query", 2),
+        ("PutItem", 1),
+    ]
+    assert stats.header_value() == "calls=3;items=12;rcu=2;wcu=1;ms=12"
+
+    stats.reset()
+    assert stats.totals["calls"] == 0
+    assert stats.calls == []
+
+
+def test_consumed_capacity() -> None:
+    assert consumed_capacity("Query", {"ConsumedCapacity": {"CapacityUnits": 0.5}}) == (0.5, 0.0)
+    assert consumed_capacity("PutItem", {"ConsumedCapacity": {"CapacityUnits": 1.0}}) == (0.0, 1.0)
+    batch = {"ConsumedCapacity": [{"CapacityUnits": 2.0}, {"CapacityUnits": 1.0}]}
+    assert consumed_capacity("BatchWriteItem", batch) == (0.0, 3.0)
+    transaction = {"ConsumedCapacity": [{"ReadCapacityUnits": 2.0, "WriteCapacityUnits": 4.0}]}
+    assert consumed_capacity("TransactWriteItems", transaction) == (2.0, 4.0)
+    assert consumed_capacity("GetItem", {}) == (0.0, 0.0)
+
+
+def test_returned_items() -> None:
+    assert returned_items({"Count": 3, "Items": [{}, {}, {}]}) == 3
+    assert returned_items({"Item": {}}) == 1
+    assert returned_items({}) == 0
+    assert returned_items({"Responses": {"bgl_table": [{}, {}], "hba1c_table": [{}]}}) == 3
+    assert returned_items({"Responses": [{"Item": {}}, {}]}) == 1
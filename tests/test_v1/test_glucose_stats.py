@@ -0,0 +1,57 @@
+# Standard Library
+import statistics
+
+# Third Party Library
+import pytest
+from analytics.glucose_stats import glucose_stats, to_arrays
+from schemas.event_timing import EventTiming
+
+readings = [
+    (60.0, EventTiming.EMPTY_STOMACH),
+    (100.0, EventTiming.EMPTY_STOMACH),
+    (200.0, EventTiming.AFTER_MEAL),
+    (150.0, EventTiming.AFTER_MEAL),
+    (180.0, EventTiming.AFTER_MEAL),
+]
+
+
+def test_glucose_stats() -> None:
+    values, codes = to_arrays(readings)
+
+    stats = glucose_stats(values, codes, 70.0, 180.0)
+
+    all_values = [value for value, _ in readings]
+    assert stats.count == 5
+    assert stats.mean == 138.0
+    assert stats.sd == pytest.approx(statistics.stdev(all_values), abs=0.01)
+    assert stats.cv == pytest.approx(statistics.stdev(all_values) / 138.0 * 100, abs=0.01)
+    assert stats.gmi == pytest.approx(3.31 + 0.02392 * 138.0, abs=0.01)
+    # NOTE: 目標範囲の上限ちょうど(180)は範囲内
+    assert (stats.time_below_range, stats.time_in_range, stats.time_above_range) == (
+        20.0,
+        60.0,
+        20.0,
+    )
+    assert stats.target_low == 70.0
+    assert stats.target_high == 180.0
+
+    by_event_timing = {item.event_timing: item for item in stats.by_event_timing}
+    assert set(by_event_timing) == {EventTiming.EMPTY_STOMACH, EventTiming.AFTER_MEAL}
+    after_meal = by_event_timing[EventTiming.AFTER_MEAL]
+    assert after_meal.count == 3
+    assert after_meal.sd == pytest.approx(statistics.stdev([200.0, 150.0, 180.0]), abs=0.01)
+    assert after_meal.time_above_range == pytest.approx(33.33)
+
+
+def test_glucose_stats_without_enough_readings() -> None:
+    stats = glucose_stats(*to_arrays([]), 70.0, 180.0)
+    assert stats.count == 0
+    assert stats.mean is None
+    assert stats.time_in_range is None
+    assert stats.by_event_timing == []
+
+    stats = glucose_stats(*to_arrays(readings[:1]), 70.0, 180.0)
+    assert stats.count == 1
+    assert stats.mean == 60.0
+    assert stats.sd is None
+    assert stats.cv is None
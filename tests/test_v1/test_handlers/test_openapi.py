@@ -0,0 +1,93 @@
+# Standard Library
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Third Party Library
+import pytest
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver
+from handlers import openapi
+
+
+@pytest.fixture(autouse=True)
+def clear_spec_cache() -> Iterator[None]:
+    openapi.load_openapi_spec.cache_clear()
+    yield
+    openapi.load_openapi_spec.cache_clear()
+
+
+def swagger_event(query: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        "path": "/swagger",
+        "httpMethod": "GET",
+        "headers": {},
+        "queryStringParameters": query,
+        "requestContext": {"requestId": "test", "stage": "v1", "path": "/swagger"},
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def write_spec(path: Path, version: str) -> str:
+    spec = json.dumps({"openapi": "3.1.0", "info": {"title": "test", "version": version}})
+    path.write_text(spec, encoding="utf-8")
+    return spec
+
+
+def test_load_openapi_spec(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(openapi, "OPENAPI_SPEC_PATH", tmp_path / "openapi.json")
+    assert openapi.load_openapi_spec() is None
+
+    openapi.load_openapi_spec.cache_clear()
+    spec = write_spec(tmp_path / "openapi.json", openapi.API_VERSION_HASH)
+    assert openapi.load_openapi_spec() == spec
+
+
+def test_load_openapi_spec_other_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(openapi, "OPENAPI_SPEC_PATH", tmp_path / "openapi.json")
+    write_spec(tmp_path / "openapi.json", "old-version")
+
+    assert openapi.load_openapi_spec() is None
+
+
+def test_swagger_serves_prebuilt_spec(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(openapi, "OPENAPI_SPEC_PATH", tmp_path / "openapi.json")
+    spec = write_spec(tmp_path / "openapi.json", openapi.API_VERSION_HASH)
+    app = APIGatewayRestResolver(enable_validation=True)
+    openapi.enable_swagger(app)
+
+    response = app.resolve(swagger_event({"format": "json"}), {})
+
+    assert response["statusCode"] == 200
+    assert response["body"] == spec
+
+
+def test_swagger_without_spec_outside_local(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(openapi, "OPENAPI_SPEC_PATH", tmp_path / "openapi.json")
+    monkeypatch.setattr(openapi, "STAGE", "dev")
+    app = APIGatewayRestResolver(enable_validation=True)
+    openapi.enable_swagger(app)
+
+    response = app.resolve(swagger_event(), {})
+
+    assert response["statusCode"] == 404
+
+
+def test_server_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(openapi, "STAGE", "local")
+    monkeypatch.delenv("APP_API_BASE_URL", raising=False)
+    assert openapi._server_url() == "http://localhost:3333"
+
+    monkeypatch.setattr(openapi, "STAGE", "stg")
+    monkeypatch.setenv("APP_API_BASE_URL", "https://api.example.com")
+    assert openapi._server_url() == "https://api.example.com"
+
+
+def test_server_url_without_base_url_outside_local(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(openapi, "STAGE", "dev")
+    monkeypatch.delenv("APP_API_BASE_URL", raising=False)
+
+    with pytest.raises(ValueError):
+        openapi._server_url()
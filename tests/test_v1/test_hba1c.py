@@ -1,12 +1,15 @@
 # Standard Library
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 # Third Party Library
 import pytest
+from aws_lambda_powertools.event_handler.exceptions import NotFoundError
 from database.base import Hba1cModel
 from repositories.hba1c_repository import Hba1cRepository
+from repositories.identity_map import identity_map
 from schemas.hba1c import Hba1cCreateRequestSchema, Hba1cSchema, Hba1cUpdateRequestSchema
+from services.hba1c_service import Hba1cService
 
 test_user_id = "test_user_id"
 test_id = "test_id"
@@ -40,18 +43,23 @@ def hba1c_repository() -> Hba1cRepository:
 
 
 @patch("database.base.Hba1cModel.scan")
-def test_find_all(mock_scan: MagicMock, hba1c_repository: Hba1cRepository) -> None:
-    mock_scan.return_value = [
-        Hba1cModel(
-            id=test_data.id,
-            user_id=test_data.user_id,
-            value=test_data.value,
-            event_timing=test_data.event_timing,
-            record_time=test_data.record_time,
-            sunao_food=None,
-        )
-    ]
-    items = hba1c_repository.find_all()
+def test_scan(mock_scan: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    mock_scan.return_value = iter(
+        [
+            Hba1cModel(
+                id=test_data.id,
+                user_id=test_data.user_id,
+                value=test_data.value,
+                event_timing=test_data.event_timing,
+                record_time=test_data.record_time,
+                sunao_food=None,
+            )
+        ]
+    )
+    last_evaluated_key = {"user_id": {"S": test_user_id}}
+    items = list(hba1c_repository.scan(last_evaluated_key, page_size=10))
+
+    assert mock_scan.call_args.kwargs == {"last_evaluated_key": last_evaluated_key, "page_size": 10}
     assert len(items) == 1
     assert items[0].value == 4.0
     assert items[0].event_timing == "食後"
@@ -72,24 +80,26 @@ def test_create_one(
     assert item.user_id == test_data_create.user_id
 
 
-@patch("database.base.Hba1cModel.scan")
-def test_is_exist(mock_scan: MagicMock, hba1c_repository: Hba1cRepository) -> None:
-    scan_iterator_mock = MagicMock()
-    scan_iterator_mock.next.return_value = Hba1cModel(test_data)
-    mock_scan.return_value = scan_iterator_mock
+@patch("database.base.Hba1cModel.id_index.query")
+def test_is_exist(mock_query: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = Hba1cModel(test_data)
+    mock_query.return_value = query_iterator_mock
 
     assert hba1c_repository.is_exist(test_id) is True
 
-    scan_iterator_mock.next.side_effect = StopIteration
-    mock_scan.return_value = scan_iterator_mock
+    # NOTE: 同一リクエスト内では結果がキャッシュされるので、次のリクエストとして扱う
+    identity_map.reset()
+    query_iterator_mock.next.side_effect = StopIteration
+    mock_query.return_value = query_iterator_mock
     assert hba1c_repository.is_exist(test_id) is False
 
 
-@patch("database.base.Hba1cModel.scan")
-def test_find_one(mock_scan: MagicMock, hba1c_repository: Hba1cRepository) -> None:
-    scan_iterator_mock = MagicMock()
-    scan_iterator_mock.next.return_value = Hba1cModel(**test_data.dict())
-    mock_scan.return_value = scan_iterator_mock
+@patch("database.base.Hba1cModel.id_index.query")
+def test_find_one(mock_query: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = Hba1cModel(**test_data.dict())
+    mock_query.return_value = query_iterator_mock
 
     item = hba1c_repository.find_one(test_id)
 
@@ -102,62 +112,139 @@ def test_find_one(mock_scan: MagicMock, hba1c_repository: Hba1cRepository) -> No
     assert item.sunao_food == test_data.sunao_food
 
 
-@patch("database.base.Hba1cModel.save")
-@patch("database.base.Hba1cModel.delete")
-@patch("database.base.Hba1cModel.scan")
-def test_update_one(
-    mock_scan: MagicMock,
-    mock_delete: MagicMock,
-    mock_save: MagicMock,
-    hba1c_repository: Hba1cRepository,
+@patch("database.base.Hba1cModel.update")
+def test_update_one(mock_update: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    hba1c_repository.update_one(Hba1cModel(**test_data.model_dump()), test_data_update)
+
+    # NOTE: record_timeが変わらない場合は1回のUpdateItemで更新する
+    mock_update.assert_called_once()
+    condition = mock_update.call_args.kwargs["condition"]
+    assert str(condition) == str(Hba1cModel.version.does_not_exist())
+
+
+@patch("database.base.Hba1cModel.get")
+@patch("database.base.Hba1cModel.id_index.query")
+def test_find_one_consistent_reads_latest_version(
+    mock_query: MagicMock, mock_get: MagicMock, hba1c_repository: Hba1cRepository
 ) -> None:
-    scan_iterator_mock = MagicMock()
-    scan_iterator_mock.next.return_value = Hba1cModel(test_data)
-    mock_scan.return_value = scan_iterator_mock
+    # NOTE: id-indexには書き込みがまだ反映されておらず、古いバージョンが返る
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = Hba1cModel(
+        **test_data.model_dump(exclude={"version"}), version=2
+    )
+    mock_query.return_value = query_iterator_mock
+    mock_get.return_value = Hba1cModel(**test_data.model_dump(exclude={"version"}), version=3)
+
+    item = hba1c_repository.find_one_consistent(test_data.id)
+
+    mock_get.assert_called_once_with(test_user_id, test_record_time, consistent_read=True)
+    assert item is not None and item.version == 3
+
+
+@patch("services.hba1c_service.Hba1cService.after_write")
+@patch("database.base.Hba1cModel.update")
+@patch("database.base.Hba1cModel.get")
+@patch("database.base.Hba1cModel.id_index.query")
+def test_service_update_one_reads_once(
+    mock_query: MagicMock, mock_get: MagicMock, mock_update: MagicMock, mock_after_write: MagicMock
+) -> None:
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = Hba1cModel(**test_data.model_dump())
+    mock_query.return_value = query_iterator_mock
+    mock_get.return_value = Hba1cModel(**test_data.model_dump(exclude={"version"}), version=3)
 
-    new_item = hba1c_repository.update_one(test_data.id, test_data_update)
+    Hba1cService().update_one(test_data.id, test_data_update)
 
-    mock_delete.assert_called_once()
-    mock_save.assert_called()
+    # NOTE: id-indexを1回、テーブルを1回だけ読み、そのバージョンを楽観ロックに使う
+    mock_query.assert_called_once()
+    mock_get.assert_called_once()
+    condition = mock_update.call_args.kwargs["condition"]
+    assert str(condition) == str(Hba1cModel.version == 3)
 
-    assert new_item is not None
-    assert new_item.value == test_data_update.value
-    assert new_item.event_timing == test_data_update.event_timing
-    assert new_item.record_time == test_data_update.record_time
-    assert new_item.sunao_food == test_data_update.sunao_food
 
+@patch("database.base.Hba1cModel.id_index.query")
+def test_service_update_one_not_found(mock_query: MagicMock) -> None:
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.side_effect = StopIteration
+    mock_query.return_value = query_iterator_mock
 
-@patch("database.base.Hba1cModel.scan")
-@patch("database.base.Hba1cModel.save")
+    with pytest.raises(NotFoundError):
+        Hba1cService().update_one(test_data.id, test_data_update)
+
+
+@patch("repositories.hba1c_repository.TransactWrite")
+def test_update_one_with_new_record_time(
+    mock_transact_write: MagicMock, hba1c_repository: Hba1cRepository
+) -> None:
+    item = Hba1cModel(**test_data.model_dump(exclude={"version"}), version=3)
+    data = test_data_update.model_copy(update={"record_time": datetime(2024, 1, 1), "version": 3})
+
+    new_item = hba1c_repository.update_one(item, data)
+
+    # NOTE: range keyが変わる場合は削除と作成を1つのトランザクションで行う
+    transaction = mock_transact_write.return_value.__enter__.return_value
+    transaction.delete.assert_called_once()
+    transaction.save.assert_called_once_with(new_item, condition=ANY)
+    assert new_item.id == test_data.id
+    assert new_item.created_at == test_data.created_at
+    assert new_item.value == data.value
+    assert new_item.record_time == data.record_time
+    assert new_item.version == 4
+
+
+@patch("database.base.Hba1cModel.id_index.query")
+@patch("database.base.Hba1cModel.update")
 def test_delete_one(
-    mock_save: MagicMock, mock_scan: MagicMock, hba1c_repository: Hba1cRepository
+    mock_update: MagicMock, mock_query: MagicMock, hba1c_repository: Hba1cRepository
 ) -> None:
-    scan_iterator_mock = MagicMock()
-    scan_iterator_mock.next.return_value = Hba1cModel(**test_data.dict())
-    mock_scan.return_value = scan_iterator_mock
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = Hba1cModel(**test_data.dict())
+    mock_query.return_value = query_iterator_mock
 
     item = hba1c_repository.delete_one(test_id)
 
-    mock_save.assert_called_once()
+    mock_update.assert_called_once()
+    # NOTE: 論理削除と同時にlive_user_idを消してlive-indexから外す
+    actions = [str(action) for action in mock_update.call_args.kwargs["actions"]]
+    assert str(Hba1cModel.is_deleted.set(True)) in actions
+    assert str(Hba1cModel.live_user_id.remove()) in actions
     assert item is not None
     assert item.id == test_data.id
     assert item.user_id == test_data.user_id
-    assert item.value == test_data.value
-    assert item.event_timing == test_data.event_timing
-    assert item.record_time == test_data.record_time
-    assert item.sunao_food == test_data.sunao_food
-    assert item.is_deleted is True
 
 
-@patch("database.base.Hba1cModel.query")
+@patch("database.base.Hba1cModel.live_index.query")
 def test_find_many_by_user_id(mock_query: MagicMock, hba1c_repository: Hba1cRepository) -> None:
-    test_data_active = Hba1cModel(test_data)
-    test_data_deleted = Hba1cModel(test_data)
-    test_data_deleted.is_deleted = True
-
-    mock_query.return_value = [test_data_active, test_data_deleted]
+    mock_query.return_value = [Hba1cModel(test_data, live_user_id=test_user_id)]
 
     items = hba1c_repository.find_many_by_user_id(test_user_id, datetime.now(), datetime.now())
 
+    # NOTE: 論理削除済みのデータはlive-indexに含まれないので、DynamoDB側で除外される
+    assert mock_query.call_args.args == (test_user_id,)
+    assert mock_query.call_args.kwargs["filter_condition"] is not None
     assert len(items) == 1
     assert not items[0].is_deleted
+
+
+@patch("database.base.Hba1cModel.save")
+def test_create_one_is_live(mock_save: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    item = hba1c_repository.create_one(test_data_create)
+    assert item.live_user_id == test_data_create.user_id
+
+
+@patch("database.base.Hba1cModel.live_index.query")
+def test_find_page_by_user_id(mock_query: MagicMock, hba1c_repository: Hba1cRepository) -> None:
+    next_key = {"live_user_id": {"S": test_user_id}}
+    result_iterator_mock = MagicMock()
+    result_iterator_mock.__iter__.return_value = iter([Hba1cModel(test_data)])
+    result_iterator_mock.last_evaluated_key = next_key
+    mock_query.return_value = result_iterator_mock
+
+    items, last_evaluated_key = hba1c_repository.find_page_by_user_id(
+        test_user_id, datetime.now(), datetime.now(), limit=1
+    )
+
+    assert mock_query.call_args.kwargs["limit"] == 1
+    assert mock_query.call_args.kwargs["last_evaluated_key"] is None
+    assert len(items) == 1
+    assert last_evaluated_key == next_key
@@ -0,0 +1,35 @@
+# Third Party Library
+from helper.etag import etag_matches, make_etag, not_modified_response
+
+
+def test_make_etag_changes_with_version_and_query() -> None:
+    query = {"userId": "000001", "from": "20240101", "to": "20240131"}
+    etag = make_etag("000001", 3, "/bgl/query", query, "latest")
+
+    assert etag.startswith('W/"')
+    assert etag == make_etag("000001", 3, "/bgl/query", dict(reversed(query.items())), "latest")
+    assert etag != make_etag("000001", 4, "/bgl/query", query, "latest")
+    assert etag != make_etag("000001", 3, "/bgl/query", {**query, "to": "20240130"}, "latest")
+    assert etag != make_etag("000001", 3, "/hba1c/query", query, "latest")
+    assert etag != make_etag("000001", 3, "/bgl/query", query, "v2")
+
+
+def test_etag_matches() -> None:
+    etag = 'W/"abc"'
+
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"xyz"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_not_modified_response() -> None:
+    response = not_modified_response('W/"abc"')
+
+    assert response.status_code == 304
+    assert response.body == ""
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
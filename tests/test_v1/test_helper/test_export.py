@@ -0,0 +1,61 @@
+# Standard Library
+from typing import Any, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+# Third Party Library
+from helper.export import export_ndjson
+from pydantic import BaseModel
+
+
+class Item(BaseModel):
+    id: str
+
+
+class FakeScan:
+    """ResultIterator that returns the key of the last item as last_evaluated_key"""
+
+    def __init__(self, ids: List[str]) -> None:
+        self._ids: Iterator[str] = iter(ids)
+        self._last: Optional[str] = None
+
+    def __next__(self) -> Item:
+        self._last = next(self._ids)
+        return Item(id=self._last)
+
+    @property
+    def last_evaluated_key(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        return {"id": {"S": self._last}} if self._last else None
+
+
+def test_export_ndjson_writes_every_item() -> None:
+    lines: List[bytes] = []
+
+    result = export_ndjson(FakeScan(["a", "b", "c"]), lambda item: item, lines.append)
+
+    assert lines == [b'{"id":"a"}\n', b'{"id":"b"}\n', b'{"id":"c"}\n']
+    assert result.item_count == 3
+    assert result.size == sum(len(line) for line in lines)
+    assert result.last_evaluated_key is None
+
+
+def test_export_ndjson_stops_at_max_bytes() -> None:
+    lines: List[bytes] = []
+
+    result = export_ndjson(FakeScan(["a", "b", "c"]), lambda item: item, lines.append, max_bytes=25)
+
+    # NOTE: 書き出せなかった"c"から再開できるように、最後に書き出した"b"のキーを返す
+    assert lines == [b'{"id":"a"}\n', b'{"id":"b"}\n']
+    assert result.last_evaluated_key == {"id": {"S": "b"}}
+
+
+@patch("helper.export.time.monotonic")
+def test_export_ndjson_stops_at_time_budget(mock_monotonic: Any) -> None:
+    mock_monotonic.side_effect = [0.0, 30.0]
+    lines: List[bytes] = []
+
+    result = export_ndjson(
+        FakeScan(["a", "b", "c"]), lambda item: item, lines.append, time_budget=20.0
+    )
+
+    assert lines == [b'{"id":"a"}\n']
+    assert result.last_evaluated_key == {"id": {"S": "a"}}
@@ -0,0 +1,45 @@
+# Standard Library
+import json
+from datetime import datetime, timezone
+from typing import List
+
+# Third Party Library
+from helper.json_response import dump_json, json_response
+from schemas.event_timing import EventTiming
+from schemas.hba1c import Hba1cPageSchema, Hba1cSchema
+
+test_item = Hba1cSchema(
+    id="000002",
+    user_id="000001",
+    value=5.5,
+    event_timing=EventTiming.EMPTY_STOMACH,
+    record_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    is_deleted=False,
+    created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    version=1,
+)
+
+
+def test_dump_json_uses_aliases() -> None:
+    body = dump_json(List[Hba1cSchema], [test_item])
+
+    assert json.loads(body) == [test_item.model_dump(mode="json", by_alias=True)]
+    assert json.loads(body)[0]["eventTiming"] == "空腹時"
+
+
+def test_dump_json_page() -> None:
+    body = dump_json(Hba1cPageSchema, Hba1cPageSchema(items=[test_item], next_cursor=None))
+
+    assert json.loads(body) == {
+        "items": [json.loads(test_item.model_dump_json(by_alias=True))],
+        "nextCursor": None,
+    }
+
+
+def test_json_response() -> None:
+    response = json_response(b'[{"id":"000002"}]')
+
+    assert response.status_code == 200
+    assert response.is_json()
+    assert response.body == '[{"id":"000002"}]'
@@ -0,0 +1,50 @@
+# Standard Library
+from datetime import datetime
+
+# Third Party Library
+import pytest
+from helper.pagination import decode_cursor, encode_cursor, is_cursor_in_range, is_cursor_of_user
+
+test_key = {
+    "live_user_id": {"S": "000001"},
+    "record_time": {"S": "2024-01-01T00:00:00.000000+0000"},
+    "user_id": {"S": "000001"},
+}
+
+
+def test_cursor_round_trip() -> None:
+    cursor = encode_cursor(test_key)
+
+    assert cursor is not None
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == test_key
+
+
+def test_encode_cursor_without_next_page() -> None:
+    assert encode_cursor(None) is None
+    assert encode_cursor({}) is None
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "eyJhIjogMX0"])
+def test_decode_cursor_rejects_invalid(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_is_cursor_of_user() -> None:
+    assert is_cursor_of_user(test_key, "000001")
+    assert not is_cursor_of_user(test_key, "000002")
+    # NOTE: ベーステーブルのキー
+    assert not is_cursor_of_user(
+        {"user_id": {"S": "000001"}, "record_time": test_key["record_time"]}, "000001"
+    )
+
+
+def test_is_cursor_in_range() -> None:
+    assert is_cursor_in_range(test_key, datetime(2024, 1, 1), datetime(2024, 1, 1))
+    assert is_cursor_in_range(test_key, datetime(2023, 12, 31), datetime(2023, 12, 31))
+    assert not is_cursor_in_range(test_key, datetime(2024, 1, 2), datetime(2024, 1, 31))
+    assert not is_cursor_in_range(test_key, datetime(2023, 12, 1), datetime(2023, 12, 30))
+    assert not is_cursor_in_range(
+        {"user_id": {"S": "000001"}}, datetime(2024, 1, 1), datetime(2024, 1, 1)
+    )
@@ -0,0 +1,46 @@
+# Third Party Library
+from helper.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(10, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(10, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_discard_where_and_disabled() -> None:
+    cache: TTLCache[tuple, int] = TTLCache(10)
+    cache.put(("user1", 1), 1)
+    cache.put(("user2", 1), 2)
+    cache.discard_where(lambda key: key[0] == "user1")
+    assert cache.get(("user1", 1)) is None
+    assert cache.get(("user2", 1)) == 2
+
+    disabled: TTLCache[str, int] = TTLCache(0)
+    disabled.put("a", 1)
+    assert disabled.get("a") is None
@@ -0,0 +1,38 @@
+# Standard Library
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+from database.base import BGLModel
+from repositories.bgl_repository import BGLRepository
+from repositories.identity_map import IdentityMap, identity_map
+
+
+def test_get_or_load_reads_once() -> None:
+    cache = IdentityMap()
+    loader = MagicMock(return_value=None)
+
+    assert cache.get_or_load(BGLModel, "missing", loader) is None
+    assert cache.get_or_load(BGLModel, "missing", loader) is None
+
+    loader.assert_called_once()
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+    cache.reset()
+    assert cache.stats == {"hits": 0, "misses": 0}
+    cache.get_or_load(BGLModel, "missing", loader)
+    assert loader.call_count == 2
+
+
+@patch("database.base.BGLModel.id_index.query")
+def test_repository_reads_each_id_once(mock_query: MagicMock) -> None:
+    query_iterator_mock = MagicMock()
+    query_iterator_mock.next.return_value = BGLModel(id="test_id", user_id="test_user_id")
+    mock_query.return_value = query_iterator_mock
+    repository = BGLRepository()
+
+    assert repository.is_exist("test_id") is True
+    item = repository.find_one("test_id")
+
+    mock_query.assert_called_once()
+    assert item.id == "test_id"
+    assert identity_map.stats == {"hits": 1, "misses": 1}
@@ -0,0 +1,37 @@
+# Third Party Library
+import pytest
+from middlewares import common
+
+
+def test_debug_sample_rate(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(common, "LOG_DEBUG_SAMPLE_RATE", 0.5)
+    monkeypatch.setattr(common, "LOG_DEBUG_SAMPLE_RATES", {"/bgl": 0.1, "/bgl/query": 0.0})
+
+    assert common.debug_sample_rate("/bgl/query") == 0.0
+    assert common.debug_sample_rate("/bgl/0001") == 0.1
+    assert common.debug_sample_rate("/bgl-and-hba1c/query") == 0.5
+    assert common.debug_sample_rate("/user") == 0.5
+
+
+def test_redact_headers() -> None:
+    headers = {"Authorization": "Bearer token", "origin": "http://localhost:3000"}
+
+    assert common.redact_headers(headers) == {
+        "Authorization": common.REDACTED,
+        "origin": "http://localhost:3000",
+    }
+    assert common.redact_headers(None) == {}
+
+
+def test_body_summary() -> None:
+    assert common.body_summary(None) == {}
+    assert common.body_summary("short") == {"body": "short", "body_length": 5}
+    assert common.body_summary("x" * 10, max_length=4) == {
+        "body": "xxxx...",
+        "body_length": 10,
+        "body_truncated": True,
+    }
+    assert common.body_summary([{"id": "1"}, {"id": "2"}]) == {
+        "body_type": "list",
+        "body_length": 2,
+    }
@@ -0,0 +1,97 @@
+# Standard Library
+from typing import Any, Dict, List, Optional
+
+# Third Party Library
+import pytest
+from repositories.parallel_scan import ParallelScan
+
+
+class FakePageIterator:
+    def __init__(self, pages: List[List[int]], start: Optional[Dict[str, Any]]) -> None:
+        first = start["page"]["N"] + 1 if start else 0
+        self._pages = iter(enumerate(pages[first:], start=first))
+        self._total = len(pages)
+        self.last_evaluated_key: Optional[Dict[str, Any]] = start
+
+    def __iter__(self) -> "FakePageIterator":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        index, page = next(self._pages)
+        is_last = index == self._total - 1
+        self.last_evaluated_key = None if is_last else {"page": {"N": index}}
+        return {"Items": page}
+
+
+class FakeModel:
+    """セグメントごとに2ページずつ返すテーブル"""
+
+    class Meta:
+        table_name = "fake"
+
+    calls: List[Dict[str, Any]] = []
+    failing_segment: Optional[int] = None
+
+    @classmethod
+    def scan(cls, **kwargs: Any) -> Any:
+        cls.calls.append(kwargs)
+        segment = kwargs["segment"]
+        if segment == cls.failing_segment:
+            raise RuntimeError("scan failed")
+        pages = [[segment * 10 + 1, segment * 10 + 2], [segment * 10 + 3]]
+
+        class Result:
+            page_iter = FakePageIterator(pages, kwargs["last_evaluated_key"])
+
+        return Result()
+
+    @classmethod
+    def from_raw_data(cls, raw: int) -> int:
+        return raw
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_model() -> None:
+    FakeModel.calls = []
+    FakeModel.failing_segment = None
+
+
+def test_parallel_scan_reads_every_segment() -> None:
+    checkpoints: List[Any] = []
+    scan = ParallelScan(
+        FakeModel,
+        total_segments=3,
+        rate_limit=30,
+        on_checkpoint=lambda segment, key: checkpoints.append((segment, key)),
+    )
+
+    items = sorted(scan)
+
+    assert items == [1, 2, 3, 11, 12, 13, 21, 22, 23]
+    assert sorted(call["segment"] for call in FakeModel.calls) == [0, 1, 2]
+    assert all(call["total_segments"] == 3 for call in FakeModel.calls)
+    assert all(call["rate_limit"] == 10 for call in FakeModel.calls)
+    assert scan.checkpoints == {0: None, 1: None, 2: None}
+    assert (0, {"page": {"N": 0}}) in checkpoints
+
+
+def test_parallel_scan_resumes_from_checkpoints() -> None:
+    scan = ParallelScan(
+        FakeModel,
+        total_segments=3,
+        checkpoints={0: None, 1: {"page": {"N": 0}}},
+    )
+
+    items = sorted(scan)
+
+    # NOTE: セグメント0は読み終わっているので読まず、セグメント1は2ページ目から読む
+    assert items == [13, 21, 22, 23]
+    assert sorted(call["segment"] for call in FakeModel.calls) == [1, 2]
+
+
+def test_parallel_scan_raises_segment_error() -> None:
+    FakeModel.failing_segment = 1
+    scan = ParallelScan(FakeModel, total_segments=2)
+
+    with pytest.raises(RuntimeError):
+        list(scan)
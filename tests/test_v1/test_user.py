@@ -0,0 +1,44 @@
+# Standard Library
+from unittest.mock import MagicMock, patch
+
+# Third Party Library
+import pytest
+from database.base import UserModel
+from repositories.identity_map import identity_map
+from repositories.user_repository import UserRepository
+
+test_user_id = "000001"
+
+
+@pytest.fixture
+def user_repository() -> UserRepository:
+    return UserRepository()
+
+
+@patch("database.base.UserModel.get")
+def test_find_one(mock_get: MagicMock, user_repository: UserRepository) -> None:
+    mock_get.return_value = UserModel(id=test_user_id)
+
+    item = user_repository.find_one(test_user_id)
+
+    mock_get.assert_called_once_with(test_user_id)
+    assert item.id == test_user_id
+
+
+@patch("database.base.UserModel.get")
+def test_is_exist(mock_get: MagicMock, user_repository: UserRepository) -> None:
+    mock_get.return_value = UserModel(id=test_user_id)
+    assert user_repository.is_exist(test_user_id) is True
+
+    identity_map.reset()
+    mock_get.side_effect = UserModel.DoesNotExist
+    assert user_repository.is_exist(test_user_id) is False
+
+
+@patch("database.base.UserModel.batch_get")
+def test_find_many(mock_batch_get: MagicMock, user_repository: UserRepository) -> None:
+    mock_batch_get.return_value = iter([UserModel(id="000003"), UserModel(id="000001")])
+
+    items = user_repository.find_many(["000001", "000002", "000003", "000001"])
+
+    assert [item.id for item in items] == ["000001", "000003"]